@@ -0,0 +1,351 @@
+"""Async file client interface with WebDAV (httpx) and local filesystem implementations.
+
+The routes use these clients so that slow storage I/O never blocks the event
+loop. Scripts keep using the synchronous FileClient.
+"""
+
+import abc
+import logging
+import os
+import stat
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional, cast
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from app.cache import MISSING, TTLCache, stat_cache
+from app.config import settings
+from app.file_client import FileStat, LocalFileClient, local_etag
+from app.metrics import STORAGE_READ_BYTES, time_storage_operation
+from app.webdav import PROPFIND_BODY, build_url, parse_propfind, webdav_path
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFileClient(abc.ABC):
+    """Abstract async interface for the read-side file operations used by routes."""
+
+    @staticmethod
+    def create() -> "AsyncFileClient":
+        """
+        Factory method to create the appropriate async file client based on settings.
+
+        Returns:
+            AsyncFileClient: Either AsyncWebDAVFileClient or AsyncLocalFileClient
+        """
+        client: AsyncFileClient
+        if settings.storage_backend == "local":
+            client = AsyncLocalFileClient()
+        elif settings.storage_backend == "webdav":
+            client = AsyncWebDAVFileClient()
+        else:
+            raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+        # Instrument the backend itself, so cache hits don't dilute its latency
+        client = InstrumentedAsyncFileClient(client, settings.storage_backend)
+        if settings.stat_cache_enabled:
+            return CachingAsyncFileClient(client)
+        return client
+
+    @abc.abstractmethod
+    async def stat(self, path: str) -> Optional[FileStat]:
+        """Get size, mtime and ETag for a path, or None if it doesn't exist."""
+        pass
+
+    @abc.abstractmethod
+    async def read(self, path: str) -> bytes:
+        """Read the whole file content."""
+        pass
+
+    @abc.abstractmethod
+    def open_range(self, path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """
+        Async context manager that opens a byte range for streaming.
+
+        Args:
+            path: Relative path to file
+            start: Start byte position (inclusive)
+            end: End byte position (inclusive)
+            chunk_size: Size of chunks to yield (default 256KB)
+
+        Returns:
+            Context manager yielding an async iterator of byte chunks
+        """
+        pass
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """
+        Get the on-disk path for a file, if the backend is a local filesystem.
+
+        Routes use this to hand local files straight to the server instead of
+        streaming them through Python. Remote backends return None.
+        """
+        return None
+
+    async def exists(self, path: str) -> bool:
+        """Check if a file exists."""
+        file_stat = await self.stat(path)
+        return file_stat is not None and not file_stat.is_dir
+
+    async def aiter_range(
+        self, path: str, start: int, end: int, chunk_size: int = 256 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Async generator that streams a byte range (inclusive end) in chunks."""
+        async with self.open_range(path, start, end, chunk_size) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def aclose(self):
+        """Release any pooled connections."""
+        pass
+
+
+class AsyncWebDAVFileClient(AsyncFileClient):
+    """WebDAV implementation of the async file client using httpx."""
+
+    def __init__(self):
+        """Initialize a pooled httpx client with configured credentials."""
+        self.root_path = settings.webdav_root_path
+        self.client = httpx.AsyncClient(
+            auth=(settings.webdav_username, settings.webdav_password),
+            timeout=settings.webdav_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.webdav_pool_maxsize,
+                max_keepalive_connections=settings.webdav_pool_maxsize,
+            ),
+        )
+        logger.info(f"Initialized async WebDAV client")
+
+    def _url(self, path: str) -> str:
+        """Build the absolute URL for a relative path."""
+        return build_url(settings.webdav_url, webdav_path(self.root_path, path))
+
+    async def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata with a single Depth: 0 PROPFIND."""
+        url = self._url(path)
+        try:
+            response = await self.client.request(
+                "PROPFIND",
+                url,
+                content=PROPFIND_BODY,
+                headers={"Depth": "0", "Content-Type": "application/xml"},
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+
+            entries = parse_propfind(response.content)
+            if not entries:
+                return None
+            entry = entries[0]
+            return FileStat(
+                size=entry.size, mtime=entry.mtime, etag=entry.etag, is_dir=entry.is_dir
+            )
+        except Exception as e:
+            logger.error(f"Error getting file info {path}: {e}")
+            raise
+
+    async def read(self, path: str) -> bytes:
+        """Read file content from WebDAV."""
+        try:
+            response = await self.client.get(self._url(path))
+            response.raise_for_status()
+            content: bytes = response.content
+            return content
+        except Exception as e:
+            logger.error(f"Error reading file {path}: {e}")
+            raise
+
+    @asynccontextmanager
+    async def open_range(self, path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """Open a single ranged GET and forward its body incrementally."""
+        headers = {"Range": f"bytes={start}-{end}"}
+        try:
+            async with self.client.stream("GET", self._url(path), headers=headers) as response:
+                response.raise_for_status()
+                yield self._iter_range(response, start, end, chunk_size)
+        except Exception as e:
+            logger.error(f"Error streaming range {start}-{end} from {path}: {e}")
+            raise
+
+    @staticmethod
+    async def _iter_range(
+        response: httpx.Response, start: int, end: int, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """Yield exactly the requested range, even if the server ignored Range."""
+        # A server that ignores Range answers 200 with the whole file
+        skip = start if response.status_code == 200 else 0
+        bytes_remaining = end - start + 1
+
+        async for chunk in response.aiter_bytes(chunk_size):
+            if skip:
+                if len(chunk) <= skip:
+                    skip -= len(chunk)
+                    continue
+                chunk = chunk[skip:]
+                skip = 0
+            if len(chunk) > bytes_remaining:
+                chunk = chunk[:bytes_remaining]
+            yield chunk
+            bytes_remaining -= len(chunk)
+            if bytes_remaining <= 0:
+                break
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.client.aclose()
+
+
+class AsyncLocalFileClient(AsyncFileClient):
+    """Local filesystem implementation of the async file client (threadpool-backed)."""
+
+    def __init__(self, root_path: Optional[str] = None):
+        """
+        Initialize async local file client.
+
+        Args:
+            root_path: Root directory for file operations (default: settings.local_root_path)
+        """
+        self.local = LocalFileClient(root_path)
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Get the on-disk path for a file."""
+        return self.local._full_path(path)
+
+    async def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata from the local filesystem."""
+        full_path = self.local._full_path(path)
+        try:
+            stat_result = await run_in_threadpool(os.stat, full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        is_dir = stat.S_ISDIR(stat_result.st_mode)
+        return FileStat(
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            etag=None if is_dir else local_etag(stat_result),
+            is_dir=is_dir,
+        )
+
+    async def read(self, path: str) -> bytes:
+        """Read file content from local filesystem."""
+        return await run_in_threadpool(self.local.read_file, path)
+
+    @asynccontextmanager
+    async def open_range(self, path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """Open the file in a worker thread and stream the range from it."""
+        full_path = self.local._full_path(path)
+        f = await run_in_threadpool(open, full_path, "rb")
+        try:
+            await run_in_threadpool(f.seek, start)
+            yield self._iter_file(f, end - start + 1, chunk_size)
+        finally:
+            f.close()
+
+    @staticmethod
+    async def _iter_file(f, length: int, chunk_size: int) -> AsyncIterator[bytes]:
+        """Read up to length bytes from an open file in worker threads."""
+        bytes_remaining = length
+        while bytes_remaining > 0:
+            chunk = await run_in_threadpool(f.read, min(chunk_size, bytes_remaining))
+            if not chunk:
+                break
+            yield chunk
+            bytes_remaining -= len(chunk)
+
+
+class CachingAsyncFileClient(AsyncFileClient):
+    """Async file client wrapper that caches stat lookups (see CachingFileClient)."""
+
+    def __init__(self, client: AsyncFileClient, cache: Optional[TTLCache] = None):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: Underlying async file client
+            cache: Cache to use (default: the shared stat_cache)
+        """
+        self.client = client
+        self.cache = cache or stat_cache
+
+    async def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata, from the cache when possible."""
+        cached = self.cache.get(path)
+        if cached is not MISSING:
+            return cast(Optional[FileStat], cached)
+
+        file_stat = await self.client.stat(path)
+        ttl = None if file_stat is not None else settings.stat_cache_negative_ttl
+        self.cache.set(path, file_stat, ttl=ttl)
+        return file_stat
+
+    async def read(self, path: str) -> bytes:
+        """Read the whole file content."""
+        return await self.client.read(path)
+
+    def open_range(self, path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """Open a byte range using the underlying client."""
+        return self.client.open_range(path, start, end, chunk_size)
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Get the on-disk path for a file, if the backend is local."""
+        return self.client.local_path(path)
+
+    async def aclose(self):
+        """Release any pooled connections."""
+        await self.client.aclose()
+
+
+class InstrumentedAsyncFileClient(AsyncFileClient):
+    """Async file client wrapper that records the duration of every backend operation."""
+
+    def __init__(self, client: AsyncFileClient, backend: str):
+        """
+        Initialize the instrumented wrapper.
+
+        Args:
+            client: Underlying async file client
+            backend: Backend name for the metric labels ("local" or "webdav")
+        """
+        self.client = client
+        self.backend = backend
+
+    async def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata."""
+        with time_storage_operation(self.backend, "stat"):
+            return await self.client.stat(path)
+
+    async def read(self, path: str) -> bytes:
+        """Read the whole file content."""
+        with time_storage_operation(self.backend, "read"):
+            content = await self.client.read(path)
+        STORAGE_READ_BYTES.labels(self.backend).inc(len(content))
+        return content
+
+    @asynccontextmanager
+    async def open_range(self, path: str, start: int, end: int, chunk_size: int = 256 * 1024):
+        """Open a byte range, timing how long the backend takes to start sending it."""
+        async with AsyncExitStack() as stack:
+            with time_storage_operation(self.backend, "open_range"):
+                chunks = await stack.enter_async_context(
+                    self.client.open_range(path, start, end, chunk_size)
+                )
+            yield self._count_bytes(chunks)
+
+    async def _count_bytes(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass chunks through, counting them as read from the backend."""
+        read_bytes = STORAGE_READ_BYTES.labels(self.backend)
+        async for chunk in chunks:
+            read_bytes.inc(len(chunk))
+            yield chunk
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Get the on-disk path for a file, if the backend is local."""
+        return self.client.local_path(path)
+
+    async def aclose(self):
+        """Release any pooled connections."""
+        await self.client.aclose()
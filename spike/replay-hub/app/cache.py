@@ -0,0 +1,277 @@
+"""In-process caches shared across the application."""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned by TTLCache.get on a miss, so None can be cached as a value
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl: Default time-to-live in seconds for new entries
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Get a cached value, or MISSING if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache of byte strings bounded by their total size.
+
+    Optionally backed by a directory, so entries survive restarts and the
+    memory tier can stay small. Keys should include a version (e.g. an ETag):
+    entries are never invalidated, only evicted.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the in-memory entries
+            disk_dir: Directory for the on-disk tier, or None for memory only
+            disk_max_bytes: Maximum total size of the on-disk tier
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir).expanduser() if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(self.disk_dir) if entry.is_file()
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached value from memory, then disk; None on a miss.
+
+        Reads from the disk tier block, so call this from a worker thread when
+        a disk directory is configured.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key) if self.disk_dir else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._set_memory(key, value)
+        return value
+
+    def set(self, key: str, value: bytes):
+        """Store a value in memory and, if configured, on disk (may block)."""
+        self._set_memory(key, value)
+        if self.disk_dir:
+            self._write_disk(key, value)
+
+    def _set_memory(self, key: str, value: bytes):
+        """Store a value in memory, evicting least recently used entries to fit."""
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        """Get the file holding a key in the disk tier."""
+        assert self.disk_dir is not None, "no disk tier configured"
+        return self.disk_dir / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """Read a value from the disk tier, marking it recently used."""
+        path = self._disk_path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Error reading disk cache entry {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, value: bytes):
+        """Write a value to the disk tier atomically, pruning old entries if full."""
+        path = self._disk_path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            # Rewriting an entry replaces its file, so only the difference counts
+            try:
+                previous_size = path.stat().st_size
+            except FileNotFoundError:
+                previous_size = 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error writing disk cache entry {path}: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes += len(value) - previous_size
+            over_limit = self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Delete least recently used disk entries until 90% of the limit is free."""
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and not entry.name.startswith(".tmp-"):
+                try:
+                    stat_result = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                continue
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters and current sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+# Existence/size/ETag/mtime of storage paths, shared by the sync and async
+# caching file clients so a write through one invalidates both
+stat_cache = TTLCache(max_entries=settings.stat_cache_max_entries, ttl=settings.stat_cache_ttl)
+
+# Sprite sheet layouts per month, rebuilt from a thumbnails directory listing
+sprite_layout_cache = TTLCache(max_entries=1000, ttl=settings.stat_cache_ttl)
+
+# MP4 layouts (moov position, bitrate) of streamed videos, keyed by path and version
+media_layout_cache = TTLCache(max_entries=1000, ttl=3600)
+
+# Index query results and rendered grid pages, keyed by the database generation
+# (MetadataDB.generation), so entries from before a write are never hit again
+# and age out of the LRU; the TTL only bounds how long unused entries linger
+query_cache = TTLCache(max_entries=settings.query_cache_max_entries, ttl=3600)
+
+# Thumbnail image bytes, keyed by path and ETag
+thumbnail_cache = ByteLRUCache(
+    max_bytes=settings.thumbnail_cache_max_bytes,
+    disk_dir=settings.thumbnail_cache_dir or None,
+    disk_max_bytes=settings.thumbnail_cache_dir_max_bytes,
+)
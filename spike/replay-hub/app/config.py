@@ -2,6 +2,7 @@
 
 import os
 from typing import Optional, Literal
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -19,21 +20,91 @@ class Settings(BaseSettings):
     webdav_password: str = ""
     webdav_root_path: str = "replays/"
 
+    # WebDAV HTTP connection pool (keep-alive connections reused across requests)
+    webdav_pool_connections: int = 4
+    webdav_pool_maxsize: int = 16
+    webdav_timeout: float = 30.0
+
     # Local Filesystem Configuration (used when storage_backend="local")
     local_root_path: str = "~/replay-hub-storage"
+    # Serve local videos and HLS files with Starlette's FileResponse, which
+    # handles Range, If-Range and multipart ranges itself but answers
+    # open-ended ranges to the end of the file (no stream window sizing or
+    # read-ahead). It reads in stream_chunk_size chunks through worker threads;
+    # uvicorn offers no pathsend extension, so this is not zero-copy.
+    # LOCAL_SENDFILE is accepted as the former name.
+    local_file_response: bool = Field(
+        default=True, validation_alias=AliasChoices("local_file_response", "local_sendfile")
+    )
+
+    # Videos streamed through Python (WebDAV, or local without local_file_response).
+    # Open-ended ranges cover stream_window_seconds of playback at the clip's
+    # bitrate, clamped to the min/max; the next window is read ahead into a
+    # buffer of at most stream_readahead_max_bytes (0 disables read-ahead)
+    stream_chunk_size: int = 256 * 1024
+    stream_window_seconds: float = 8.0
+    stream_window_min_bytes: int = 1024 * 1024
+    stream_window_max_bytes: int = 16 * 1024 * 1024
+    stream_readahead_max_bytes: int = 64 * 1024 * 1024
 
     # Application Configuration
     app_host: str = "0.0.0.0"
     app_port: int = 8080
     log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"  # json: one object per line
+    # One summary line per request (status, range, bytes, storage time) instead
+    # of per-step logs. Sampled per route template as comma-separated
+    # "route=rate" overrides of the default rate; errors and requests slower
+    # than request_log_slow_seconds are always logged.
+    request_log_enabled: bool = True
+    request_log_sample_rate: float = 1.0
+    request_log_route_rates: str = (
+        "/clips/{month}/{filename:path}/thumbnail=0.05,"
+        "/clips/{month}/{filename:path}/hls/{asset}=0.05,"
+        "/sprites/{month}/{version}/{sheet}.webp=0.05,"
+        "/static=0"
+    )
+    request_log_slow_seconds: float = 1.0
+    # Prometheus metrics at /metrics (request, storage, query and cache timings)
+    metrics_enabled: bool = True
 
     # Optional Configuration
     clips_per_page: int = 24
     use_proxy_videos: bool = True
     proxy_suffix: str = "_proxy"
 
+    # Thumbnail derivatives (smaller WebP/JPEG renditions for the grid)
+    thumbnail_render_on_demand: bool = True  # render missing ones with ffmpeg
+    ffmpeg_path: str = "ffmpeg"
+    thumbnail_sprites: bool = True  # render grid thumbnails from per-month sprite sheets
+    # Thumbnail bytes cache: memory bound, and an optional on-disk tier
+    thumbnail_cache_max_bytes: int = 64 * 1024 * 1024
+    thumbnail_cache_dir: str = ""  # empty disables the disk tier
+    thumbnail_cache_dir_max_bytes: int = 1024 * 1024 * 1024
+
+    # Custom metadata keys promoted to indexed columns and index-page filters,
+    # comma-separated as "key" or "key:type" (text, integer or real),
+    # e.g. "kills:integer,weapon,tournament"
+    promoted_fields: str = ""
+
+    # Storage metadata cache (existence, size, ETag, mtime)
+    stat_cache_enabled: bool = True
+    stat_cache_ttl: float = 60.0
+    stat_cache_negative_ttl: float = 10.0
+    stat_cache_max_entries: int = 10000
+
+    # Index query results and rendered grid pages, invalidated by the database
+    # generation counter; other processes' writes (the scripts) show up within
+    # query_cache_generation_interval seconds
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 500
+    query_cache_generation_interval: float = 1.0
+
     # Database Configuration
     database_path: str = "data/metadata.db"
+    database_mmap_size: int = 256 * 1024 * 1024  # bytes of the DB file to memory-map
+    database_cache_size_kb: int = 64 * 1024  # page cache per connection
+    database_busy_timeout_ms: int = 5000
 
 
 # Global settings instance
@@ -2,22 +2,178 @@
 
 import json
 import logging
+import re
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, Iterator, List, NamedTuple, Tuple
 
 from app.config import settings
+from app.metrics import timed_query
 
 logger = logging.getLogger(__name__)
 
+UPSERT_CLIP_SQL = """
+    INSERT INTO clips (clip_path, month, filename, proxy_path, has_thumbnail, discovered_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(clip_path) DO UPDATE SET
+        proxy_path = excluded.proxy_path,
+        has_thumbnail = excluded.has_thumbnail
+"""
+
+# Columns selected when returning clips joined with their full metadata
+# (clips aliased as c, clip_metadata as m); rows go through _clip_row_to_dict
+CLIP_WITH_METADATA_COLUMNS = """
+    c.clip_path,
+    c.month,
+    c.filename,
+    c.proxy_path,
+    c.has_thumbnail,
+    c.renditions,
+    CASE WHEN m.id IS NOT NULL THEN 1 ELSE 0 END as has_metadata,
+    m.version,
+    m.created_at,
+    m.updated_at,
+    m.map,
+    m.rating,
+    m.description,
+    m.clip_type,
+    m.extra_metadata
+"""
+
+# Full-text search row for a clip: rowid is clips.id. Extra metadata values are
+# flattened into one space-separated column.
+_SEARCH_INSERT_SQL = """
+    INSERT INTO clip_search (rowid, filename, description, map, clip_type, extra)
+    SELECT c.id, c.filename, m.description, m.map, m.clip_type,
+           (SELECT group_concat(value, ' ') FROM json_each(COALESCE(m.extra_metadata, '{{}}')))
+    FROM clips c
+    LEFT JOIN clip_metadata m ON m.clip_path = c.clip_path
+    WHERE {condition};
+"""
+
+# Replace a clip's search row from inside a trigger. This can't use INSERT OR
+# REPLACE: the conflict policy of the outer statement (e.g. an UPSERT) overrides
+# the one in the trigger body, so an existing row would abort the write.
+_SEARCH_ROW_SQL = """
+    DELETE FROM clip_search WHERE rowid IN (SELECT c.id FROM clips c WHERE {condition});
+""" + _SEARCH_INSERT_SQL
+
+# bm25 column weights: filename, description, map, clip_type, extra
+SEARCH_RANK = "bm25(clip_search, 1.0, 2.0, 2.0, 1.5, 1.0)"
+
+# Keys per IN (...) query when counting existing rows, well under SQLite's
+# host parameter limit (999 before 3.32)
+UPSERT_KEY_BATCH = 500
+
+UPSERT_METADATA_SQL = """
+    INSERT INTO clip_metadata
+        (clip_path, month, filename, version, created_at, updated_at,
+         map, rating, description, clip_type, extra_metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(clip_path) DO UPDATE SET
+        updated_at = excluded.updated_at,
+        map = excluded.map,
+        rating = excluded.rating,
+        description = excluded.description,
+        clip_type = excluded.clip_type,
+        extra_metadata = excluded.extra_metadata
+"""
+
+# Metadata keys that already have their own clip_metadata columns, and query
+# parameters used by the clip routes; neither can be a promoted field
+DEFAULT_METADATA_FIELDS = {'map', 'rating', 'description', 'clip_type'}
+RESERVED_FILTER_NAMES = DEFAULT_METADATA_FIELDS | {'q', 'page', 'cursor', 'min_rating'}
+
+PROMOTED_COLUMN_PREFIX = "promoted_"
+PROMOTED_FIELD_TYPES = {'text': 'TEXT', 'integer': 'INTEGER', 'real': 'REAL'}
+
+
+class PromotedField(NamedTuple):
+    """A custom metadata key mirrored into an indexed generated column."""
+
+    key: str
+    type: str
+
+    @property
+    def column(self) -> str:
+        """Name of the generated column in clip_metadata."""
+        return f"{PROMOTED_COLUMN_PREFIX}{self.key}"
+
+    @property
+    def numeric(self) -> bool:
+        """Whether the field filters by minimum value rather than equality."""
+        return self.type != 'text'
+
+    def coerce(self, value: Any) -> Any:
+        """Convert a filter value to the column type, raising ValueError if invalid."""
+        if self.type == 'integer':
+            return int(value)
+        if self.type == 'real':
+            return float(value)
+        return str(value)
+
+
+def parse_promoted_fields(spec: str) -> List[PromotedField]:
+    """
+    Parse the PROMOTED_FIELDS setting.
+
+    Args:
+        spec: Comma-separated "key" or "key:type" entries, e.g. "kills:integer,weapon"
+
+    Returns:
+        Promoted fields in the configured order
+
+    Raises:
+        ValueError: If a key isn't a plain identifier, is reserved, repeats, or
+            has an unknown type
+    """
+    fields: List[PromotedField] = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+
+        key, _, field_type = entry.partition(':')
+        key = key.strip()
+        field_type = field_type.strip().lower() or 'text'
+
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", key):
+            raise ValueError(f"Invalid promoted field name: {key!r}")
+        if key.lower() in RESERVED_FILTER_NAMES:
+            raise ValueError(f"Promoted field name is reserved: {key!r}")
+        if field_type not in PROMOTED_FIELD_TYPES:
+            raise ValueError(f"Unknown type {field_type!r} for promoted field {key!r}")
+        if any(field.key.lower() == key.lower() for field in fields):
+            raise ValueError(f"Duplicate promoted field: {key!r}")
+
+        fields.append(PromotedField(key, field_type))
+    return fields
+
 
 class MetadataDB:
     """SQLite database for storing clip metadata."""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, promoted_fields: Optional[str] = None):
         self.db_path = db_path or settings.database_path
+        self.promoted_fields = parse_promoted_fields(
+            settings.promoted_fields if promoted_fields is None else promoted_fields
+        )
+
+        # One persistent connection per thread, opened lazily
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Last generation read, and when to read it again (see generation())
+        self._generation: Optional[int] = None
+        self._generation_expires = 0.0
+        self._writes = 0
+        self._generation_lock = threading.Lock()
+
         self._ensure_db_exists()
 
     def _ensure_db_exists(self):
@@ -26,6 +182,10 @@ class MetadataDB:
         db_file.parent.mkdir(parents=True, exist_ok=True)
 
         with self._get_connection() as conn:
+            # WAL lets readers proceed while a writer commits; the setting is
+            # persistent, so it only needs to be applied once per database file
+            conn.execute("PRAGMA journal_mode=WAL")
+
             # Table for storing all discovered clips
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS clips (
@@ -35,10 +195,18 @@ class MetadataDB:
                     filename TEXT NOT NULL,
                     proxy_path TEXT,
                     has_thumbnail INTEGER DEFAULT 0,
-                    discovered_at TEXT NOT NULL
+                    discovered_at TEXT NOT NULL,
+
+                    -- HLS bitrate ladder as a JSON list of renditions
+                    renditions TEXT
                 )
             """)
+            self._ensure_clip_columns(conn)
             conn.execute("CREATE INDEX IF NOT EXISTS idx_clips_month ON clips(month)")
+            # Keyset pagination walks clips in (month, filename) order
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_clips_month_filename ON clips(month, filename)"
+            )
 
             # Table for clip metadata
             conn.execute("""
@@ -68,53 +236,282 @@ class MetadataDB:
             conn.execute("CREATE INDEX IF NOT EXISTS idx_rating ON clip_metadata(rating)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_map ON clip_metadata(map)")
 
+            self._ensure_promoted_columns(conn)
+            self._ensure_search_index(conn)
+            self._ensure_generation(conn)
+
             conn.commit()
 
-    @contextmanager
-    def _get_connection(self):
-        """Get a database connection with context manager."""
-        conn = sqlite3.connect(self.db_path)
+    def _ensure_clip_columns(self, conn: sqlite3.Connection):
+        """Add clips columns introduced after a database was first created."""
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(clips)")}
+        if 'renditions' not in existing:
+            conn.execute("ALTER TABLE clips ADD COLUMN renditions TEXT")
+
+    def _ensure_promoted_columns(self, conn: sqlite3.Connection):
+        """
+        Sync the promoted-field generated columns with the configuration.
+
+        Each promoted key becomes a VIRTUAL column computed from extra_metadata
+        with its own index. Building the index reads every existing row, so old
+        metadata is covered without rewriting it. Columns for keys that are no
+        longer configured, or whose type changed, are dropped.
+        """
+        existing = {
+            row['name']: row['type'].upper()
+            for row in conn.execute("PRAGMA table_xinfo(clip_metadata)")
+            # hidden 2/3 are generated columns; extra_metadata itself is never dropped
+            if row['hidden'] in (2, 3) and row['name'].startswith(PROMOTED_COLUMN_PREFIX)
+        }
+        wanted = {field.column: field for field in self.promoted_fields}
+
+        for column, column_type in existing.items():
+            field = wanted.get(column)
+            if field is None or PROMOTED_FIELD_TYPES[field.type] != column_type:
+                conn.execute(f"DROP INDEX IF EXISTS idx_{column}")
+                conn.execute(f"ALTER TABLE clip_metadata DROP COLUMN {column}")
+                logger.info(f"Dropped promoted metadata column {column}")
+
+        for column, field in wanted.items():
+            if column in existing and PROMOTED_FIELD_TYPES[field.type] == existing[column]:
+                continue
+
+            collation = " COLLATE NOCASE" if field.type == 'text' else ""
+            conn.execute(f"""
+                ALTER TABLE clip_metadata ADD COLUMN {column}
+                {PROMOTED_FIELD_TYPES[field.type]}{collation}
+                GENERATED ALWAYS AS (json_extract(extra_metadata, '$.{field.key}')) VIRTUAL
+            """)
+            logger.info(f"Promoted metadata field '{field.key}' to column {column}")
+
+        for column in wanted:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON clip_metadata({column})")
+
+    def _ensure_search_index(self, conn: sqlite3.Connection):
+        """Create the FTS5 search table and the triggers that keep it in sync."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clip_search'"
+        ).fetchone()
+
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clip_search USING fts5(
+                filename, description, map, clip_type, extra,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+
+        # Triggers are recreated on every start so changes to them take effect
+        conn.executescript(f"""
+            DROP TRIGGER IF EXISTS clips_search_insert;
+            DROP TRIGGER IF EXISTS clips_search_delete;
+            DROP TRIGGER IF EXISTS clip_metadata_search_insert;
+            DROP TRIGGER IF EXISTS clip_metadata_search_update;
+            DROP TRIGGER IF EXISTS clip_metadata_search_delete;
+
+            CREATE TRIGGER clips_search_insert AFTER INSERT ON clips BEGIN
+                {_SEARCH_ROW_SQL.format(condition="c.id = new.id")}
+            END;
+            CREATE TRIGGER clips_search_delete AFTER DELETE ON clips BEGIN
+                DELETE FROM clip_search WHERE rowid = old.id;
+            END;
+            CREATE TRIGGER clip_metadata_search_insert
+            AFTER INSERT ON clip_metadata BEGIN
+                {_SEARCH_ROW_SQL.format(condition="c.clip_path = new.clip_path")}
+            END;
+            CREATE TRIGGER clip_metadata_search_update
+            AFTER UPDATE ON clip_metadata BEGIN
+                {_SEARCH_ROW_SQL.format(condition="c.clip_path = new.clip_path")}
+            END;
+            CREATE TRIGGER clip_metadata_search_delete
+            AFTER DELETE ON clip_metadata BEGIN
+                {_SEARCH_ROW_SQL.format(condition="c.clip_path = old.clip_path")}
+            END;
+        """)
+
+        # Backfill when the index is created on an existing database
+        if not exists:
+            conn.execute(_SEARCH_INSERT_SQL.format(condition="1=1"))
+            logger.info("Built full-text search index")
+
+    def _ensure_generation(self, conn: sqlite3.Connection):
+        """
+        Create the generation counter and the triggers that bump it.
+
+        Every insert, update or delete of a clip or its metadata increments the
+        counter, including writes by the scripts in other processes, so caches
+        keyed by it never serve results from before a write.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS db_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO db_generation (id, value) VALUES (1, 0)")
+
+        for table in ('clips', 'clip_metadata'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                trigger = f"{table}_generation_{event.lower()}"
+                conn.executescript(f"""
+                    DROP TRIGGER IF EXISTS {trigger};
+                    CREATE TRIGGER {trigger} AFTER {event} ON {table} BEGIN
+                        UPDATE db_generation SET value = value + 1 WHERE id = 1;
+                    END;
+                """)
+
+    def generation(self) -> int:
+        """
+        Get the database generation, which changes whenever clips or metadata do.
+
+        The counter is read at most every query_cache_generation_interval
+        seconds, so cache lookups usually cost no query at all. Writes through
+        this instance are seen at once; writes by other processes (the scripts)
+        within that interval.
+        """
+        now = time.monotonic()
+        with self._generation_lock:
+            if self._generation is not None and now < self._generation_expires:
+                return self._generation
+            writes = self._writes
+
+        with self._get_connection() as conn:
+            value: int = conn.execute("SELECT value FROM db_generation WHERE id = 1").fetchone()[0]
+
+        with self._generation_lock:
+            # A write that committed meanwhile may not be in the value read
+            if self._writes == writes:
+                self._generation = value
+                self._generation_expires = now + settings.query_cache_generation_interval
+        return value
+
+    def _wrote(self):
+        """Note a committed write, so the next generation() reads the counter again."""
+        with self._generation_lock:
+            self._writes += 1
+            self._generation = None
+
+    @timed_query
+    def rebuild_search_index(self):
+        """Rebuild the full-text search index from the clips and metadata tables."""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM clip_search")
+            conn.execute(_SEARCH_INSERT_SQL.format(condition="1=1"))
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new database connection."""
+        # check_same_thread is off only so close() can run from another thread;
+        # each connection is otherwise used by the thread that opened it
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(settings.database_mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={-int(settings.database_cache_size_kb)}")
+        conn.execute(f"PRAGMA busy_timeout={int(settings.database_busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Get this thread's persistent database connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+
         try:
             yield conn
-        finally:
-            conn.close()
+        except Exception:
+            # Don't leave a half-finished transaction open on a reused connection
+            conn.rollback()
+            raise
+
+    def close(self):
+        """Close all per-thread connections."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
     # ==================== Clips Table Methods ====================
 
+    @timed_query
     def add_clip(self, month: str, filename: str, proxy_path: str, has_thumbnail: bool = False) -> bool:
         """Add or update a clip in the database."""
         clip_path = f"{month}/{filename}"
         now = datetime.utcnow().isoformat()
 
         with self._get_connection() as conn:
-            conn.execute("""
-                INSERT INTO clips (clip_path, month, filename, proxy_path, has_thumbnail, discovered_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(clip_path) DO UPDATE SET
-                    proxy_path = excluded.proxy_path,
-                    has_thumbnail = excluded.has_thumbnail
-            """, (clip_path, month, filename, proxy_path, 1 if has_thumbnail else 0, now))
+            conn.execute(
+                UPSERT_CLIP_SQL,
+                (clip_path, month, filename, proxy_path, 1 if has_thumbnail else 0, now)
+            )
             conn.commit()
+            self._wrote()
         return True
 
+    @timed_query
+    def add_clips_bulk(self, clips: Iterable[Tuple[str, str, str, bool]]) -> Dict[str, int]:
+        """
+        Add or update many clips in a single transaction.
+
+        Args:
+            clips: (month, filename, proxy_path, has_thumbnail) tuples
+
+        Returns:
+            Dict with 'inserted' and 'updated' counts
+        """
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (f"{month}/{filename}", month, filename, proxy_path, 1 if has_thumbnail else 0, now)
+            for month, filename, proxy_path, has_thumbnail in clips
+        ]
+        return self._upsert_bulk("clips", UPSERT_CLIP_SQL, rows)
+
+    def _upsert_bulk(self, table: str, sql: str, rows: List[tuple]) -> Dict[str, int]:
+        """
+        Run an upsert for every row in one transaction and count new rows.
+
+        Rows are keyed by clip_path, their first column; when a key repeats,
+        its last row wins. The keys that already exist are counted inside the
+        same write transaction as the upsert, so a concurrent writer can't
+        skew the counts.
+        """
+        if not rows:
+            return {'inserted': 0, 'updated': 0}
+
+        rows = list({row[0]: row for row in rows}.values())
+        keys = [row[0] for row in rows]
+        with self._get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = 0
+            for i in range(0, len(keys), UPSERT_KEY_BATCH):
+                batch = keys[i:i + UPSERT_KEY_BATCH]
+                placeholders = ", ".join("?" * len(batch))
+                existing += conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE clip_path IN ({placeholders})", batch
+                ).fetchone()[0]
+            conn.executemany(sql, rows)
+            conn.commit()
+            self._wrote()
+
+        return {'inserted': len(keys) - existing, 'updated': existing}
+
+    @timed_query
     def get_clips_for_month(
         self,
         month: str,
         clip_type: Optional[str] = None,
-        min_rating: Optional[int] = None
+        min_rating: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """Get all clips for a given month with their metadata status."""
         conditions = ["c.month = ?"]
         params = [month]
 
-        if clip_type:
-            conditions.append("m.clip_type = ?")
-            params.append(clip_type)
-
-        if min_rating is not None:
-            conditions.append("m.rating >= ?")
-            params.append(min_rating)
+        self._add_filters(conditions, params, clip_type, min_rating, filters)
 
         where_clause = " AND ".join(conditions)
 
@@ -138,6 +535,197 @@ class MetadataDB:
             """, params)
             return [dict(row) for row in cursor.fetchall()]
 
+    @timed_query
+    def get_clips_page(
+        self,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 24,
+        clip_type: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of clips, newest month first, with full metadata.
+
+        Uses keyset pagination on (month, filename) so every page costs the same
+        regardless of how deep it is, and joins the metadata in the same query.
+
+        Args:
+            after: (month, filename) of the last clip on the previous page
+            limit: Maximum number of clips to return
+            clip_type: Only include clips with this clip_type
+            min_rating: Only include clips rated at least this
+            filters: Promoted field filters, see _add_filters
+
+        Returns:
+            Clip rows; each has a 'metadata' key with the metadata dict or None
+        """
+        conditions = []
+        params: List[Any] = []
+
+        if after is not None:
+            conditions.append("(c.month, c.filename) < (?, ?)")
+            params.extend(after)
+
+        self._add_filters(conditions, params, clip_type, min_rating, filters)
+
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        params.append(limit)
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT {CLIP_WITH_METADATA_COLUMNS}
+                FROM clips c
+                LEFT JOIN clip_metadata m ON c.clip_path = m.clip_path
+                WHERE {where_clause}
+                ORDER BY c.month DESC, c.filename DESC
+                LIMIT ?
+            """, params)
+            return [self._clip_row_to_dict(row) for row in cursor.fetchall()]
+
+    @timed_query
+    def search_clips(
+        self,
+        query: str,
+        limit: int = 24,
+        offset: int = 0,
+        clip_type: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over clip filenames and metadata, best matches first.
+
+        Every word in the query must match (as a prefix) in any indexed field:
+        filename, description, map, clip_type or any extra metadata value.
+
+        Args:
+            query: Free-text search query
+            limit: Maximum number of clips to return
+            offset: Number of ranked results to skip
+            clip_type: Only include clips with this clip_type
+            min_rating: Only include clips rated at least this
+            filters: Promoted field filters, see _add_filters
+
+        Returns:
+            Clip rows in the same shape as get_clips_page
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        conditions = ["clip_search MATCH ?"]
+        params: List[Any] = [match]
+
+        self._add_filters(conditions, params, clip_type, min_rating, filters)
+
+        where_clause = " AND ".join(conditions)
+        params.extend([limit, offset])
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT {CLIP_WITH_METADATA_COLUMNS}
+                FROM clip_search
+                JOIN clips c ON c.id = clip_search.rowid
+                LEFT JOIN clip_metadata m ON c.clip_path = m.clip_path
+                WHERE {where_clause}
+                ORDER BY {SEARCH_RANK}
+                LIMIT ? OFFSET ?
+            """, params)
+            return [self._clip_row_to_dict(row) for row in cursor.fetchall()]
+
+    def _add_filters(
+        self,
+        conditions: List[str],
+        params: List[Any],
+        clip_type: Optional[str],
+        min_rating: Optional[int],
+        filters: Optional[Dict[str, Any]]
+    ):
+        """
+        Append the metadata filter conditions (clip_metadata aliased as m).
+
+        Args:
+            conditions: WHERE conditions to extend
+            params: Query parameters to extend
+            clip_type: Only include clips with this clip_type
+            min_rating: Only include clips rated at least this
+            filters: Promoted field key -> value; text fields match exactly
+                (case-insensitive), numeric fields are a minimum
+
+        Raises:
+            ValueError: If a filter key isn't a promoted field or its value
+                doesn't match the field type
+        """
+        if clip_type:
+            conditions.append("m.clip_type = ?")
+            params.append(clip_type)
+
+        if min_rating is not None:
+            conditions.append("m.rating >= ?")
+            params.append(min_rating)
+
+        promoted = {field.key: field for field in self.promoted_fields}
+        for key, value in (filters or {}).items():
+            field = promoted.get(key)
+            if field is None:
+                raise ValueError(f"Unknown promoted field: {key}")
+            operator = ">=" if field.numeric else "="
+            conditions.append(f"m.{field.column} {operator} ?")
+            params.append(field.coerce(value))
+
+    @timed_query
+    def get_promoted_values(self, key: str, limit: int = 100) -> List[Any]:
+        """Get the distinct values of a promoted field, read from its index."""
+        field = next((field for field in self.promoted_fields if field.key == key), None)
+        if field is None:
+            raise ValueError(f"Unknown promoted field: {key}")
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT DISTINCT {field.column} AS value FROM clip_metadata
+                WHERE {field.column} IS NOT NULL
+                ORDER BY {field.column}
+                LIMIT ?
+            """, (limit,))
+            return [row['value'] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn free text into an FTS5 query of quoted prefix terms."""
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{word}"*' for word in words)
+
+    @timed_query
+    def get_month_counts(
+        self,
+        months: List[str],
+        clip_type: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """Get the number of clips per month for the given months and filters."""
+        if not months:
+            return {}
+
+        conditions = [f"c.month IN ({', '.join('?' for _ in months)})"]
+        params: List[Any] = list(months)
+
+        self._add_filters(conditions, params, clip_type, min_rating, filters)
+
+        where_clause = " AND ".join(conditions)
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT c.month, COUNT(*) as clip_count
+                FROM clips c
+                LEFT JOIN clip_metadata m ON c.clip_path = m.clip_path
+                WHERE {where_clause}
+                GROUP BY c.month
+            """, params)
+            return {row['month']: row['clip_count'] for row in cursor.fetchall()}
+
+    @timed_query
     def get_all_months(self) -> List[str]:
         """Get all months that have clips, sorted descending."""
         with self._get_connection() as conn:
@@ -146,6 +734,7 @@ class MetadataDB:
             """)
             return [row['month'] for row in cursor.fetchall()]
 
+    @timed_query
     def update_clip_thumbnail(self, clip_path: str, has_thumbnail: bool) -> bool:
         """Update thumbnail status for a clip."""
         with self._get_connection() as conn:
@@ -153,8 +742,60 @@ class MetadataDB:
                 UPDATE clips SET has_thumbnail = ? WHERE clip_path = ?
             """, (1 if has_thumbnail else 0, clip_path))
             conn.commit()
+            self._wrote()
         return True
 
+    @timed_query
+    def update_clip_renditions_bulk(
+        self, items: Iterable[Tuple[str, List[Dict[str, Any]]]]
+    ) -> int:
+        """
+        Record the HLS bitrate ladder of many clips in a single transaction.
+
+        Args:
+            items: (clip_path, renditions) tuples, renditions as Rendition.model_dump()
+                dicts; an empty list clears the ladder
+
+        Returns:
+            Number of clips updated
+        """
+        rows = [
+            (json.dumps(renditions) if renditions else None, clip_path)
+            for clip_path, renditions in items
+        ]
+        if not rows:
+            return 0
+
+        with self._get_connection() as conn:
+            cursor = conn.executemany(
+                "UPDATE clips SET renditions = ? WHERE clip_path = ?", rows
+            )
+            conn.commit()
+            self._wrote()
+            return cursor.rowcount
+
+    @timed_query
+    def get_clip_renditions(self, clip_path: str) -> List[Dict[str, Any]]:
+        """Get the recorded HLS bitrate ladder of a clip, lowest rendition first."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT renditions FROM clips WHERE clip_path = ?", (clip_path,)
+            ).fetchone()
+        if not row or not row['renditions']:
+            return []
+        renditions: List[Dict[str, Any]] = json.loads(row['renditions'])
+        return renditions
+
+    @timed_query
+    def get_clip_paths_for_month(self, month: str) -> set:
+        """Get set of clip paths already in the database for a given month."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT clip_path FROM clips WHERE month = ?", (month,)
+            )
+            return {row['clip_path'] for row in cursor.fetchall()}
+
+    @timed_query
     def clip_exists(self, clip_path: str) -> bool:
         """Check if a clip exists in the database."""
         with self._get_connection() as conn:
@@ -165,6 +806,7 @@ class MetadataDB:
 
     # ==================== Metadata Table Methods ====================
 
+    @timed_query
     def get_metadata(self, clip_path: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a clip by its path."""
         with self._get_connection() as conn:
@@ -179,8 +821,32 @@ class MetadataDB:
 
             return self._row_to_dict(row)
 
+    @timed_query
     def save_metadata(self, clip_path: str, metadata: Dict[str, Any]) -> bool:
         """Save or update metadata for a clip."""
+        with self._get_connection() as conn:
+            conn.execute(UPSERT_METADATA_SQL, self._metadata_row(clip_path, metadata))
+            conn.commit()
+            self._wrote()
+
+        return True
+
+    @timed_query
+    def save_metadata_bulk(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Save or update metadata for many clips in a single transaction.
+
+        Args:
+            items: (clip_path, metadata) tuples, metadata as accepted by save_metadata
+
+        Returns:
+            Dict with 'inserted' and 'updated' counts
+        """
+        rows = [self._metadata_row(clip_path, metadata) for clip_path, metadata in items]
+        return self._upsert_bulk("clip_metadata", UPSERT_METADATA_SQL, rows)
+
+    def _metadata_row(self, clip_path: str, metadata: Dict[str, Any]) -> tuple:
+        """Build the clip_metadata row parameters for UPSERT_METADATA_SQL."""
         # Extract month and filename from clip_path
         parts = clip_path.split('/', 1)
         month = parts[0] if len(parts) > 0 else ""
@@ -196,8 +862,7 @@ class MetadataDB:
         clip_type = user_metadata.get('clip_type')
 
         # Store remaining fields in extra_metadata
-        default_fields = {'map', 'rating', 'description', 'clip_type'}
-        extra = {k: v for k, v in user_metadata.items() if k not in default_fields}
+        extra = {k: v for k, v in user_metadata.items() if k not in DEFAULT_METADATA_FIELDS}
 
         now = datetime.utcnow().isoformat()
         version = metadata.get('version', '1.0')
@@ -211,27 +876,12 @@ class MetadataDB:
             except (ValueError, TypeError):
                 rating = None
 
-        with self._get_connection() as conn:
-            conn.execute("""
-                INSERT INTO clip_metadata
-                    (clip_path, month, filename, version, created_at, updated_at,
-                     map, rating, description, clip_type, extra_metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(clip_path) DO UPDATE SET
-                    updated_at = excluded.updated_at,
-                    map = excluded.map,
-                    rating = excluded.rating,
-                    description = excluded.description,
-                    clip_type = excluded.clip_type,
-                    extra_metadata = excluded.extra_metadata
-            """, (
-                clip_path, month, filename, version, created_at, updated_at,
-                map_val, rating, description, clip_type, json.dumps(extra)
-            ))
-            conn.commit()
-
-        return True
+        return (
+            clip_path, month, filename, version, created_at, updated_at,
+            map_val, rating, description, clip_type, json.dumps(extra)
+        )
 
+    @timed_query
     def delete_metadata(self, clip_path: str) -> bool:
         """Delete metadata for a clip."""
         with self._get_connection() as conn:
@@ -240,8 +890,10 @@ class MetadataDB:
                 (clip_path,)
             )
             conn.commit()
+            self._wrote()
             return cursor.rowcount > 0
 
+    @timed_query
     def get_clips_with_metadata(self, month: Optional[str] = None) -> List[str]:
         """Get list of clip paths that have metadata."""
         with self._get_connection() as conn:
@@ -255,6 +907,7 @@ class MetadataDB:
 
             return [row['clip_path'] for row in cursor.fetchall()]
 
+    @timed_query
     def get_metadata_filenames_for_month(self, month: str) -> set:
         """Get set of filenames that have metadata for a given month."""
         with self._get_connection() as conn:
@@ -264,6 +917,7 @@ class MetadataDB:
             )
             return {row['filename'] for row in cursor.fetchall()}
 
+    @timed_query
     def search_metadata(
         self,
         query: Optional[str] = None,
@@ -277,9 +931,14 @@ class MetadataDB:
         conditions = []
         params = []
 
-        if query:
-            conditions.append("(filename LIKE ? OR description LIKE ? OR map LIKE ?)")
-            params.extend([f"%{query}%", f"%{query}%", f"%{query}%"])
+        match = self._fts_query(query) if query else ""
+        if match:
+            conditions.append("""clip_path IN (
+                SELECT c.clip_path FROM clip_search
+                JOIN clips c ON c.id = clip_search.rowid
+                WHERE clip_search MATCH ?
+            )""")
+            params.append(match)
 
         if clip_type:
             conditions.append("clip_type = ?")
@@ -307,6 +966,15 @@ class MetadataDB:
             )
             return [self._row_to_dict(row) for row in cursor.fetchall()]
 
+    def _clip_row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a CLIP_WITH_METADATA_COLUMNS row to a clip dictionary."""
+        clip = {key: row[key] for key in (
+            'clip_path', 'month', 'filename', 'proxy_path', 'has_thumbnail', 'has_metadata'
+        )}
+        clip['renditions'] = json.loads(row['renditions']) if row['renditions'] else []
+        clip['metadata'] = self._row_to_dict(row) if row['has_metadata'] else None
+        return clip
+
     def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         """Convert a database row to a metadata dictionary."""
         extra = json.loads(row['extra_metadata'] or '{}')
@@ -5,18 +5,50 @@ import io
 import json
 import logging
 import os
+import stat
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
-from urllib.parse import quote
+from typing import List, Optional, cast
+from urllib.parse import unquote, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from webdav3.client import Client
 
+from app.cache import MISSING, TTLCache, stat_cache
 from app.config import settings
+from app.metrics import STORAGE_READ_BYTES, time_storage_operation
+from app.webdav import PROPFIND_BODY, build_url, parse_propfind, webdav_path
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class FileStat:
+    """Storage metadata for a single file or directory."""
+
+    size: int
+    mtime: Optional[float] = None
+    etag: Optional[str] = None
+    is_dir: bool = False
+
+
+@dataclass(frozen=True)
+class DirEntry:
+    """A single entry returned by FileClient.scandir."""
+
+    name: str
+    is_dir: bool
+    size: int = 0
+    mtime: Optional[float] = None
+    etag: Optional[str] = None
+
+
+def local_etag(stat_result: os.stat_result) -> str:
+    """Build a strong ETag for a local file from its mtime and size."""
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
 class FileClient(abc.ABC):
     """Abstract interface for file operations."""
 
@@ -32,13 +64,19 @@ class FileClient(abc.ABC):
 
         if settings.storage_backend == "local":
             logger.info(f"Using LOCAL filesystem backend")
-            return LocalFileClient()
+            client = LocalFileClient()
         elif settings.storage_backend == "webdav":
             logger.info(f"Using WEBDAV backend")
-            return WebDAVFileClient()
+            client = WebDAVFileClient()
         else:
             raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
 
+        # Instrument the backend itself, so cache hits don't dilute its latency
+        client = InstrumentedFileClient(client, settings.storage_backend)
+        if settings.stat_cache_enabled:
+            return CachingFileClient(client)
+        return client
+
     @abc.abstractmethod
     def list_directories(self, path: str = "") -> List[str]:
         """List directories in a given path."""
@@ -51,6 +89,15 @@ class FileClient(abc.ABC):
         """List files matching pattern in a given path."""
         pass
 
+    @abc.abstractmethod
+    def scandir(self, path: str = "") -> List[DirEntry]:
+        """
+        List a directory with name, type, size, mtime and ETag for every entry.
+
+        Raises FileNotFoundError if the directory doesn't exist.
+        """
+        pass
+
     @abc.abstractmethod
     def read_file(self, path: str) -> bytes:
         """Read file content."""
@@ -81,6 +128,17 @@ class FileClient(abc.ABC):
         """Ensure a directory exists, creating it if necessary."""
         pass
 
+    def stat(self, path: str) -> Optional[FileStat]:
+        """
+        Get size, mtime and ETag for a path, or None if it doesn't exist.
+
+        Default implementation uses file_exists and get_file_size.
+        Subclasses may override to fetch everything in one lookup.
+        """
+        if not self.file_exists(path):
+            return None
+        return FileStat(size=self.get_file_size(path))
+
     def stream_file_range(
         self, path: str, start: int, end: int, chunk_size: int = 256 * 1024
     ):
@@ -184,13 +242,13 @@ class FileClient(abc.ABC):
         """
         metadata_path = self.get_metadata_path(video_path)
         if not self.file_exists(metadata_path):
-            logger.debug(f"No metadata found for {video_path}")
+            logger.debug("No metadata found for %s", video_path)
             return None
 
         try:
             content = self.read_file(metadata_path)
             metadata = json.loads(content.decode("utf-8"))
-            logger.debug(f"Loaded metadata for {video_path}")
+            logger.debug("Loaded metadata for %s", video_path)
             return metadata
         except Exception as e:
             logger.error(f"Error reading metadata for {video_path}: {e}")
@@ -226,38 +284,30 @@ class WebDAVFileClient(FileClient):
                 "webdav_password": settings.webdav_password,
             }
         )
+        self.client.timeout = settings.webdav_timeout
         self.root_path = settings.webdav_root_path
+
+        # Share one pooled keep-alive session between webdav3 operations and
+        # our own ranged GETs, so seeks don't pay a new TCP+TLS handshake
+        self.session = self.client.session
+        self.session.auth = (settings.webdav_username, settings.webdav_password)
+        adapter = HTTPAdapter(
+            pool_connections=settings.webdav_pool_connections,
+            pool_maxsize=settings.webdav_pool_maxsize,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         logger.info(f"Initialized WebDAV client")
         logger.info(f"  URL: {settings.webdav_url}")
         logger.info(f"  Username: {settings.webdav_username}")
         logger.info(f"  Root path: '{settings.webdav_root_path}'")
+        logger.info(f"  Pool size: {settings.webdav_pool_maxsize}")
 
     def _full_path(self, path: str) -> str:
         """Convert relative path to full WebDAV path."""
-        original_path = path
-        if path.startswith("/"):
-            path = path[1:]
-
-        # Handle empty root_path
-        if not self.root_path or self.root_path == "/":
-            result = path if path else "/"
-            logger.debug(
-                f"Path conversion: '{original_path}' -> '{result}' (root_path empty or /)"
-            )
-            return result
-
-        # Ensure root_path doesn't end with / unless it's just /
-        root = self.root_path.rstrip("/")
-
-        # Combine root and path
-        if path:
-            result = f"{root}/{path}"
-        else:
-            result = root
-
-        logger.debug(
-            f"Path conversion: '{original_path}' + root '{self.root_path}' -> '{result}'"
-        )
+        result = webdav_path(self.root_path, path)
+        logger.debug("Path conversion: '%s' + root '%s' -> '%s'", path, self.root_path, result)
         return result
 
     def list_directories(self, path: str = "") -> List[str]:
@@ -266,7 +316,7 @@ class WebDAVFileClient(FileClient):
         logger.info(f"Listing directories at path='{path}' -> full_path='{full_path}'")
         try:
             items = self.client.list(full_path)
-            logger.debug(f"Raw items from WebDAV: {items}")
+            logger.debug("Raw items from WebDAV: %s", items)
             # Filter directories (end with /) and remove current directory
             dirs = [
                 item.rstrip("/")
@@ -289,7 +339,7 @@ class WebDAVFileClient(FileClient):
         logger.info(f"Listing files at path='{path}' -> full_path='{full_path}'")
         try:
             items = self.client.list(full_path)
-            logger.debug(f"Raw items from WebDAV: {items}")
+            logger.debug("Raw items from WebDAV: %s", items)
             # Filter files (don't end with /)
             files = [item for item in items if not item.endswith("/") and item != "./"]
 
@@ -302,7 +352,7 @@ class WebDAVFileClient(FileClient):
             if exclude_proxy:
                 proxy_suffix = f"{settings.proxy_suffix}.mp4"
                 files = [f for f in files if not f.endswith(proxy_suffix)]
-                logger.debug(f"Excluded proxy files with suffix '{proxy_suffix}'")
+                logger.debug("Excluded proxy files with suffix '%s'", proxy_suffix)
 
             logger.info(
                 f"Found {len(files)} files in '{full_path}': {files[:5]}{'...' if len(files) > 5 else ''}"
@@ -315,6 +365,43 @@ class WebDAVFileClient(FileClient):
             logger.error(f"  Pattern: '{pattern}'")
             return []
 
+    def scandir(self, path: str = "") -> List[DirEntry]:
+        """List a directory with a single Depth: 1 PROPFIND."""
+        full_path = self._full_path(path)
+        url = self._url(full_path).rstrip("/") + "/"
+        try:
+            response = self.session.request(
+                "PROPFIND",
+                url,
+                data=PROPFIND_BODY,
+                headers={"Depth": "1", "Content-Type": "application/xml"},
+                timeout=settings.webdav_timeout,
+            )
+            if response.status_code == 404:
+                raise FileNotFoundError(full_path)
+            response.raise_for_status()
+
+            # The multistatus includes the directory itself; skip it
+            own_href = unquote(urlparse(url).path).rstrip("/")
+            entries = [
+                DirEntry(
+                    name=entry.href.rstrip("/").rsplit("/", 1)[-1],
+                    is_dir=entry.is_dir,
+                    size=entry.size,
+                    mtime=entry.mtime,
+                    etag=entry.etag,
+                )
+                for entry in parse_propfind(response.content)
+                if entry.href.rstrip("/") != own_href
+            ]
+            logger.debug("Scanned %s entries in '%s'", len(entries), full_path)
+            return entries
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Error scanning directory '{full_path}': {e}")
+            raise
+
     def read_file(self, path: str) -> bytes:
         """Read file content from WebDAV."""
         full_path = self._full_path(path)
@@ -322,7 +409,7 @@ class WebDAVFileClient(FileClient):
             buffer = io.BytesIO()
             self.client.download_from(buffer, full_path)
             content = buffer.getvalue()
-            logger.debug(f"Read {len(content)} bytes from {full_path}")
+            logger.debug("Read %s bytes from %s", len(content), full_path)
             return content
         except Exception as e:
             logger.error(f"Error reading file {full_path}: {e}")
@@ -360,7 +447,7 @@ class WebDAVFileClient(FileClient):
         full_path = self._full_path(path)
         try:
             exists = self.client.check(full_path)
-            logger.debug(f"File {full_path} exists: {exists}")
+            logger.debug("File %s exists: %s", full_path, exists)
             return exists
         except Exception as e:
             logger.error(f"Error checking file existence {full_path}: {e}")
@@ -372,48 +459,114 @@ class WebDAVFileClient(FileClient):
         try:
             info = self.client.info(full_path)
             size = int(info.get("size", 0))
-            logger.debug(f"File {full_path} size: {size} bytes")
+            logger.debug("File %s size: %s bytes", full_path, size)
             return size
         except Exception as e:
             logger.error(f"Error getting file size {full_path}: {e}")
             raise
 
+    def _url(self, full_path: str) -> str:
+        """Build the absolute URL for a full WebDAV path."""
+        return build_url(settings.webdav_url, full_path)
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata with a single Depth: 0 PROPFIND."""
+        full_path = self._full_path(path)
+        try:
+            response = self.session.request(
+                "PROPFIND",
+                self._url(full_path),
+                data=PROPFIND_BODY,
+                headers={"Depth": "0", "Content-Type": "application/xml"},
+                timeout=settings.webdav_timeout,
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+
+            entries = parse_propfind(response.content)
+            if not entries:
+                return None
+            entry = entries[0]
+            return FileStat(
+                size=entry.size, mtime=entry.mtime, etag=entry.etag, is_dir=entry.is_dir
+            )
+        except Exception as e:
+            logger.error(f"Error getting file info {full_path}: {e}")
+            raise
+
     def read_file_range(self, path: str, start: int, end: int) -> bytes:
         """Read a range of bytes from WebDAV file."""
         full_path = self._full_path(path)
         try:
             # WebDAV supports HTTP Range requests
-            # Construct URL properly - the webdav_url already includes the base path
-            # e.g., https://drive.shkhr.ovh/remote.php/dav/files/replay-hub/
-            # So we just need to append the full_path
-            base_url = settings.webdav_url.rstrip("/")
-            # URL encode the path components but not the slashes
-            encoded_path = "/".join(
-                quote(part, safe="") for part in full_path.split("/")
-            )
-            url = f"{base_url}/{encoded_path}"
-
+            url = self._url(full_path)
             headers = {"Range": f"bytes={start}-{end - 1}"}  # HTTP range is inclusive
 
-            logger.debug(f"WebDAV Range Request URL: {url}")
+            logger.debug("WebDAV Range Request URL: %s", url)
 
-            response = requests.get(
-                url,
-                headers=headers,
-                auth=(settings.webdav_username, settings.webdav_password),
-                stream=True,
+            response = self.session.get(
+                url, headers=headers, timeout=settings.webdav_timeout
             )
             response.raise_for_status()
 
-            content = response.content
+            content: bytes = response.content
             logger.debug(
-                f"Read {len(content)} bytes (range {start}-{end}) from {full_path}"
+                "Read %s bytes (range %s-%s) from %s", len(content), start, end, full_path
             )
             return content
         except Exception as e:
             logger.error(f"Error reading range {start}-{end} from {full_path}: {e}")
             raise
 
+    def stream_file_range(
+        self, path: str, start: int, end: int, chunk_size: int = 256 * 1024
+    ):
+        """
+        Generator that streams a range of bytes from a WebDAV file in chunks.
+
+        Issues a single ranged GET over the pooled session and forwards the body
+        incrementally, instead of one request per chunk.
+
+        Args:
+            path: Relative path to file
+            start: Start byte position (inclusive)
+            end: End byte position (inclusive)
+            chunk_size: Size of chunks to yield (default 256KB)
+
+        Yields:
+            Chunks of bytes from the file
+        """
+        full_path = self._full_path(path)
+        url = self._url(full_path)
+        headers = {"Range": f"bytes={start}-{end}"}
+        try:
+            with self.session.get(
+                url, headers=headers, stream=True, timeout=settings.webdav_timeout
+            ) as response:
+                response.raise_for_status()
+
+                # A server that ignores Range answers 200 with the whole file
+                skip = start if response.status_code == 200 else 0
+                bytes_remaining = end - start + 1
+
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+                        chunk = chunk[skip:]
+                        skip = 0
+                    if len(chunk) > bytes_remaining:
+                        chunk = chunk[:bytes_remaining]
+                    yield chunk
+                    bytes_remaining -= len(chunk)
+                    if bytes_remaining <= 0:
+                        break
+        except Exception as e:
+            logger.error(f"Error streaming range {start}-{end} from {full_path}: {e}")
+            raise
+
 
 class LocalFileClient(FileClient):
     """Local filesystem implementation of file client."""
@@ -444,7 +597,7 @@ class LocalFileClient(FileClient):
             path = path[1:]
 
         full_path = self.root_path / path
-        logger.debug(f"Path conversion: '{path}' -> '{full_path}'")
+        logger.debug("Path conversion: '%s' -> '%s'", path, full_path)
         return full_path
 
     def list_directories(self, path: str = "") -> List[str]:
@@ -486,7 +639,7 @@ class LocalFileClient(FileClient):
             if exclude_proxy:
                 proxy_suffix = f"{settings.proxy_suffix}.mp4"
                 files = [f for f in files if not f.endswith(proxy_suffix)]
-                logger.debug(f"Excluded proxy files with suffix '{proxy_suffix}'")
+                logger.debug("Excluded proxy files with suffix '%s'", proxy_suffix)
 
             logger.info(
                 f"Found {len(files)} files in '{full_path}': {files[:5]}{'...' if len(files) > 5 else ''}"
@@ -496,12 +649,32 @@ class LocalFileClient(FileClient):
             logger.error(f"Error listing files in '{full_path}': {e}")
             return []
 
+    def scandir(self, path: str = "") -> List[DirEntry]:
+        """List a directory with os.scandir."""
+        full_path = self._full_path(path)
+        entries = []
+        with os.scandir(full_path) as it:
+            for entry in it:
+                is_dir = entry.is_dir()
+                stat_result = entry.stat()
+                entries.append(
+                    DirEntry(
+                        name=entry.name,
+                        is_dir=is_dir,
+                        size=0 if is_dir else stat_result.st_size,
+                        mtime=stat_result.st_mtime,
+                        etag=None if is_dir else local_etag(stat_result),
+                    )
+                )
+        logger.debug("Scanned %s entries in '%s'", len(entries), full_path)
+        return entries
+
     def read_file(self, path: str) -> bytes:
         """Read file content from local filesystem."""
         full_path = self._full_path(path)
         try:
             content = full_path.read_bytes()
-            logger.debug(f"Read {len(content)} bytes from {full_path}")
+            logger.debug("Read %s bytes from %s", len(content), full_path)
             return content
         except Exception as e:
             logger.error(f"Error reading file {full_path}: {e}")
@@ -512,7 +685,7 @@ class LocalFileClient(FileClient):
         full_path = self._full_path(path)
         try:
             full_path.mkdir(parents=True, exist_ok=True)
-            logger.debug(f"Ensured directory exists: {full_path}")
+            logger.debug("Ensured directory exists: %s", full_path)
         except Exception as e:
             logger.error(f"Error ensuring directory {full_path}: {e}")
             raise
@@ -534,7 +707,7 @@ class LocalFileClient(FileClient):
         """Check if file exists in local filesystem."""
         full_path = self._full_path(path)
         exists = full_path.exists() and full_path.is_file()
-        logger.debug(f"File {full_path} exists: {exists}")
+        logger.debug("File %s exists: %s", full_path, exists)
         return exists
 
     def get_file_size(self, path: str) -> int:
@@ -542,12 +715,28 @@ class LocalFileClient(FileClient):
         full_path = self._full_path(path)
         try:
             size = full_path.stat().st_size
-            logger.debug(f"File {full_path} size: {size} bytes")
+            logger.debug("File %s size: %s bytes", full_path, size)
             return size
         except Exception as e:
             logger.error(f"Error getting file size {full_path}: {e}")
             raise
 
+    def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata from the local filesystem."""
+        full_path = self._full_path(path)
+        try:
+            stat_result = full_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        is_dir = stat.S_ISDIR(stat_result.st_mode)
+        return FileStat(
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            etag=None if is_dir else local_etag(stat_result),
+            is_dir=is_dir,
+        )
+
     def read_file_range(self, path: str, start: int, end: int) -> bytes:
         """Read a range of bytes from local file."""
         full_path = self._full_path(path)
@@ -556,7 +745,7 @@ class LocalFileClient(FileClient):
                 f.seek(start)
                 content = f.read(end - start)
             logger.debug(
-                f"Read {len(content)} bytes (range {start}-{end}) from {full_path}"
+                "Read %s bytes (range %s-%s) from %s", len(content), start, end, full_path
             )
             return content
         except Exception as e:
@@ -597,3 +786,185 @@ class LocalFileClient(FileClient):
         except Exception as e:
             logger.error(f"Error streaming range {start}-{end} from {full_path}: {e}")
             raise
+
+
+class CachingFileClient(FileClient):
+    """
+    File client wrapper that caches existence, size, ETag and mtime lookups.
+
+    Missing paths are cached too (for a shorter TTL), and writes invalidate the
+    affected path, so repeated range requests for the same clip do no metadata
+    I/O at all.
+    """
+
+    def __init__(self, client: FileClient, cache: Optional[TTLCache] = None):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: Underlying file client
+            cache: Cache to use (default: the shared stat_cache)
+        """
+        self.client = client
+        self.cache = cache or stat_cache
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        """Get file metadata, from the cache when possible."""
+        cached = self.cache.get(path)
+        if cached is not MISSING:
+            return cast(Optional[FileStat], cached)
+
+        file_stat = self.client.stat(path)
+        ttl = None if file_stat is not None else settings.stat_cache_negative_ttl
+        self.cache.set(path, file_stat, ttl=ttl)
+        return file_stat
+
+    def file_exists(self, path: str) -> bool:
+        """Check if file exists."""
+        file_stat = self.stat(path)
+        return file_stat is not None and not file_stat.is_dir
+
+    def get_file_size(self, path: str) -> int:
+        """Get file size in bytes."""
+        file_stat = self.stat(path)
+        if file_stat is None:
+            raise FileNotFoundError(path)
+        return file_stat.size
+
+    def write_file(self, path: str, content: bytes):
+        """Write file content and invalidate its cached metadata."""
+        try:
+            self.client.write_file(path, content)
+        finally:
+            self.cache.invalidate(path)
+
+    def list_directories(self, path: str = "") -> List[str]:
+        """List directories in a given path."""
+        return self.client.list_directories(path)
+
+    def list_files(
+        self, path: str = "", pattern: str = "*.mp4", exclude_proxy: bool = True
+    ) -> List[str]:
+        """List files matching pattern in a given path."""
+        return self.client.list_files(path, pattern, exclude_proxy)
+
+    def scandir(self, path: str = "") -> List[DirEntry]:
+        """List a directory, priming the cache with every entry's metadata."""
+        entries = self.client.scandir(path)
+        prefix = f"{path.strip('/')}/" if path.strip("/") else ""
+        for entry in entries:
+            self.cache.set(
+                f"{prefix}{entry.name}",
+                FileStat(size=entry.size, mtime=entry.mtime, etag=entry.etag, is_dir=entry.is_dir),
+            )
+        return entries
+
+    def read_file(self, path: str) -> bytes:
+        """Read file content."""
+        return self.client.read_file(path)
+
+    def read_file_range(self, path: str, start: int, end: int) -> bytes:
+        """Read a range of bytes from a file (inclusive start, exclusive end)."""
+        return self.client.read_file_range(path, start, end)
+
+    def stream_file_range(
+        self, path: str, start: int, end: int, chunk_size: int = 256 * 1024
+    ):
+        """Stream a range of bytes using the underlying client's streaming."""
+        return self.client.stream_file_range(path, start, end, chunk_size)
+
+    def ensure_directory(self, path: str):
+        """Ensure a directory exists, creating it if necessary."""
+        self.client.ensure_directory(path)
+        self.cache.invalidate(path)
+
+
+class InstrumentedFileClient(FileClient):
+    """File client wrapper that records the duration of every backend operation."""
+
+    def __init__(self, client: FileClient, backend: str):
+        """
+        Initialize the instrumented wrapper.
+
+        Args:
+            client: Underlying file client
+            backend: Backend name for the metric labels ("local" or "webdav")
+        """
+        self.client = client
+        self.backend = backend
+
+    def _timed(self, method: str):
+        """Context manager timing one operation."""
+        return time_storage_operation(self.backend, method)
+
+    def list_directories(self, path: str = "") -> List[str]:
+        """List directories in a given path."""
+        with self._timed("list_directories"):
+            return self.client.list_directories(path)
+
+    def list_files(
+        self, path: str = "", pattern: str = "*.mp4", exclude_proxy: bool = True
+    ) -> List[str]:
+        """List files matching pattern in a given path."""
+        with self._timed("list_files"):
+            return self.client.list_files(path, pattern, exclude_proxy)
+
+    def scandir(self, path: str = "") -> List[DirEntry]:
+        """List a directory with metadata for every entry."""
+        with self._timed("scandir"):
+            return self.client.scandir(path)
+
+    def read_file(self, path: str) -> bytes:
+        """Read file content."""
+        with self._timed("read_file"):
+            content = self.client.read_file(path)
+        STORAGE_READ_BYTES.labels(self.backend).inc(len(content))
+        return content
+
+    def write_file(self, path: str, content: bytes):
+        """Write file content."""
+        with self._timed("write_file"):
+            self.client.write_file(path, content)
+
+    def file_exists(self, path: str) -> bool:
+        """Check if file exists."""
+        with self._timed("file_exists"):
+            return self.client.file_exists(path)
+
+    def get_file_size(self, path: str) -> int:
+        """Get file size in bytes."""
+        with self._timed("get_file_size"):
+            return self.client.get_file_size(path)
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        """Get size, mtime and ETag for a path, or None if it doesn't exist."""
+        with self._timed("stat"):
+            return self.client.stat(path)
+
+    def read_file_range(self, path: str, start: int, end: int) -> bytes:
+        """Read a range of bytes from a file (inclusive start, exclusive end)."""
+        with self._timed("read_file_range"):
+            content = self.client.read_file_range(path, start, end)
+        STORAGE_READ_BYTES.labels(self.backend).inc(len(content))
+        return content
+
+    def stream_file_range(
+        self, path: str, start: int, end: int, chunk_size: int = 256 * 1024
+    ):
+        """Stream a range of bytes, timing the wait for the first chunk."""
+        chunks = self.client.stream_file_range(path, start, end, chunk_size)
+        with self._timed("stream_file_range"):
+            first = next(chunks, None)
+        if first is None:
+            return
+        read_bytes = STORAGE_READ_BYTES.labels(self.backend)
+        read_bytes.inc(len(first))
+        yield first
+        for chunk in chunks:
+            read_bytes.inc(len(chunk))
+            yield chunk
+
+    def ensure_directory(self, path: str):
+        """Ensure a directory exists, creating it if necessary."""
+        with self._timed("ensure_directory"):
+            self.client.ensure_directory(path)
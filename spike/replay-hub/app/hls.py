@@ -0,0 +1,81 @@
+"""HLS (fMP4) renditions of clips.
+
+scripts/encode.py encodes each clip into a bitrate ladder of fMP4 renditions,
+with index.m3u8 as the master playlist listing them (or, without a ladder, a
+single media playlist segmented from the proxy). Segment, init and rendition
+playlist names start with a version derived from the source and the encode
+settings, so a re-encode never reuses a name and segments can be cached
+forever. Storage layout:
+
+    {month}/hls/{stem}/index.m3u8
+    {month}/hls/{stem}/{version}_{height}p.m3u8
+    {month}/hls/{stem}/{version}_{height}p_init.mp4
+    {month}/hls/{stem}/{version}_{height}p_00000.m4s
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from app.models import Rendition
+
+HLS_PLAYLIST = "index.m3u8"
+
+# Media types of the files a playlist references
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+_ASSET_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+# Attribute list of an #EXT-X-STREAM-INF tag; values may be quoted strings
+_STREAM_INF_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def hls_path(month: str, filename: str, asset: str = HLS_PLAYLIST) -> str:
+    """
+    Get the storage path of an HLS playlist or segment.
+
+    Args:
+        month: Month directory (e.g., "2024-11")
+        filename: Display filename of the clip (e.g., "clip.mp4")
+        asset: File name within the clip's HLS directory
+
+    Returns:
+        Relative path to the file
+    """
+    return f"{month}/hls/{Path(filename).stem}/{asset}"
+
+
+def hls_media_type(asset: str) -> Optional[str]:
+    """Get the media type of an HLS asset name, or None if it isn't one we serve."""
+    if not _ASSET_NAME.fullmatch(asset) or asset.startswith("."):
+        return None
+    return HLS_MEDIA_TYPES.get(Path(asset).suffix)
+
+
+def parse_master_playlist(text: str) -> List[Rendition]:
+    """
+    Read the bitrate ladder from a master playlist.
+
+    Args:
+        text: Content of a clip's index.m3u8
+
+    Returns:
+        Renditions ordered by bandwidth, or an empty list for a single media
+        playlist (a clip segmented without a ladder)
+    """
+    renditions = []
+    for line in text.splitlines():
+        if not line.startswith("#EXT-X-STREAM-INF:"):
+            continue
+        attributes = dict(_STREAM_INF_ATTRIBUTE.findall(line.split(":", 1)[1]))
+        try:
+            width, height = (int(v) for v in attributes.get("RESOLUTION", "").split("x"))
+            bandwidth = int(attributes["BANDWIDTH"])
+        except (KeyError, ValueError):
+            continue
+        renditions.append(Rendition(width=width, height=height, bandwidth=bandwidth))
+    return sorted(renditions, key=lambda rendition: rendition.bandwidth)
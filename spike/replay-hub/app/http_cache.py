@@ -0,0 +1,122 @@
+"""HTTP validators and conditional request handling.
+
+Responses carry an ETag and, where a modification time is known,
+Last-Modified. Clients revalidate with If-None-Match or If-Modified-Since and
+get a bodiless 304 when nothing changed. If-Range lets a client resume a
+partial download only while the file is unchanged; otherwise the full file is
+sent.
+"""
+
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from starlette.requests import Request
+
+
+def http_date(timestamp: float) -> str:
+    """Format a Unix timestamp as an HTTP date (e.g., "Wed, 21 Oct 2015 07:28:00 GMT")."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[int]:
+    """
+    Parse an HTTP date into a Unix timestamp.
+
+    Returns:
+        Whole seconds since the epoch, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def parse_iso_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 timestamp as stored in the database (naive means UTC)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def validator_headers(etag: Optional[str], mtime: Optional[float]) -> Dict[str, str]:
+    """Build the ETag and Last-Modified headers for whichever validators are known."""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if mtime is not None:
+        headers["Last-Modified"] = http_date(mtime)
+    return headers
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Check an ETag against the request's If-None-Match (weak comparison)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not etag or not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(request: Request, etag: Optional[str], mtime: Optional[float]) -> bool:
+    """
+    Check whether the client's cached copy is current, so a 304 can be sent.
+
+    If-None-Match takes precedence; If-Modified-Since is only considered
+    without it, as RFC 9110 requires.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource, if known
+        mtime: Current modification time of the resource, if known
+    """
+    if "if-none-match" in request.headers:
+        return etag_matches(request, etag)
+
+    if_modified_since = parse_http_date(request.headers.get("if-modified-since"))
+    if if_modified_since is None or mtime is None:
+        return False
+    # HTTP dates have one-second resolution
+    return int(mtime) <= if_modified_since
+
+
+def range_allowed(request: Request, etag: Optional[str], mtime: Optional[float]) -> bool:
+    """
+    Check the request's If-Range, if any.
+
+    A Range request is only honored if the If-Range validator still matches
+    (strong comparison for ETags, an exact date for Last-Modified); otherwise
+    the full representation has to be sent.
+
+    Returns:
+        True if the Range header, if any, may be honored
+    """
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        # Weak ETags never validate a range
+        return etag is not None and not etag.startswith("W/") and if_range == etag
+
+    date = parse_http_date(if_range)
+    return date is not None and mtime is not None and int(mtime) == date
@@ -3,18 +3,21 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.cache import query_cache, stat_cache, thumbnail_cache
 from app.config import settings
+from app.database import metadata_db
+from app.metrics import RequestMiddleware
+from app.request_log import configure_logging
 from app.routes import clips, metadata
+from app.streaming import read_ahead
 
-# Configure logging (matching existing spike project format)
-logging.basicConfig(
-    level=settings.log_level,
-    format='[%(levelname)8s] %(asctime)s %(filename)16s:L%(lineno)-3d %(funcName)16s() : %(message)s'
-)
+# Configure logging (matching existing spike project format, or JSON lines)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down Replay Hub application")
+    read_ahead.clear()
+    await clips.async_file_client.aclose()
+    metadata_db.close()
 
 
 # Create FastAPI app
@@ -39,18 +45,45 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if settings.metrics_enabled or settings.request_log_enabled:
+    app.add_middleware(
+        RequestMiddleware,
+        record_metrics=settings.metrics_enabled,
+        log_requests=settings.request_log_enabled,
+    )
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Configure templates
 templates = Jinja2Templates(directory="app/templates")
 
-# Register routes
-app.include_router(clips.router)
+# Register routes. The metadata routes come first: clip_detail's catch-all
+# /clips/{month}/{subpath:path} would otherwise shadow GET .../metadata.
 app.include_router(metadata.router)
+app.include_router(clips.router)
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Docker."""
     return {"status": "healthy", "version": "0.1.0"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters of the in-process caches."""
+    return {
+        "stat_cache": stat_cache.stats(),
+        "thumbnail_cache": thumbnail_cache.stats(),
+        "query_cache": query_cache.stats(),
+        "stream_readahead": read_ahead.stats(),
+    }
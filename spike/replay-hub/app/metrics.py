@@ -0,0 +1,276 @@
+"""Prometheus metrics for Replay Hub.
+
+Served in the text exposition format at /metrics, for vmagent to scrape.
+Covers the hot paths:
+
+- HTTP requests per route template: latency, time to first byte and bytes sent
+  (media bytes separately, per storage backend)
+- Storage operations per backend and method (the raw backend, below the stat
+  cache, so cache hits don't dilute backend latency)
+- SQLite queries per MetadataDB method
+- Hit/miss counters of the in-process caches
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TypeVar, cast
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import request_log
+from app.config import settings
+
+# Latency buckets from sub-millisecond cache hits to multi-second WebDAV reads
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+# SQLite queries are mostly well under a millisecond
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "replay_hub_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_FIRST_BYTE_SECONDS = Histogram(
+    "replay_hub_http_time_to_first_byte_seconds",
+    "Time from receiving a request to sending the first byte of its response body",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "replay_hub_http_response_bytes_total",
+    "Response body bytes sent",
+    ["method", "route"],
+)
+STREAM_BYTES = Counter(
+    "replay_hub_stream_bytes_total",
+    "Video and HLS segment bytes sent, per storage backend",
+    ["backend", "route"],
+)
+STORAGE_OPERATION_SECONDS = Histogram(
+    "replay_hub_storage_operation_duration_seconds",
+    "Duration of storage backend operations (opening a range: until the first byte is available)",
+    ["backend", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+STORAGE_OPERATION_ERRORS = Counter(
+    "replay_hub_storage_operation_errors_total",
+    "Storage backend operations that raised",
+    ["backend", "method"],
+)
+STORAGE_READ_BYTES = Counter(
+    "replay_hub_storage_read_bytes_total",
+    "Bytes read from the storage backend",
+    ["backend"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "replay_hub_db_query_duration_seconds",
+    "Duration of MetadataDB calls, including waiting for the connection",
+    ["method"],
+    buckets=QUERY_BUCKETS,
+)
+
+
+@contextmanager
+def time_storage_operation(backend: str, method: str) -> Iterator[None]:
+    """Time a storage backend operation, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STORAGE_OPERATION_ERRORS.labels(backend, method).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STORAGE_OPERATION_SECONDS.labels(backend, method).observe(elapsed)
+        request_log.add_storage_time(elapsed)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def timed_query(function: F) -> F:
+    """Decorator recording the duration of a MetadataDB method."""
+    histogram = DB_QUERY_SECONDS.labels(function.__name__)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return cast(F, wrapper)
+
+
+class CacheCollector:
+    """Expose the hit/miss/eviction counters of the in-process caches at scrape time."""
+
+    def collect(self):
+        # Imported here: app.cache is configured from settings at import time
+        from app.cache import query_cache, sprite_layout_cache, stat_cache, thumbnail_cache
+        from app.streaming import read_ahead
+
+        caches = {
+            "stat": stat_cache,
+            "sprite_layout": sprite_layout_cache,
+            "thumbnail": thumbnail_cache,
+            "query": query_cache,
+            "stream_readahead": read_ahead,
+        }
+
+        hits = CounterMetricFamily(
+            "replay_hub_cache_hits", "Cache lookups that found an entry", labels=["cache", "tier"]
+        )
+        misses = CounterMetricFamily(
+            "replay_hub_cache_misses", "Cache lookups that found no entry", labels=["cache"]
+        )
+        evictions = CounterMetricFamily(
+            "replay_hub_cache_evictions", "Entries evicted to make room", labels=["cache"]
+        )
+        entries = GaugeMetricFamily(
+            "replay_hub_cache_entries", "Entries currently cached in memory", labels=["cache"]
+        )
+        hit_ratio = GaugeMetricFamily(
+            "replay_hub_cache_hit_ratio",
+            "Share of lookups served from the cache since startup "
+            "(use the counters for a windowed ratio)",
+            labels=["cache"],
+        )
+
+        for name, cache in caches.items():
+            stats = cache.stats()
+            disk_hits = stats.get("disk_hits", 0)
+            hits.add_metric([name, "memory"], stats["hits"])
+            if "disk_hits" in stats:
+                hits.add_metric([name, "disk"], disk_hits)
+            misses.add_metric([name], stats["misses"])
+            evictions.add_metric([name], stats["evictions"])
+            entries.add_metric([name], stats["entries"])
+
+            lookups = stats["hits"] + disk_hits + stats["misses"]
+            hit_ratio.add_metric([name], (stats["hits"] + disk_hits) / lookups if lookups else 0.0)
+
+        return [hits, misses, evictions, entries, hit_ratio]
+
+
+REGISTRY.register(CacheCollector())
+
+
+# Media types whose bytes count as streamed
+_STREAM_MEDIA_TYPES = (b"video/",)
+
+
+def route_template(scope: Scope, request_scope: Scope) -> str:
+    """
+    Get the route template a request matched (e.g., "/clips/{month}/{subpath:path}/stream").
+
+    Templates keep the label cardinality bounded; raw paths would not be.
+
+    Args:
+        scope: Scope after the request was handled
+        request_scope: Copy of the scope as received, before routing changed it
+    """
+    route = scope.get("route")
+    if route is not None:
+        return str(route.path)
+
+    # Mounts (static files) and unmatched paths don't set scope["route"]
+    for candidate in scope["app"].routes:
+        match, _ = candidate.matches(request_scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    return "unmatched"
+
+
+class RequestMiddleware:
+    """
+    ASGI middleware measuring each request's latency, time to first byte and
+    bytes sent, for the metrics and the request summary log line.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses pass
+    through untouched and the timings cover the whole body.
+    """
+
+    def __init__(self, app: ASGIApp, record_metrics: bool = True, log_requests: bool = True):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            record_metrics: Whether to update the Prometheus metrics
+            log_requests: Whether to emit (sampled) request summary lines
+        """
+        self.app = app
+        self.record_metrics = record_metrics
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_scope = dict(scope)
+        summary = None
+        if self.log_requests:
+            range_header = dict(scope["headers"]).get(b"range")
+            summary = request_log.start_request(
+                scope["method"],
+                scope["path"],
+                range_header.decode("latin-1") if range_header else None,
+            )
+        status = 500
+        first_byte: Optional[float] = None
+        body_bytes = 0
+        is_stream = False
+
+        async def send_wrapper(message: Message):
+            nonlocal status, first_byte, body_bytes, is_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                is_stream = content_type.startswith(_STREAM_MEDIA_TYPES)
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if first_byte is None and (body or not message.get("more_body", False)):
+                    first_byte = time.perf_counter()
+                body_bytes += len(body)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope, request_scope)
+            method = scope["method"]
+            duration = time.perf_counter() - start
+            ttfb = first_byte - start if first_byte is not None else None
+            if self.record_metrics:
+                HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(duration)
+                if ttfb is not None:
+                    HTTP_FIRST_BYTE_SECONDS.labels(method, route).observe(ttfb)
+                HTTP_RESPONSE_BYTES.labels(method, route).inc(body_bytes)
+                if is_stream:
+                    STREAM_BYTES.labels(settings.storage_backend, route).inc(body_bytes)
+            if summary is not None:
+                request_log.log_request(summary, route, status, body_bytes, duration, ttfb)
@@ -1,7 +1,7 @@
 """Pydantic models for clip metadata."""
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -16,6 +16,19 @@ class ClipMetadata(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class Rendition(BaseModel):
+    """One variant stream of a clip's HLS bitrate ladder."""
+
+    width: int
+    height: int
+    bandwidth: int
+
+    @property
+    def name(self) -> str:
+        """Display name of the rendition (e.g., "720p")."""
+        return f"{self.height}p"
+
+
 class ClipInfo(BaseModel):
     """Combined model for displaying clip with metadata."""
 
@@ -26,3 +39,4 @@ class ClipInfo(BaseModel):
     has_metadata: bool = False
     has_proxy: bool = False
     has_thumbnail: bool = False
+    renditions: List[Rendition] = Field(default_factory=list)
@@ -0,0 +1,178 @@
+"""Logging setup and sampled per-request summary lines.
+
+Instead of logging each step of a request, the request middleware emits one
+summary line per request: route, status, range, bytes sent, and the time spent
+in the storage backend. Busy routes (thumbnails, HLS segments) can be sampled
+per route template; errors and slow requests are always logged.
+
+With LOG_FORMAT=json every record is one JSON object per line, and the
+summary's fields are top-level keys for log shippers to index.
+"""
+
+import contextvars
+import json
+import logging
+import random
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger("app.requests")
+
+TEXT_FORMAT = (
+    "[%(levelname)8s] %(asctime)s %(filename)16s:L%(lineno)-3d %(funcName)16s() : %(message)s"
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request = getattr(record, "request", None)
+        if request:
+            entry.update(request)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """Configure the root logger from LOG_LEVEL and LOG_FORMAT."""
+    handler = logging.StreamHandler()
+    if settings.log_format == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    logging.basicConfig(level=settings.log_level.upper(), handlers=[handler])
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse the REQUEST_LOG_ROUTE_RATES setting.
+
+    Args:
+        spec: Comma-separated "route=rate" entries, where route is a route
+            template, e.g. "/clips/{month}/{filename:path}/thumbnail=0.05"
+
+    Returns:
+        Sample rate per route template
+
+    Raises:
+        ValueError: If an entry has no rate or the rate is not within 0-1
+    """
+    rates = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+
+        route, separator, rate = entry.rpartition("=")
+        if not separator or not route.strip():
+            raise ValueError(f"Expected route=rate in request log sample rates: {entry!r}")
+        try:
+            value = float(rate)
+        except ValueError:
+            raise ValueError(f"Invalid sample rate for {route.strip()!r}: {rate!r}") from None
+        if not 0 <= value <= 1:
+            raise ValueError(f"Sample rate for {route.strip()!r} must be within 0-1: {value}")
+        rates[route.strip()] = value
+    return rates
+
+
+_route_rates = parse_sample_rates(settings.request_log_route_rates)
+
+
+class RequestSummary:
+    """What a request did, filled in while it is handled."""
+
+    __slots__ = ("method", "path", "range", "storage_seconds", "storage_calls")
+
+    def __init__(self, method: str, path: str, range_header: Optional[str]):
+        self.method = method
+        self.path = path
+        self.range = range_header
+        self.storage_seconds = 0.0
+        self.storage_calls = 0
+
+
+_current: contextvars.ContextVar[Optional[RequestSummary]] = contextvars.ContextVar(
+    "request_summary", default=None
+)
+
+
+def start_request(method: str, path: str, range_header: Optional[str]) -> RequestSummary:
+    """Begin the summary of the request handled in the current context."""
+    summary = RequestSummary(method, path, range_header)
+    _current.set(summary)
+    return summary
+
+
+def add_storage_time(seconds: float):
+    """Count a storage backend call towards the current request, if any."""
+    summary = _current.get()
+    if summary is not None:
+        summary.storage_seconds += seconds
+        summary.storage_calls += 1
+
+
+def log_request(
+    summary: RequestSummary,
+    route: str,
+    status: int,
+    body_bytes: int,
+    duration: float,
+    first_byte: Optional[float],
+):
+    """
+    Emit the summary line of a finished request, subject to sampling.
+
+    Args:
+        summary: Summary filled in while handling the request
+        route: Route template the request matched
+        status: Response status code
+        body_bytes: Response body bytes sent
+        duration: Seconds until the last byte was sent
+        first_byte: Seconds until the first body byte was sent, if any
+    """
+    always = status >= 500 or duration >= settings.request_log_slow_seconds
+    if not always:
+        rate = _route_rates.get(route, settings.request_log_sample_rate)
+        if rate < 1 and random.random() >= rate:
+            return
+
+    level = logging.WARNING if always else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+
+    fields = {
+        "method": summary.method,
+        "path": summary.path,
+        "route": route,
+        "status": status,
+        "range": summary.range,
+        "bytes": body_bytes,
+        "duration_ms": round(duration * 1000, 1),
+        "ttfb_ms": round(first_byte * 1000, 1) if first_byte is not None else None,
+        "storage_ms": round(summary.storage_seconds * 1000, 1),
+        "storage_calls": summary.storage_calls,
+        "backend": settings.storage_backend,
+    }
+    logger.log(
+        level,
+        "%s %s %d %dB %.1fms (storage %.1fms/%d calls%s)",
+        summary.method,
+        summary.path,
+        status,
+        body_bytes,
+        fields["duration_ms"],
+        fields["storage_ms"],
+        summary.storage_calls,
+        f", range {summary.range}" if summary.range else "",
+        extra={"request": fields},
+    )
@@ -1,119 +1,578 @@
 """Routes for browsing and viewing clips."""
 
-import io
+import asyncio
+import base64
+import functools
+import json
 import logging
 import os
 import re
-from pathlib import Path
-from typing import Optional
-from urllib.parse import unquote
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+from urllib.parse import quote, unquote, urlencode
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.templating import Jinja2Templates
 
+from app.async_file_client import AsyncFileClient
+from markupsafe import Markup
+
+from app.cache import (
+    MISSING,
+    media_layout_cache,
+    query_cache,
+    sprite_layout_cache,
+    thumbnail_cache,
+)
 from app.config import settings
 from app.database import metadata_db
-from app.file_client import FileClient
-from app.models import ClipInfo, ClipMetadata
+from app.file_client import FileClient, FileStat
+from app.hls import hls_media_type, hls_path
+from app.http_cache import not_modified, range_allowed, validator_headers
+from app.models import ClipInfo, ClipMetadata, Rendition
+from app.sprites import (
+    SPRITE_TILE_WIDTH,
+    SpriteLayout,
+    render_sprite_sheet,
+    sprite_layout,
+    sprite_sheet_path,
+)
+from app.streaming import MediaLayout, probe_layout, read_ahead, read_range, window_end
+from app.thumbnails import (
+    THUMBNAIL_FORMATS,
+    THUMBNAIL_WIDTHS,
+    ffmpeg_available,
+    pick_width,
+    render_thumbnail,
+    thumbnail_path,
+)
 
-# Create file client based on configuration
+# Create file clients based on configuration. Routes read storage through the
+# async client. The sync client, run in worker threads, stores rendered
+# thumbnail derivatives and sprite sheets, lists thumbnail folders for sprite
+# layouts and debug listings, and provides the proxy path helpers.
 file_client = FileClient.create()
+async_file_client = AsyncFileClient.create()
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+
+T = TypeVar("T")
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["thumbnail_widths"] = THUMBNAIL_WIDTHS
+
+
+# Available filter options
+CLIP_TYPES = [
+    "Clutch",
+    "Highlight",
+    "Funny",
+    "Fail",
+    "Tutorial",
+    "Gameplay",
+    "Other",
+]
+
+
+def encode_cursor(month: str, filename: str) -> str:
+    """Encode the last (month, filename) of a page as an opaque cursor."""
+    raw = json.dumps([month, filename]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        month, filename = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(month), str(filename)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def clip_info_from_row(row: Dict[str, Any]) -> ClipInfo:
+    """Build a ClipInfo from a clip row returned by MetadataDB."""
+    metadata = None
+    if row["metadata"]:
+        try:
+            metadata = ClipMetadata(**row["metadata"])
+        except Exception as e:
+            logger.error(f"Error parsing metadata for {row['clip_path']}: {e}")
+
+    return ClipInfo(
+        month=row["month"],
+        filename=row["filename"],
+        webdav_path=row["proxy_path"],
+        metadata=metadata,
+        has_metadata=bool(row["has_metadata"]),
+        has_proxy=True,
+        has_thumbnail=bool(row["has_thumbnail"]),
+        renditions=row["renditions"],
+    )
+
+
+def promoted_filters(request: Request) -> Dict[str, Any]:
+    """Read the promoted metadata field filters from the query string."""
+    filters = {}
+    for field in metadata_db.promoted_fields:
+        value = request.query_params.get(field.key)
+        if value in (None, ""):
+            continue
+        try:
+            filters[field.key] = field.coerce(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid value for {field.key}")
+    return filters
+
+
+def filter_query(
+    clip_type: Optional[str], min_rating: Optional[int], filters: Dict[str, Any], **extra
+) -> str:
+    """Encode the active filters (plus extra parameters) as a query string."""
+    query = {"clip_type": clip_type, "min_rating": min_rating, **filters, **extra}
+    return urlencode({key: value for key, value in query.items() if value not in (None, "")})
+
+
+def cached_query(
+    name: str, params: Tuple, load: Callable[[], T], generation: Optional[int] = None
+) -> T:
+    """
+    Get a query result or rendered fragment from the query cache, loading it on a miss.
+
+    Keys include the database generation, so the first lookup after any write
+    to clips or metadata misses and reloads.
+
+    Args:
+        name: What is cached (e.g. "clip_page")
+        params: Everything the result depends on besides the database
+        load: Produces the value on a miss
+        generation: Generation read before the data load() uses was queried,
+            if that happened earlier (default: read it now)
+
+    Returns:
+        The cached or freshly loaded value; callers must not modify it
+    """
+    if not settings.query_cache_enabled:
+        return load()
+
+    # Read before loading: a value stored under a generation must not be older than it
+    if generation is None:
+        generation = metadata_db.generation()
+    key = (name, generation, params)
+    value = query_cache.get(key)
+    if value is MISSING:
+        value = load()
+        query_cache.set(key, value)
+    return cast(T, value)
+
+
+def filters_key(filters: Dict[str, Any]) -> Tuple:
+    """Promoted field filters as a hashable cache key part."""
+    return tuple(sorted(filters.items()))
+
+
+def load_clip_page(
+    cursor: Optional[str],
+    clip_type: Optional[str],
+    min_rating: Optional[int],
+    filters: Dict[str, Any],
+) -> Tuple[List[ClipInfo], Optional[str]]:
+    """
+    Load one page of clips with their metadata, from the query cache when possible.
+
+    Args:
+        cursor: Cursor from the previous page, or None for the first page
+        clip_type: Optional clip_type filter
+        min_rating: Optional minimum rating filter
+        filters: Promoted metadata field filters
+
+    Returns:
+        Tuple of (clips, next_cursor); next_cursor is None on the last page
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    def load() -> Tuple[List[ClipInfo], Optional[str]]:
+        # Fetch one extra row to find out whether there is a next page
+        rows = metadata_db.get_clips_page(
+            after,
+            limit=settings.clips_per_page + 1,
+            clip_type=clip_type,
+            min_rating=min_rating,
+            filters=filters,
+        )
+        has_more = len(rows) > settings.clips_per_page
+        clips = [clip_info_from_row(row) for row in rows[: settings.clips_per_page]]
+
+        next_cursor = None
+        if has_more and clips:
+            next_cursor = encode_cursor(clips[-1].month, clips[-1].filename)
+        return clips, next_cursor
+
+    return cached_query(
+        "clip_page",
+        (after, settings.clips_per_page, clip_type, min_rating, filters_key(filters)),
+        load,
+    )
+
+
+async def load_sprite_layout(month: str) -> SpriteLayout:
+    """Get the sprite sheet layout of a month from one thumbnails directory listing."""
+    cached = sprite_layout_cache.get(month)
+    if cached is not MISSING:
+        return cast(SpriteLayout, cached)
+
+    try:
+        entries = await run_in_threadpool(file_client.scandir, f"{month}/thumbnails")
+    except FileNotFoundError:
+        entries = []
+
+    layout = sprite_layout(month, entries)
+    sprite_layout_cache.set(month, layout)
+    return layout
+
+
+async def sprite_layouts(months: Iterable[str]) -> Dict[str, SpriteLayout]:
+    """
+    Get the sprite sheet layouts of the given months.
+
+    Returns:
+        month -> layout; empty when sprites are disabled or can't be rendered,
+        so cards fall back to individual thumbnails
+    """
+    if not settings.thumbnail_sprites or not ffmpeg_available():
+        return {}
+    return {month: await load_sprite_layout(month) for month in set(months)}
+
+
+def layout_styles(layouts: Dict[str, SpriteLayout]) -> Dict[str, Dict[str, str]]:
+    """Get the sprite tile CSS of every clip thumbnail, as month -> filename -> style."""
+    return {
+        month: {tile.filename: layout.tile_style(tile) for tile in layout.tiles}
+        for month, layout in layouts.items()
+    }
+
+
+async def sprite_styles(months: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Get the sprite tile CSS of every clip thumbnail in the given months."""
+    return layout_styles(await sprite_layouts(months))
+
+
+def clip_page_context(
+    cursor: Optional[str],
+    clip_type: Optional[str],
+    min_rating: Optional[int],
+    filters: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Build the template context for one page of the clip grid (without sprites)."""
+    generation = metadata_db.generation()
+    clips, next_cursor = load_clip_page(cursor, clip_type, min_rating, filters)
+
+    # Group consecutive clips by month, preserving order
+    page_groups: List[Tuple[str, List[ClipInfo]]] = []
+    for clip in clips:
+        if page_groups and page_groups[-1][0] == clip.month:
+            page_groups[-1][1].append(clip)
+        else:
+            page_groups.append((clip.month, [clip]))
+
+    months = [month for month, _ in page_groups]
+    month_counts = cached_query(
+        "month_counts",
+        (tuple(months), clip_type, min_rating, filters_key(filters)),
+        lambda: metadata_db.get_month_counts(
+            months, clip_type=clip_type, min_rating=min_rating, filters=filters
+        ),
+    )
+
+    next_url = None
+    if next_cursor:
+        next_url = "/partials/clips?" + filter_query(
+            clip_type, min_rating, filters, cursor=next_cursor
+        )
+
+    return {
+        "page_groups": page_groups,
+        "month_counts": month_counts,
+        # A month that continues from the previous page doesn't repeat its header
+        "continued_month": decode_cursor(cursor)[0] if cursor else None,
+        "next_url": next_url,
+        # The first page shows the empty state when nothing matches
+        "first_page": cursor is None,
+        "has_filters": bool(clip_type or min_rating or filters),
+        # What the rendered page depends on, for render_clip_page
+        "generation": generation,
+        "page_key": (cursor, clip_type, min_rating, filters_key(filters)),
+    }
+
+
+async def render_clip_page(context: Dict[str, Any]) -> str:
+    """
+    Render one page of the clip grid, from the query cache when possible.
+
+    Args:
+        context: Context from clip_page_context
+
+    Returns:
+        HTML of partials/clip_page.html
+    """
+    layouts = await sprite_layouts(month for month, _ in context["page_groups"])
+
+    # The database generation covers the clips; the layout versions cover
+    # thumbnails added to storage since
+    versions = tuple(sorted((month, layout.version) for month, layout in layouts.items()))
+    return cached_query(
+        "clip_page_html",
+        (context["page_key"], versions),
+        lambda: templates.get_template("partials/clip_page.html").render(
+            **context, sprites=layout_styles(layouts)
+        ),
+        generation=context["generation"],
+    )
 
 
 @router.get("/")
 async def index(
     request: Request, clip_type: Optional[str] = None, min_rating: Optional[str] = None
 ):
-    """Homepage with clip grid grouped by month."""
+    """Homepage with the first page of the clip grid grouped by month."""
     try:
         # Convert min_rating to int if provided (empty string becomes None)
         min_rating_int = int(min_rating) if min_rating else None
 
-        # Get all months from database (fast query)
-        months = metadata_db.get_all_months()
+        filters = promoted_filters(request)
+        context = clip_page_context(None, clip_type, min_rating_int, filters)
+        clip_page_html = await render_clip_page(context)
 
-        # Get clips for each month from database with optional filters
-        clips_by_month = {}
-        for month in months:
-            # Query clips from database (includes metadata status, thumbnails)
-            db_clips = metadata_db.get_clips_for_month(
-                month, clip_type=clip_type, min_rating=min_rating_int
-            )
-
-            clips = []
-            for row in db_clips:
-                # Load metadata if it exists
-                metadata = None
-                if row["has_metadata"]:
-                    clip_path = f"{row['month']}/{row['filename']}"
-                    metadata_dict = metadata_db.get_metadata(clip_path)
-                    if metadata_dict:
-                        try:
-                            metadata = ClipMetadata(**metadata_dict)
-                        except Exception as e:
-                            logger.error(f"Error parsing metadata for {clip_path}: {e}")
-
-                clip_info = ClipInfo(
-                    month=row["month"],
-                    filename=row["filename"],
-                    webdav_path=row["proxy_path"],
-                    metadata=metadata,
-                    has_metadata=bool(row["has_metadata"]),
-                    has_proxy=True,
-                    has_thumbnail=bool(row["has_thumbnail"]),
-                )
-                clips.append(clip_info)
-
-            if clips:
-                clips_by_month[month] = clips
-
-        # Available filter options
-        clip_types = [
-            "Clutch",
-            "Highlight",
-            "Funny",
-            "Fail",
-            "Tutorial",
-            "Gameplay",
-            "Other",
+        # Promoted metadata fields shown next to the type/rating filters
+        promoted = [
+            {
+                "key": field.key,
+                "label": field.key.replace("_", " ").capitalize(),
+                "numeric": field.numeric,
+                "values": [] if field.numeric else cached_query(
+                    "promoted_values",
+                    (field.key,),
+                    functools.partial(metadata_db.get_promoted_values, field.key),
+                ),
+                "selected": filters.get(field.key),
+            }
+            for field in metadata_db.promoted_fields
         ]
 
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
-                "clips_by_month": clips_by_month,
-                "clip_types": clip_types,
+                "clip_types": CLIP_TYPES,
                 "selected_clip_type": clip_type,
                 "selected_min_rating": min_rating_int,
+                "promoted_fields": promoted,
+                "has_filters": context["has_filters"],
+                "clip_page_html": Markup(clip_page_html),
             },
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error loading index: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Streaming chunk size for generator-based delivery (256KB chunks for smooth streaming)
-STREAM_CHUNK_SIZE = 256 * 1024
+@router.get("/partials/clips")
+async def clips_partial(
+    request: Request,
+    cursor: str,
+    clip_type: Optional[str] = None,
+    min_rating: Optional[str] = None,
+):
+    """Next page of the clip grid as an HTML fragment (used for infinite scroll)."""
+    try:
+        min_rating_int = int(min_rating) if min_rating else None
+        context = clip_page_context(cursor, clip_type, min_rating_int, promoted_filters(request))
+        return HTMLResponse(await render_clip_page(context))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading clip page: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/api/clips")
+async def list_clips(
+    request: Request,
+    cursor: Optional[str] = None,
+    clip_type: Optional[str] = None,
+    min_rating: Optional[str] = None,
+):
+    """One page of clips as JSON, with a cursor for the next page."""
+    try:
+        min_rating_int = int(min_rating) if min_rating else None
+        clips, next_cursor = load_clip_page(
+            cursor, clip_type, min_rating_int, promoted_filters(request)
+        )
+
+        return JSONResponse(
+            content={
+                "clips": [clip.model_dump(mode="json") for clip in clips],
+                "next_cursor": next_cursor,
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing clips: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def load_search_page(
+    q: str,
+    page: int,
+    clip_type: Optional[str],
+    min_rating: Optional[int],
+    filters: Dict[str, Any],
+) -> Tuple[List[ClipInfo], bool]:
+    """
+    Load one page of ranked search results.
+
+    Returns:
+        Tuple of (clips, has_more)
+    """
+    page = max(page, 1)
+    rows = metadata_db.search_clips(
+        q,
+        limit=settings.clips_per_page + 1,
+        offset=(page - 1) * settings.clips_per_page,
+        clip_type=clip_type,
+        min_rating=min_rating,
+        filters=filters,
+    )
+    has_more = len(rows) > settings.clips_per_page
+    return [clip_info_from_row(row) for row in rows[: settings.clips_per_page]], has_more
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: str = "",
+    page: int = 1,
+    clip_type: Optional[str] = None,
+    min_rating: Optional[str] = None,
+):
+    """Ranked full-text search over clip filenames and metadata, as JSON."""
+    try:
+        min_rating_int = int(min_rating) if min_rating else None
+        clips, has_more = load_search_page(
+            q, page, clip_type, min_rating_int, promoted_filters(request)
+        )
+
+        return JSONResponse(
+            content={
+                "query": q,
+                "page": page,
+                "results": [clip.model_dump(mode="json") for clip in clips],
+                "has_more": has_more,
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching clips: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/partials/search")
+async def search_partial(
+    request: Request,
+    q: str = "",
+    page: int = 1,
+    clip_type: Optional[str] = None,
+    min_rating: Optional[str] = None,
+):
+    """Search results as an HTML fragment; an empty query returns the normal grid."""
+    try:
+        min_rating_int = int(min_rating) if min_rating else None
+        filters = promoted_filters(request)
+
+        if not q.strip():
+            context = clip_page_context(None, clip_type, min_rating_int, filters)
+            return HTMLResponse(await render_clip_page(context))
+
+        clips, has_more = load_search_page(q, page, clip_type, min_rating_int, filters)
+
+        next_url = None
+        if has_more:
+            next_url = "/partials/search?" + filter_query(
+                clip_type, min_rating_int, filters, q=q, page=page + 1
+            )
+
+        return templates.TemplateResponse(
+            "partials/search_results.html",
+            {
+                "request": request,
+                "query": q,
+                "page": page,
+                "clips": clips,
+                "next_url": next_url,
+                "sprites": await sprite_styles(clip.month for clip in clips),
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching clips: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class LocalFileResponse(FileResponse):
+    """FileResponse reading stream_chunk_size chunks instead of Starlette's 64 KB."""
+
+    chunk_size = settings.stream_chunk_size
+
+
+async def media_layout(path: str, file_stat: FileStat) -> MediaLayout:
+    """Get the MP4 layout of a video, probing storage on first use."""
+    key = (path, file_stat.etag or f"{file_stat.size}-{file_stat.mtime}")
+    cached = media_layout_cache.get(key)
+    if cached is not MISSING:
+        return cast(MediaLayout, cached)
+
+    try:
+        layout = await probe_layout(async_file_client, path, file_stat.size)
+    except Exception as e:
+        logger.warning(f"Stream - Could not probe layout of {path}: {e}")
+        layout = MediaLayout()
+    media_layout_cache.set(key, layout)
+    return layout
 
 
 @router.get("/clips/{month}/{subpath:path}/stream")
 async def stream_video(request: Request, month: str, subpath: str):
     """Stream video file with proper range request support and optimized delivery."""
     try:
-        logger.info(f"Stream - Raw: month='{month}', subpath='{subpath}'")
         month = unquote(month)
         subpath = unquote(subpath)
-        logger.info(f"Stream - Decoded: month='{month}', subpath='{subpath}'")
 
         # subpath will be "proxies/filename.mp4"
         video_path = f"{month}/{subpath}"
-        logger.info(f"Stream - Full path: '{video_path}'")
+        logger.debug("Stream - Full path: '%s'", video_path)
 
         # Extract filename for proxy check
         filename = os.path.basename(subpath)
@@ -124,71 +583,116 @@ async def stream_video(request: Request, month: str, subpath: str):
         if not is_already_proxy:
             # Try proxy first if available
             proxy_path = file_client.get_proxy_path(video_path)
-            if file_client.file_exists(proxy_path):
+            if await async_file_client.exists(proxy_path):
                 video_path = proxy_path
 
-        # Check if video exists
-        logger.info(f"Stream - Checking exists: '{video_path}'")
-        if not file_client.file_exists(video_path):
-            logger.error(f"Stream - NOT FOUND: '{video_path}'")
+        # Check if video exists and get its size in one lookup
+        file_stat = await async_file_client.stat(video_path)
+        if file_stat is None or file_stat.is_dir:
+            logger.error("Stream - NOT FOUND: '%s'", video_path)
             raise HTTPException(
                 status_code=404, detail=f"Video not found: {video_path}"
             )
 
-        # Get file size
-        file_size = file_client.get_file_size(video_path)
+        file_size = file_stat.size
+
+        validators = validator_headers(file_stat.etag, file_stat.mtime)
+        if not_modified(request, file_stat.etag, file_stat.mtime):
+            return Response(
+                status_code=304,
+                headers={"Cache-Control": "public, max-age=3600", **validators},
+            )
+
+        # Local files: FileResponse handles Range, If-Range and multipart
+        # ranges itself (reading in worker threads, like the generator below).
+        # Passing our validators makes its If-Range check use them too.
+        local_path = async_file_client.local_path(video_path)
+        if settings.local_file_response and local_path is not None:
+            return LocalFileResponse(
+                local_path,
+                media_type="video/mp4",
+                headers={"Cache-Control": "public, max-age=3600", **validators},
+            )
 
         # Parse Range header
         range_header = request.headers.get("range")
 
-        # Determine range to serve
+        # The file changed since the client's partial copy: send all of it
+        if range_header and not range_allowed(request, file_stat.etag, file_stat.mtime):
+            logger.debug("Stream - If-Range mismatch, serving full file")
+            return StreamingResponse(
+                async_file_client.aiter_range(
+                    video_path, 0, file_size - 1, settings.stream_chunk_size
+                ),
+                media_type="video/mp4",
+                headers={
+                    "Accept-Ranges": "bytes",
+                    "Content-Length": str(file_size),
+                    "Cache-Control": "public, max-age=3600",
+                    **validators,
+                },
+            )
+
+        # Determine range to serve. Open-ended ranges (and requests without a
+        # Range header) get a window sized from the clip's bitrate and moov
+        # position, see app/streaming.py
+        start, end = 0, None
         if range_header:
             # Explicit range request from browser (e.g., seeking)
             match = re.match(r"bytes=(\d+)-(\d*)", range_header)
             if match:
                 start = int(match.group(1))
-                # If end is not specified, serve a large chunk (or rest of file)
-                # This reduces round-trips for sequential playback
                 if match.group(2):
                     end = int(match.group(2))
-                else:
-                    # Serve up to 10MB at a time for open-ended requests
-                    end = min(start + 10 * 1024 * 1024 - 1, file_size - 1)
-                end = min(end, file_size - 1)
-            else:
-                # Invalid range format, serve initial chunk
-                start = 0
-                end = min(10 * 1024 * 1024 - 1, file_size - 1)  # 10MB initial chunk
-        else:
-            # No range header - initial request
-            # Return first 10MB to enable quick playback start with buffer
-            # Browser will request more via range requests as needed
-            start = 0
-            chunk_size = 10 * 1024 * 1024  # 10MB initial buffer
-            end = min(chunk_size - 1, file_size - 1)
-            logger.info(
-                f"Stream - Initial request, serving first {chunk_size / 1024 / 1024:.1f}MB"
-            )
+
+        if start >= file_size:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{file_size}"})
+
+        layout = await media_layout(video_path, file_stat)
+        if end is None:
+            end = window_end(layout, start, file_size)
+        end = min(end, file_size - 1)
 
         content_length = end - start + 1
-        logger.info(
-            f"Stream - Range: {start}-{end}/{file_size} ({content_length} bytes)"
-        )
+        logger.debug("Stream - Range: %d-%d/%d (%d bytes)", start, end, file_size, content_length)
+
+        headers = {
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(content_length),
+            # Cache video chunks for 1 hour - browser can reuse on seek
+            "Cache-Control": "public, max-age=3600",
+            **validators,
+        }
+
+        version = file_stat.etag or f"{file_size}-{file_stat.mtime}"
+        window = None
+        if settings.stream_readahead_max_bytes:
+            window = await read_ahead.take((video_path, version, start, end))
+
+            # Read the window the player will ask for next while this one is sent
+            if end + 1 < file_size:
+                next_start = end + 1
+                next_end = window_end(layout, next_start, file_size)
+                read_ahead.prefetch(
+                    (video_path, version, next_start, next_end),
+                    next_end - next_start + 1,
+                    lambda: read_range(async_file_client, video_path, next_start, next_end),
+                )
+
+        if window is not None:
+            logger.debug("Stream - Served %d-%d from read-ahead", start, end)
+            return Response(
+                content=window, status_code=206, media_type="video/mp4", headers=headers
+            )
 
-        # Use generator-based streaming for true streaming delivery
-        # stream_file_range keeps file handle open for efficiency (LocalFileClient)
-        # or falls back to chunked read_file_range calls (WebDAVFileClient)
+        # Stream the range without blocking the event loop: a single ranged GET
+        # for WebDAV, or threadpool reads from one open file handle for local
         return StreamingResponse(
-            file_client.stream_file_range(video_path, start, end, STREAM_CHUNK_SIZE),
+            async_file_client.aiter_range(video_path, start, end, settings.stream_chunk_size),
             status_code=206,  # Partial Content
             media_type="video/mp4",
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-                # Cache video chunks for 1 hour - browser can reuse on seek
-                "Cache-Control": "public, max-age=3600",
-            },
+            headers=headers,
         )
     except HTTPException:
         raise
@@ -197,33 +701,184 @@ async def stream_video(request: Request, month: str, subpath: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/clips/{month}/{filename:path}/thumbnail")
-async def get_thumbnail(month: str, filename: str):
-    """Serve thumbnail image for a clip."""
+@router.get("/clips/{month}/{filename:path}/hls/{asset}")
+async def get_hls_asset(request: Request, month: str, filename: str, asset: str):
+    """
+    Serve an HLS playlist, init segment or media segment of a clip.
+
+    The playlist is revalidated on every use; segment names are versioned, so
+    segments are cached as immutable.
+    """
     try:
-        logger.info(f"Thumbnail - Raw: month='{month}', filename='{filename}'")
         month = unquote(month)
         filename = unquote(filename)
-        logger.info(f"Thumbnail - Decoded: month='{month}', filename='{filename}'")
-
-        # Construct thumbnail path - filename is the display name with .mp4 extension
-        # Need to strip .mp4 and add _proxy.jpg
-        # Example: "Counter-strike 2 2023.07.19 - 16.23.00.02.DVR.mp4" -> "Counter-strike 2 2023.07.19 - 16.23.00.02.DVR_proxy.jpg"
-        filename_stem = Path(filename).stem
-        thumbnail_path = (
-            f"{month}/thumbnails/{filename_stem}{settings.proxy_suffix}.jpg"
+
+        media_type = hls_media_type(asset)
+        if media_type is None:
+            raise HTTPException(status_code=404, detail="HLS asset not found")
+
+        path = hls_path(month, filename, asset)
+        file_stat = await async_file_client.stat(path)
+        if file_stat is None or file_stat.is_dir:
+            raise HTTPException(status_code=404, detail="HLS asset not found")
+
+        if asset.endswith(".m3u8"):
+            headers = {"Cache-Control": "no-cache"}
+        else:
+            headers = {"Cache-Control": "public, max-age=31536000, immutable"}
+        headers.update(validator_headers(file_stat.etag, file_stat.mtime))
+        if not_modified(request, file_stat.etag, file_stat.mtime):
+            return Response(status_code=304, headers=headers)
+
+        local_path = async_file_client.local_path(path)
+        if settings.local_file_response and local_path is not None:
+            return LocalFileResponse(local_path, media_type=media_type, headers=headers)
+
+        headers["Content-Length"] = str(file_stat.size)
+        return StreamingResponse(
+            async_file_client.aiter_range(
+                path, 0, file_stat.size - 1, settings.stream_chunk_size
+            ),
+            media_type=media_type,
+            headers=headers,
         )
-        logger.info(f"Thumbnail - Looking for: '{thumbnail_path}'")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving HLS asset: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Per-path locks for derivatives being rendered, and how many requests hold or
+# wait for each
+_render_locks: Dict[str, asyncio.Lock] = {}
+_render_waiters: Dict[str, int] = {}
+
+
+@asynccontextmanager
+async def render_lock(path: str) -> AsyncIterator[None]:
+    """
+    Hold the render lock for a path, so concurrent requests wait for a single render.
+
+    The lock is dropped only once no request holds or waits for it; dropping it
+    while a waiter remains would let the next request render alongside that one.
+    """
+    lock = _render_locks.setdefault(path, asyncio.Lock())
+    _render_waiters[path] = _render_waiters.get(path, 0) + 1
+    try:
+        async with lock:
+            yield
+    finally:
+        _render_waiters[path] -= 1
+        if not _render_waiters[path]:
+            del _render_waiters[path]
+            del _render_locks[path]
+
+
+async def render_thumbnail_derivative(
+    source_path: str, target_path: str, width: int, fmt: str
+) -> bool:
+    """
+    Render a missing thumbnail derivative and store it for later requests.
+
+    Returns:
+        True if the derivative exists afterwards
+    """
+    async with render_lock(target_path):
+        if await async_file_client.exists(target_path):
+            return True
+
+        source = await async_file_client.read(source_path)
+        content = await render_thumbnail(source, width, fmt)
+        if content is None:
+            return False
+
+        await run_in_threadpool(file_client.write_file, target_path, content)
+        logger.info(f"Thumbnail - Rendered {target_path} ({len(content)} bytes)")
+        return True
+
+
+async def read_thumbnail(path: str, file_stat: FileStat) -> bytes:
+    """Read a thumbnail through the byte cache, keyed by path and version."""
+    version = file_stat.etag or f"{file_stat.size}-{file_stat.mtime}"
+    key = f"{path}:{version}"
+
+    # The disk tier does blocking file I/O
+    if thumbnail_cache.disk_dir:
+        data = await run_in_threadpool(thumbnail_cache.get, key)
+    else:
+        data = thumbnail_cache.get(key)
+    if data is not None:
+        return data
+
+    data = await async_file_client.read(path)
+    logger.debug("Thumbnail - Read %d bytes from %s", len(data), path)
+    if thumbnail_cache.disk_dir:
+        await run_in_threadpool(thumbnail_cache.set, key, data)
+    else:
+        thumbnail_cache.set(key, data)
+    return data
+
+
+@router.get("/clips/{month}/{filename:path}/thumbnail")
+async def get_thumbnail(
+    request: Request,
+    month: str,
+    filename: str,
+    w: Optional[int] = None,
+    format: str = "jpg",
+):
+    """
+    Serve a clip thumbnail, optionally as a smaller derivative.
+
+    Args:
+        w: Display width; the smallest derivative at least this wide is served
+        format: "webp" or "jpg"
+    """
+    try:
+        month = unquote(month)
+        filename = unquote(filename)
+
+        if format not in THUMBNAIL_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+        # Full-size thumbnail - filename is the display name with .mp4 extension
+        # Example: "Counter-strike 2 2023.07.19 - 16.23.00.02.DVR.mp4" -> "2023-07/thumbnails/Counter-strike 2 2023.07.19 - 16.23.00.02.DVR_proxy.jpg"
+        original_path = thumbnail_path(month, filename)
+        path = original_path
+
+        # The largest JPEG derivative is the original itself
+        width = pick_width(w)
+        if format != "jpg" or width != THUMBNAIL_WIDTHS[-1]:
+            path = thumbnail_path(month, filename, width, format)
+        logger.debug("Thumbnail - Looking for: '%s'", path)
+
+        file_stat = await async_file_client.stat(path)
+        if file_stat is None and path != original_path:
+            rendered = False
+            if settings.thumbnail_render_on_demand and await async_file_client.exists(
+                original_path
+            ):
+                rendered = await render_thumbnail_derivative(
+                    original_path, path, width, format
+                )
+
+            if rendered:
+                file_stat = await async_file_client.stat(path)
+            else:
+                # Fall back to the full-size JPEG
+                path, format = original_path, "jpg"
+                file_stat = await async_file_client.stat(path)
 
         # Check if thumbnail exists
-        if not file_client.file_exists(thumbnail_path):
-            logger.error(f"Thumbnail - NOT FOUND: '{thumbnail_path}'")
+        if file_stat is None or file_stat.is_dir:
+            logger.error(f"Thumbnail - NOT FOUND: '{path}'")
 
             # Debug: list what's in the thumbnails directory
             thumbnails_dir = f"{month}/thumbnails"
             try:
-                files = file_client.list_files(
-                    thumbnails_dir, pattern="", exclude_proxy=False
+                files = await run_in_threadpool(
+                    file_client.list_files, thumbnails_dir, pattern="", exclude_proxy=False
                 )
                 logger.error(f"Thumbnail - Files in {thumbnails_dir}: {files[:5]}")
             except Exception as e:
@@ -231,16 +886,17 @@ async def get_thumbnail(month: str, filename: str):
 
             raise HTTPException(status_code=404, detail="Thumbnail not found")
 
-        # Read thumbnail file
-        thumbnail_data = file_client.read_file(thumbnail_path)
-        logger.info(f"Thumbnail - Successfully read {len(thumbnail_data)} bytes")
+        headers = {"Cache-Control": "public, max-age=3600"}  # Cache for 1 hour
+        headers.update(validator_headers(file_stat.etag, file_stat.mtime))
+        if not_modified(request, file_stat.etag, file_stat.mtime):
+            return Response(status_code=304, headers=headers)
 
-        return StreamingResponse(
-            io.BytesIO(thumbnail_data),
-            media_type="image/jpeg",
-            headers={
-                "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-            },
+        thumbnail_data = await read_thumbnail(path, file_stat)
+
+        return Response(
+            content=thumbnail_data,
+            media_type=THUMBNAIL_FORMATS[format],
+            headers=headers,
         )
     except HTTPException:
         raise
@@ -249,34 +905,108 @@ async def get_thumbnail(month: str, filename: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def build_sprite_sheet(layout: SpriteLayout, sheet: int) -> bool:
+    """
+    Render one sprite sheet of a month and store it for later requests.
+
+    Returns:
+        True if the sheet exists afterwards
+    """
+    path = sprite_sheet_path(layout.month, layout.version, sheet)
+
+    async with render_lock(path):
+        if await async_file_client.exists(path):
+            return True
+
+        async def tile_source(filename: str) -> bytes:
+            # Prefer the small grid derivative when encode.py has made one
+            small = thumbnail_path(layout.month, filename, SPRITE_TILE_WIDTH, "jpg")
+            if await async_file_client.exists(small):
+                return await async_file_client.read(small)
+            return await async_file_client.read(thumbnail_path(layout.month, filename))
+
+        images = await asyncio.gather(
+            *(tile_source(tile.filename) for tile in layout.sheet_tiles(sheet))
+        )
+        content = await render_sprite_sheet(list(images))
+        if content is None:
+            return False
+
+        await run_in_threadpool(file_client.write_file, path, content)
+        logger.info(f"Sprites - Rendered {path} ({len(images)} tiles, {len(content)} bytes)")
+        return True
+
+
+@router.get("/sprites/{month}")
+async def get_sprite_layout(month: str):
+    """Sprite sheet URLs and per-clip tile offsets for a month, as JSON."""
+    try:
+        layout = await load_sprite_layout(unquote(month))
+        return JSONResponse(content=layout.to_dict())
+    except Exception as e:
+        logger.error(f"Error loading sprite layout: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/sprites/{month}/{version}/{sheet}.webp")
+async def get_sprite_sheet(request: Request, month: str, version: str, sheet: int):
+    """Serve one sprite sheet, rendering it on first request."""
+    try:
+        month = unquote(month)
+        layout = await load_sprite_layout(month)
+        if version != layout.version or not 0 <= sheet < layout.sheet_count:
+            raise HTTPException(status_code=404, detail="Sprite sheet not found")
+
+        # Versioned URLs never change content, so the ETag needs no storage lookup
+        headers = {
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{version}-{sheet}"',
+        }
+        if not_modified(request, headers["ETag"], None):
+            return Response(status_code=304, headers=headers)
+
+        path = sprite_sheet_path(month, version, sheet)
+        file_stat = await async_file_client.stat(path)
+        if file_stat is None:
+            if await build_sprite_sheet(layout, sheet):
+                file_stat = await async_file_client.stat(path)
+            if file_stat is None:
+                raise HTTPException(status_code=500, detail="Could not render sprite sheet")
+
+        content = await read_thumbnail(path, file_stat)
+        return Response(content=content, media_type="image/webp", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving sprite sheet: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/clips/{month}/{subpath:path}")
 async def clip_detail(request: Request, month: str, subpath: str):
     """Clip detail view with video player and metadata form."""
     try:
-        logger.info(f"Detail - Raw: month='{month}', subpath='{subpath}'")
         month = unquote(month)
         subpath = unquote(subpath)
-        logger.info(f"Detail - Decoded: month='{month}', subpath='{subpath}'")
 
         # subpath will be "proxies/filename_proxy.mp4"
         video_path = f"{month}/{subpath}"
-        logger.info(f"Detail - Full path: '{video_path}'")
+        logger.debug("Detail - Full path: '%s'", video_path)
 
         # Extract just the filename and get display name (strip _proxy suffix)
         proxy_filename = os.path.basename(subpath)
         filename = file_client.get_display_name(proxy_filename)
 
         # Check if video exists
-        logger.info(f"Detail - Checking exists: '{video_path}'")
-        if not file_client.file_exists(video_path):
+        if not await async_file_client.exists(video_path):
             logger.error(f"Detail - NOT FOUND: '{video_path}'")
 
             # Let's list what IS in that directory to help debug
             dir_path = os.path.dirname(video_path)
             logger.error(f"Detail - Listing directory: '{dir_path}'")
             try:
-                files = file_client.list_files(
-                    dir_path, pattern="", exclude_proxy=False
+                files = await run_in_threadpool(
+                    file_client.list_files, dir_path, pattern="", exclude_proxy=False
                 )
                 logger.error(f"Detail - Files in directory: {files[:10]}")
             except Exception as e:
@@ -307,10 +1037,18 @@ async def clip_detail(request: Request, month: str, subpath: str):
             metadata=metadata,
             has_metadata=metadata is not None,
             has_proxy=has_proxy,
+            renditions=[
+                Rendition(**rendition) for rendition in metadata_db.get_clip_renditions(clip_path)
+            ],
         )
 
+        # Segmented stream from encode.py, preferred by the player when present
+        hls_url = None
+        if await async_file_client.exists(hls_path(month, filename)):
+            hls_url = f"/clips/{quote(month)}/{quote(filename)}/hls/index.m3u8"
+
         return templates.TemplateResponse(
-            "clip_detail.html", {"request": request, "clip": clip_info}
+            "clip_detail.html", {"request": request, "clip": clip_info, "hls_url": hls_url}
         )
     except HTTPException:
         raise
@@ -6,11 +6,12 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 from urllib.parse import unquote
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 
 from app.config import settings
 from app.database import metadata_db
+from app.http_cache import not_modified, parse_iso_timestamp, validator_headers
 from app.models import ClipMetadata
 
 logger = logging.getLogger(__name__)
@@ -43,9 +44,15 @@ def normalize_clip_path(month: str, filename: str) -> str:
     return f"{month}/{display_name}"
 
 
+def metadata_etag(metadata_dict: Dict[str, Any]) -> str:
+    """Build the ETag of a clip's metadata from its version and update time."""
+    updated = parse_iso_timestamp(metadata_dict.get("updated_at")) or 0.0
+    return f'"{metadata_dict.get("version", "")}-{int(updated * 1_000_000):x}"'
+
+
 @router.get("/clips/{month}/{filename:path}/metadata")
-async def get_metadata(month: str, filename: str):
-    """Retrieve metadata for a clip."""
+async def get_metadata(request: Request, month: str, filename: str):
+    """Retrieve metadata for a clip, revalidated by its update time."""
     try:
         month = unquote(month)
         filename = unquote(filename)
@@ -58,7 +65,15 @@ async def get_metadata(month: str, filename: str):
                 status_code=404, content={"detail": "Metadata not found"}
             )
 
-        return JSONResponse(content=metadata_dict)
+        etag = metadata_etag(metadata_dict)
+        updated = parse_iso_timestamp(metadata_dict.get("updated_at"))
+        # Always revalidate: edits must show up at once, but unchanged
+        # metadata costs only a 304
+        headers = {"Cache-Control": "no-cache", **validator_headers(etag, updated)}
+        if not_modified(request, etag, updated):
+            return Response(status_code=304, headers=headers)
+
+        return JSONResponse(content=metadata_dict, headers=headers)
     except Exception as e:
         logger.error(f"Error retrieving metadata: {e}")
         raise HTTPException(status_code=500, detail=str(e))
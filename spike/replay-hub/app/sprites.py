@@ -0,0 +1,174 @@
+"""Per-month thumbnail sprite sheets for the index grid.
+
+A month's thumbnails are packed into WebP sheets of fixed-size tiles, so the
+grid loads one image per sheet instead of one per clip. The layout depends
+only on the thumbnail names and sizes, which lets scripts/encode.py build the
+same sheets ahead of time. Storage layout:
+
+    {month}/thumbnails/sprites/{version}-{sheet}.webp
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.config import settings
+from app.file_client import DirEntry
+from app.thumbnails import run_ffmpeg
+
+# Tile size matches the 320px grid derivative at the cards' 16:9 aspect ratio.
+# scripts/encode.py imports these to build the same sheets offline.
+SPRITE_TILE_WIDTH = 320
+SPRITE_TILE_HEIGHT = 180
+SPRITE_COLUMNS = 8
+SPRITE_TILES_PER_SHEET = 64
+
+
+class SpriteTile(NamedTuple):
+    """Position of one clip's thumbnail in a sprite sheet."""
+
+    filename: str
+    sheet: int
+    column: int
+    row: int
+
+
+class SpriteLayout(NamedTuple):
+    """Tile positions of all thumbnails of a month."""
+
+    month: str
+    version: str
+    tiles: List[SpriteTile]
+
+    @property
+    def sheet_count(self) -> int:
+        """Number of sheets needed for all tiles."""
+        return math.ceil(len(self.tiles) / SPRITE_TILES_PER_SHEET)
+
+    def sheet_tiles(self, sheet: int) -> List[SpriteTile]:
+        """Tiles on one sheet, in sheet order."""
+        return [tile for tile in self.tiles if tile.sheet == sheet]
+
+    def sheet_rows(self, sheet: int) -> int:
+        """Number of tile rows on one sheet."""
+        return math.ceil(len(self.sheet_tiles(sheet)) / SPRITE_COLUMNS)
+
+    def sheet_url(self, sheet: int) -> str:
+        """URL of one sheet; the version makes it safe to cache forever."""
+        return f"/sprites/{self.month}/{self.version}/{sheet}.webp"
+
+    def tile_style(self, tile: SpriteTile) -> str:
+        """
+        CSS that shows a tile as the background of an element of any size.
+
+        Percentages keep the tile aligned however wide the card is rendered.
+        """
+        rows = self.sheet_rows(tile.sheet)
+        x = tile.column * 100 / (SPRITE_COLUMNS - 1)
+        y = tile.row * 100 / (rows - 1) if rows > 1 else 0
+        return (
+            f"background-image: url('{self.sheet_url(tile.sheet)}'); "
+            f"background-size: {SPRITE_COLUMNS * 100}% {rows * 100}%; "
+            f"background-position: {x:.4f}% {y:.4f}%"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Offset map for the JSON endpoint, with pixel offsets per clip."""
+        return {
+            "month": self.month,
+            "version": self.version,
+            "tile_width": SPRITE_TILE_WIDTH,
+            "tile_height": SPRITE_TILE_HEIGHT,
+            "columns": SPRITE_COLUMNS,
+            "sheets": [self.sheet_url(sheet) for sheet in range(self.sheet_count)],
+            "tiles": {
+                tile.filename: {
+                    "sheet": tile.sheet,
+                    "x": tile.column * SPRITE_TILE_WIDTH,
+                    "y": tile.row * SPRITE_TILE_HEIGHT,
+                }
+                for tile in self.tiles
+            },
+        }
+
+
+def sprite_layout(month: str, entries: List[DirEntry]) -> SpriteLayout:
+    """
+    Lay out a month's thumbnails into sprite sheet tiles.
+
+    Args:
+        month: Month directory (e.g., "2024-11")
+        entries: Listing of the month's thumbnails directory
+
+    Returns:
+        Layout of every full-size thumbnail, newest filename first
+    """
+    suffix = f"{settings.proxy_suffix}.jpg"
+    thumbnails = sorted(
+        (entry for entry in entries if not entry.is_dir and entry.name.endswith(suffix)),
+        key=lambda entry: entry.name,
+        reverse=True,
+    )
+
+    # Any added, removed or replaced thumbnail changes the version
+    fingerprint = "\n".join(f"{entry.name}:{entry.size}" for entry in thumbnails)
+    version = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+    tiles = []
+    for index, entry in enumerate(thumbnails):
+        position = index % SPRITE_TILES_PER_SHEET
+        tiles.append(
+            SpriteTile(
+                filename=entry.name[: -len(suffix)] + ".mp4",
+                sheet=index // SPRITE_TILES_PER_SHEET,
+                column=position % SPRITE_COLUMNS,
+                row=position // SPRITE_COLUMNS,
+            )
+        )
+    return SpriteLayout(month, version, tiles)
+
+
+def sprite_sheet_path(month: str, version: str, sheet: int) -> str:
+    """Get the storage path of a sprite sheet."""
+    return f"{month}/thumbnails/sprites/{version}-{sheet}.webp"
+
+
+async def render_sprite_sheet(images: List[bytes]) -> Optional[bytes]:
+    """
+    Tile JPEG thumbnails into one WebP sheet with ffmpeg.
+
+    Args:
+        images: JPEG thumbnails in tile order (any resolution)
+
+    Returns:
+        WebP sheet, or None if ffmpeg is unavailable or failed
+    """
+    rows = math.ceil(len(images) / SPRITE_COLUMNS)
+    return await run_ffmpeg(
+        [
+            # Concatenated JPEGs are read as a stream of frames
+            "-f",
+            "image2pipe",
+            "-c:v",
+            "mjpeg",
+            "-i",
+            "pipe:0",
+            "-vf",
+            (
+                f"scale={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:"
+                "force_original_aspect_ratio=decrease,"
+                f"pad={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+                f"setsar=1,tile={SPRITE_COLUMNS}x{rows}"
+            ),
+            "-frames:v",
+            "1",
+            "-c:v",
+            "libwebp",
+            "-quality",
+            "75",
+            "-f",
+            "webp",
+            "pipe:1",
+        ],
+        b"".join(images),
+    )
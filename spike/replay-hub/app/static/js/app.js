@@ -23,8 +23,11 @@ document.addEventListener('DOMContentLoaded', function() {
     const video = document.getElementById('videoPlayer');
 
     if (video) {
-        // Remember playback position
-        const videoPath = video.src;
+        // Remember playback position (keyed by the MP4 URL, even when an
+        // HLS source replaced it)
+        const videoPath = video.dataset.src
+            ? new URL(video.dataset.src, window.location.href).href
+            : video.src;
         const savedTime = localStorage.getItem(`playback_${videoPath}`);
 
         if (savedTime) {
@@ -0,0 +1,296 @@
+"""Range sizing and read-ahead for videos streamed through Python.
+
+Browsers ask for open-ended ranges ("bytes=N-") and leave the size of each
+response to the server. Instead of a fixed size, a response covers
+stream_window_seconds of playback at the clip's average bitrate, read from the
+MP4's movie header (mvhd). Where the moov box sits matters for the first
+request: with moov up front the window includes it; with moov at the end the
+player cannot decode anything before fetching it, so the first response is
+kept small, and a request into the moov gets all of it at once.
+
+While a window is sent, the next one is read from storage into a bounded
+buffer, so the player's follow-up request is answered without waiting on the
+backend.
+"""
+
+import asyncio
+import contextvars
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Window for open-ended ranges when the bitrate is unknown
+DEFAULT_WINDOW_BYTES = 10 * 1024 * 1024
+
+# Top-level boxes examined before giving up on finding moov
+MAX_TOP_LEVEL_BOXES = 16
+
+# Enough of the moov box to contain its mvhd (version 1 is 120 bytes)
+MVHD_PROBE_BYTES = 256
+
+
+class MediaLayout(NamedTuple):
+    """Where an MP4's movie box is, and its average bitrate."""
+
+    moov_start: Optional[int] = None
+    moov_end: Optional[int] = None  # exclusive
+    moov_first: bool = False  # moov before mdat ("faststart")
+    bytes_per_second: Optional[float] = None
+
+
+def parse_box_header(data: bytes) -> Optional[Tuple[int, str, int]]:
+    """
+    Parse an ISO BMFF box header.
+
+    Args:
+        data: At least the first 16 bytes of the box (8 suffice for 32-bit sizes)
+
+    Returns:
+        (size, type, header length); size 0 means "to the end of the file".
+        None if the data is too short.
+    """
+    if len(data) < 8:
+        return None
+    size, box_type = struct.unpack(">I4s", data[:8])
+    if size == 1:
+        if len(data) < 16:
+            return None
+        return struct.unpack(">Q", data[8:16])[0], box_type.decode("latin-1"), 16
+    return size, box_type.decode("latin-1"), 8
+
+
+def parse_mvhd_duration(moov: bytes) -> Optional[float]:
+    """
+    Read the movie duration from the start of a moov box's content.
+
+    Returns:
+        Duration in seconds, or None if the first child is not a usable mvhd
+    """
+    header = parse_box_header(moov)
+    if header is None or header[1] != "mvhd":
+        return None
+
+    body = moov[header[2] :]
+    if len(body) < 4:
+        return None
+    if body[0] == 1:
+        if len(body) < 32:
+            return None
+        timescale, duration = struct.unpack(">IQ", body[20:32])
+    else:
+        if len(body) < 20:
+            return None
+        timescale, duration = struct.unpack(">II", body[12:20])
+    if not timescale or not duration:
+        return None
+    return float(duration / timescale)
+
+
+async def read_range(client, path: str, start: int, end: int) -> bytes:
+    """Read a byte range (inclusive end) into memory."""
+    parts = []
+    async with client.open_range(path, start, end, settings.stream_chunk_size) as chunks:
+        async for chunk in chunks:
+            parts.append(chunk)
+    return b"".join(parts)
+
+
+async def probe_layout(client, path: str, file_size: int) -> MediaLayout:
+    """
+    Locate the moov box and read the movie duration with a few small range reads.
+
+    Args:
+        client: Async file client to read through
+        path: Storage path of the MP4
+        file_size: Size of the file
+
+    Returns:
+        The layout; fields stay None for what could not be determined
+    """
+    offset = 0
+    seen_mdat = False
+    for _ in range(MAX_TOP_LEVEL_BOXES):
+        if offset + 8 > file_size:
+            break
+        data = await read_range(client, path, offset, min(offset + 15, file_size - 1))
+        header = parse_box_header(data)
+        if header is None:
+            break
+        size, box_type, header_length = header
+        if size == 0:
+            size = file_size - offset
+        if size < header_length:
+            break
+
+        if box_type == "moov":
+            content_start = offset + header_length
+            moov = await read_range(
+                client,
+                path,
+                content_start,
+                min(content_start + MVHD_PROBE_BYTES, offset + size) - 1,
+            )
+            duration = parse_mvhd_duration(moov)
+            return MediaLayout(
+                moov_start=offset,
+                moov_end=offset + size,
+                moov_first=not seen_mdat,
+                bytes_per_second=file_size / duration if duration else None,
+            )
+
+        seen_mdat = seen_mdat or box_type == "mdat"
+        offset += size
+    return MediaLayout()
+
+
+def window_end(layout: MediaLayout, start: int, file_size: int) -> int:
+    """
+    Pick the end (inclusive) of the response to an open-ended range.
+
+    Args:
+        layout: Layout of the file, from probe_layout
+        start: First byte requested
+        file_size: Size of the file
+    """
+    if layout.bytes_per_second:
+        window = int(layout.bytes_per_second * settings.stream_window_seconds)
+    else:
+        window = DEFAULT_WINDOW_BYTES
+    window = max(settings.stream_window_min_bytes, min(window, settings.stream_window_max_bytes))
+
+    moov_start, moov_end = layout.moov_start, layout.moov_end
+    if moov_start is not None and moov_end is not None and moov_start <= start < moov_end:
+        # The player needs the whole moov before it can play anything
+        end = max(moov_end - 1, start + window - 1)
+    elif start == 0 and moov_end is not None:
+        if layout.moov_first:
+            # Headers plus the first window of media, so playback starts at once
+            end = moov_end + window - 1
+        else:
+            # Nothing decodes before the player has fetched the trailing moov
+            end = settings.stream_window_min_bytes - 1
+    else:
+        end = start + window - 1
+    return min(end, file_size - 1)
+
+
+class ReadAheadBuffer:
+    """
+    Windows read from storage ahead of the request for them, bounded by total size.
+
+    Reads run as background tasks; taking a window that is still being read
+    waits for it. When a new read would exceed the budget, the oldest windows
+    are dropped (and their reads cancelled).
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_bytes: Maximum total size of the windows held or being read
+        """
+        self.max_bytes = max_bytes
+        self._windows: "OrderedDict[Hashable, Tuple[asyncio.Task[bytes], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def prefetch(self, key: Hashable, size: int, load: Callable[[], Awaitable[bytes]]):
+        """
+        Start reading a window in the background, unless it is already buffered.
+
+        Must be called from the event loop.
+
+        Args:
+            key: Identifies the window, including the file version
+            size: Size of the window in bytes
+            load: Reads the window
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._windows:
+                return
+            while self._bytes + size > self.max_bytes:
+                _, (task, evicted_size) = self._windows.popitem(last=False)
+                task.cancel()
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+            # A fresh context, so the read isn't counted in the current
+            # request's summary line
+            task = contextvars.Context().run(asyncio.ensure_future, load())
+            task.add_done_callback(self._read_done)
+            self._windows[key] = (task, size)
+            self._bytes += size
+
+    @staticmethod
+    def _read_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Read-ahead failed: %s", task.exception())
+
+    async def take(self, key: Hashable) -> Optional[bytes]:
+        """
+        Remove a window from the buffer, waiting for its read to finish.
+
+        Returns:
+            The window's bytes, or None if it was not buffered or its read failed
+        """
+        with self._lock:
+            entry = self._windows.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            task, size = entry
+            self._bytes -= size
+
+        try:
+            data = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # The request itself was cancelled
+                task.cancel()
+                raise
+            data = None
+        except Exception:
+            data = None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def clear(self):
+        """Drop all windows, cancelling pending reads."""
+        with self._lock:
+            for task, _ in self._windows.values():
+                task.cancel()
+            self._windows.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._windows),
+                "bytes": self._bytes,
+            }
+
+
+# Windows prefetched for stream_video
+read_ahead = ReadAheadBuffer(settings.stream_readahead_max_bytes)
@@ -0,0 +1,142 @@
+"""Thumbnail paths and derivative rendering.
+
+Besides the full-size JPEG, each clip can have smaller WebP/JPEG derivatives for
+the index grid. scripts/encode.py writes them at encode time; the thumbnail
+route renders any that are missing on first request. Storage layout:
+
+    {month}/thumbnails/{stem}{proxy_suffix}.jpg            full-size original
+    {month}/thumbnails/{width}/{stem}{proxy_suffix}.{ext}  derivatives
+"""
+
+import asyncio
+import functools
+import logging
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Derivative widths; the largest matches the full-size thumbnail from encode.py
+THUMBNAIL_WIDTHS = (320, 640, 1920)
+
+# Derivative formats and their media types
+THUMBNAIL_FORMATS = {
+    "webp": "image/webp",
+    "jpg": "image/jpeg",
+}
+
+# ffmpeg output options per format
+_FFMPEG_FORMAT_ARGS = {
+    "webp": ["-c:v", "libwebp", "-quality", "80", "-f", "webp"],
+    "jpg": ["-c:v", "mjpeg", "-q:v", "4", "-f", "image2pipe"],
+}
+
+# Set once ffmpeg turns out to be missing, so each request doesn't retry it
+_ffmpeg_missing = False
+
+
+def thumbnail_path(month: str, filename: str, width: Optional[int] = None, fmt: str = "jpg") -> str:
+    """
+    Get the storage path of a clip thumbnail.
+
+    Args:
+        month: Month directory (e.g., "2024-11")
+        filename: Display filename of the clip (e.g., "clip.mp4")
+        width: Derivative width, or None for the full-size original
+        fmt: Derivative format, a key of THUMBNAIL_FORMATS
+
+    Returns:
+        Relative path to the thumbnail file
+    """
+    name = f"{Path(filename).stem}{settings.proxy_suffix}"
+    if width is None:
+        return f"{month}/thumbnails/{name}.jpg"
+    return f"{month}/thumbnails/{width}/{name}.{fmt}"
+
+
+def pick_width(requested: Optional[int]) -> int:
+    """Get the smallest derivative width that covers the requested width."""
+    if requested is None:
+        return THUMBNAIL_WIDTHS[-1]
+    for width in THUMBNAIL_WIDTHS:
+        if width >= requested:
+            return width
+    return THUMBNAIL_WIDTHS[-1]
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_on_path(ffmpeg_path: str) -> bool:
+    """Check whether an ffmpeg executable exists."""
+    return shutil.which(ffmpeg_path) is not None
+
+
+def ffmpeg_available() -> bool:
+    """Whether ffmpeg can be run, for features that must decide up front."""
+    return not _ffmpeg_missing and _ffmpeg_on_path(settings.ffmpeg_path)
+
+
+async def run_ffmpeg(args: List[str], input_data: bytes) -> Optional[bytes]:
+    """
+    Run ffmpeg with data on stdin and return its stdout.
+
+    Args:
+        args: ffmpeg arguments, reading from pipe:0 and writing to pipe:1
+        input_data: Bytes to feed on stdin
+
+    Returns:
+        ffmpeg output, or None if ffmpeg is unavailable or failed
+    """
+    global _ffmpeg_missing
+    if _ffmpeg_missing:
+        return None
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            settings.ffmpeg_path,
+            "-v",
+            "error",
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        _ffmpeg_missing = True
+        logger.warning("ffmpeg not found; thumbnail derivatives and sprites are disabled")
+        return None
+
+    stdout, stderr = await process.communicate(input_data)
+    if process.returncode != 0 or not stdout:
+        logger.error(f"ffmpeg failed: {stderr.decode(errors='replace')}")
+        return None
+    return stdout
+
+
+async def render_thumbnail(source: bytes, width: int, fmt: str) -> Optional[bytes]:
+    """
+    Render a derivative from the full-size thumbnail with ffmpeg.
+
+    Args:
+        source: Full-size JPEG thumbnail content
+        width: Target width (never upscaled beyond the source)
+        fmt: Output format, a key of THUMBNAIL_FORMATS
+
+    Returns:
+        Encoded image, or None if ffmpeg is unavailable or failed
+    """
+    return await run_ffmpeg(
+        [
+            "-i",
+            "pipe:0",
+            "-vf",
+            f"scale='min({width},iw)':-1",
+            "-frames:v",
+            "1",
+            *_FFMPEG_FORMAT_ARGS[fmt],
+            "pipe:1",
+        ],
+        source,
+    )
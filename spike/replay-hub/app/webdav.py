@@ -0,0 +1,102 @@
+"""WebDAV protocol helpers shared by the sync and async file clients."""
+
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from typing import List, NamedTuple, Optional
+from urllib.parse import quote, unquote, urlparse
+
+# Request only the properties we actually use, so the server doesn't compute
+# quota or checksum properties for every entry
+PROPFIND_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:"><d:prop>'
+    b"<d:resourcetype/><d:getcontentlength/><d:getetag/><d:getlastmodified/>"
+    b"</d:prop></d:propfind>"
+)
+
+_DAV = "{DAV:}"
+
+
+class PropfindEntry(NamedTuple):
+    """A single <d:response> from a PROPFIND multistatus body."""
+
+    href: str
+    is_dir: bool
+    size: int
+    mtime: Optional[float]
+    etag: Optional[str]
+
+
+def webdav_path(root_path: str, path: str) -> str:
+    """
+    Convert a path relative to the storage root to a full WebDAV path.
+
+    Args:
+        root_path: Configured root folder (e.g., "replays/"), or "" or "/" for none
+        path: Path relative to it; a leading slash is ignored
+    """
+    path = path.lstrip("/")
+    if not root_path or root_path == "/":
+        return path if path else "/"
+
+    root = root_path.rstrip("/")
+    return f"{root}/{path}" if path else root
+
+
+def build_url(base_url: str, full_path: str) -> str:
+    """
+    Build the absolute URL for a full WebDAV path.
+
+    The base URL already includes the DAV prefix
+    (e.g., https://drive.shkhr.ovh/remote.php/dav/files/replay-hub/), so the
+    path components are URL encoded and appended, leaving slashes intact.
+    """
+    encoded_path = "/".join(quote(part, safe="") for part in full_path.split("/"))
+    return f"{base_url.rstrip('/')}/{encoded_path}"
+
+
+def parse_propfind(content: bytes) -> List[PropfindEntry]:
+    """
+    Parse a PROPFIND multistatus response.
+
+    Args:
+        content: Raw XML response body
+
+    Returns:
+        One entry per <d:response>, with the href URL-decoded to a plain path
+    """
+    entries = []
+    root = ET.fromstring(content)
+
+    for response in root.iter(f"{_DAV}response"):
+        href = response.findtext(f"{_DAV}href") or ""
+        href = unquote(urlparse(href).path)
+
+        prop = None
+        for propstat in response.iter(f"{_DAV}propstat"):
+            status = propstat.findtext(f"{_DAV}status") or ""
+            if " 200 " in status:
+                prop = propstat.find(f"{_DAV}prop")
+                break
+        if prop is None:
+            continue
+
+        resourcetype = prop.find(f"{_DAV}resourcetype")
+        is_dir = resourcetype is not None and resourcetype.find(f"{_DAV}collection") is not None
+
+        size_text = prop.findtext(f"{_DAV}getcontentlength")
+        size = int(size_text) if size_text else 0
+
+        mtime = None
+        modified = prop.findtext(f"{_DAV}getlastmodified")
+        if modified:
+            try:
+                mtime = parsedate_to_datetime(modified).timestamp()
+            except (TypeError, ValueError):
+                mtime = None
+
+        etag = prop.findtext(f"{_DAV}getetag") or None
+
+        entries.append(PropfindEntry(href, is_dir, size, mtime, etag))
+
+    return entries
@@ -16,10 +16,6 @@ logging.basicConfig(format='[%(levelname)8s] %(asctime)s %(filename)16s:L%(linen
 
 logger = logging.getLogger(__name__)
 
-base_dir = Path(os.getcwd())
-mp4_files = list(base_dir.glob('*.mp4'))
-logging.info('Found %d mp4 files to arrange', len(mp4_files))
-
 name_pat = re.compile(r'([^\d]+) ([\d]+)\.([\d]+)\..*')
 
 def get_year_month(file: Path) -> Optional[str]:
@@ -54,16 +50,30 @@ def get_creation_date(path_to_file) -> datetime.datetime:
             # so we'll settle for when its content was last modified.
             return datetime.datetime.fromtimestamp(stat.st_mtime)
 
-for file in sorted(mp4_files):
-    try:
-        yyyy_mm = get_year_month(file)
+def arrange_file(file: Path, base_dir: Path) -> Path:
+    """Move a file into its month folder under base_dir and return its new path."""
+    yyyy_mm = get_year_month(file)
+
+    month_folder: Path = base_dir / yyyy_mm
+
+    if not month_folder.exists():
+        logging.info('Creating folder: %s', month_folder)
+        month_folder.mkdir()
 
-        month_folder: Path = base_dir / yyyy_mm
+    destination = month_folder / file.name
+    os.rename(file, destination)
+    return destination
 
-        if not month_folder.exists():
-            logging.info('Creating folder: %s', month_folder)
-            month_folder.mkdir()
+def main():
+    base_dir = Path(os.getcwd())
+    mp4_files = list(base_dir.glob('*.mp4'))
+    logging.info('Found %d mp4 files to arrange', len(mp4_files))
+
+    for file in sorted(mp4_files):
+        try:
+            arrange_file(file, base_dir)
+        except:
+            logger.exception('Could not convert file: %s', file)
 
-        os.rename(file, month_folder / file.name)
-    except:
-        logger.exception('Could not convert file: %s', file)
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,14 @@
 
 '''
 encode.py -- generate good quality, low bandwidth proxies for clips in the
-current folder, using HandbrakeCLI.
+current folder, using HandbrakeCLI (or ffmpeg, see ENCODE_PROFILES).
 
 Goals:
 1. Generate acceptable quality proxies (5mbps 1080p60, h.265).
 2. Be resumable.
 3. Generate some metadata for each clip (thumbs).
+4. Segment clips into HLS streams for faster start and seeking, with an
+adaptive bitrate ladder so slow links can step down instead of stalling.
 
 Assumptions:
 1. File names don't change.
@@ -16,11 +18,35 @@ otherwise).
 '''
 
 import argparse
+import functools
+import hashlib
+import json
+import math
 import os
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.sprites import (
+    SPRITE_COLUMNS,
+    SPRITE_TILE_HEIGHT,
+    SPRITE_TILE_WIDTH,
+    SPRITE_TILES_PER_SHEET,
+)
+
+
+# Encode manifest in the input folder, see JobState
+JOB_STATE_FILENAME = '.encode-state.json'
+
 
 def get_month_folders(directory):
     """Find all month-formatted folders (YYYY-MM) in the directory."""
@@ -70,63 +96,623 @@ def get_thumbnail_path(input_path, suffix='_proxy'):
     return thumbnails_dir / thumbnail_filename
 
 
-def generate_thumbnail(video_path, output_path, timestamp='00:00:05'):
+# Thumbnails are picked from the proxy's keyframes in this part of the clip,
+# as (fraction of the duration, cap in seconds): from 10% (at most 1s) in to
+# 50% (at most 60s) in, skipping fade-ins at the very start
+THUMBNAIL_SCAN_START = (0.1, 1.0)
+THUMBNAIL_SCAN_END = (0.5, 60.0)
+
+# Keyframes darker than this average luma (8-bit, limited range starts at
+# 16) count as black
+THUMBNAIL_BLACK_LUMA = 32
+
+# Part of the thumbnail settings in the manifest; change it when the
+# selection changes so existing thumbnails are regenerated
+THUMBNAIL_METHOD = 'proxy-keyframe-scene'
+
+
+def get_partial_path(output_path):
+    """
+    Hidden temp path to write an output to before renaming it into place.
+
+    A crash then never leaves a half-written file under the final name. The
+    extension is kept so ffmpeg still picks the right format.
     """
-    Generate a thumbnail from the video at a specific timestamp using ffmpeg.
+    return output_path.with_name(f".{output_path.stem}.partial{output_path.suffix}")
+
+
+def probe_duration(video_path):
+    """Get a video's duration in seconds from ffmpeg's input summary, or None."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-i', str(video_path)],
+            capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        return None
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def pick_thumbnail_time(video_path, duration):
+    """
+    Pick a thumbnail frame among the keyframes of a video.
+
+    Only keyframes are decoded (at 160px wide), so this reads a fraction of the
+    file. Each keyframe gets a scene-change score and an average luma; the
+    non-black keyframe that differs most from the one before it wins, the
+    earliest on ties. If every keyframe is black, the brightest one is used.
+    Keyframes before the scan window only count if there are none in it, as
+    in short clips with a single keyframe.
 
     Args:
-        video_path: Path to video file
+        video_path: Path to the video (the proxy)
+        duration: Probed duration in seconds, or None if unknown
+
+    Returns:
+        Presentation time of the chosen keyframe in seconds, or None if no
+        keyframe could be read
+    """
+    if duration:
+        start = min(duration * THUMBNAIL_SCAN_START[0], THUMBNAIL_SCAN_START[1])
+        end = min(duration * THUMBNAIL_SCAN_END[0], THUMBNAIL_SCAN_END[1])
+    else:
+        start, end = THUMBNAIL_SCAN_START[1], THUMBNAIL_SCAN_END[1]
+
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-skip_frame', 'nokey',  # Decode keyframes only
+        '-t', f'{max(end, start + 1.0):.3f}',
+        '-i', str(video_path),
+        '-an',
+        '-vf', "scale=160:-2,select='gte(scene,0)',signalstats,metadata=print:file=-",
+        '-fps_mode', 'passthrough',
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+
+    # metadata=print writes a "frame:N pts:... pts_time:T" line, then key=value lines
+    keyframes = []
+    for line in result.stdout.splitlines():
+        if line.startswith('frame:'):
+            match = re.search(r'pts_time:(\S+)', line)
+            if match:
+                keyframes.append({'time': float(match.group(1)), 'scene': 0.0, 'luma': 0.0})
+        elif keyframes and line.startswith('lavfi.scene_score='):
+            keyframes[-1]['scene'] = float(line.split('=', 1)[1])
+        elif keyframes and line.startswith('lavfi.signalstats.YAVG='):
+            keyframes[-1]['luma'] = float(line.split('=', 1)[1])
+
+    if not keyframes:
+        return None
+
+    keyframes = [frame for frame in keyframes if frame['time'] >= start] or keyframes
+    lit = [frame for frame in keyframes if frame['luma'] >= THUMBNAIL_BLACK_LUMA]
+    if lit:
+        best = max(lit, key=lambda frame: (frame['scene'], -frame['time']))
+    else:
+        best = max(keyframes, key=lambda frame: frame['luma'])
+    return best['time']
+
+
+def generate_thumbnail(video_path, output_path):
+    """
+    Generate a thumbnail from a keyframe of the video using ffmpeg.
+
+    Meant to run on the freshly written proxy rather than the multi-GB
+    original. The frame is chosen by pick_thumbnail_time within the probed
+    duration, so short clips never seek past their end, and is extracted by
+    seeking straight to that keyframe without decoding anything before it.
+
+    Args:
+        video_path: Path to video file (the proxy)
         output_path: Path to output thumbnail
-        timestamp: Timestamp to capture (default: 5 seconds in)
     """
+    duration = probe_duration(video_path)
+    timestamp = pick_thumbnail_time(video_path, duration) or 0.0
+
     cmd = [
         'ffmpeg',
-        '-ss', timestamp,  # Seek to timestamp
+        # Seek to just before the chosen keyframe and decode only keyframes,
+        # so the keyframe itself is the first frame out
+        '-ss', f'{max(timestamp - 0.001, 0):.3f}',
+        '-skip_frame', 'nokey',
         '-i', str(video_path),
         '-vframes', '1',  # Extract 1 frame
         '-q:v', '2',  # High quality JPEG (1-31, lower is better)
         '-vf', 'scale=1920:-1',  # Scale to 1920 width, preserve aspect ratio
         '-y',  # Overwrite output file
-        str(output_path)
+        str(get_partial_path(output_path))
     ]
 
     try:
         result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return True
-        else:
-            print(f"  ⚠ Thumbnail generation failed: {result.stderr}", file=sys.stderr)
-            return False
     except FileNotFoundError:
         print("  ⚠ ffmpeg not found. Skipping thumbnail generation.", file=sys.stderr)
         return False
 
+    if result.returncode == 0 and get_partial_path(output_path).exists():
+        os.replace(get_partial_path(output_path), output_path)
+        return True
+
+    print(f"  ⚠ Thumbnail generation failed: {result.stderr or f'no frame at {timestamp:.3f}s'}", file=sys.stderr)
+    get_partial_path(output_path).unlink(missing_ok=True)
+    return False
+
 
-def encode_video(input_path, output_path, bitrate='5000', resolution='1920:1080', framerate='60'):
+# Smaller thumbnail versions for the web grid, as (width, extension, ffmpeg
+# output options). Written to thumbnails/{width}/, the layout app/thumbnails.py
+# serves; the 1920 JPEG is the full-size thumbnail itself.
+THUMBNAIL_DERIVATIVES = [
+    (320, 'webp', ['-c:v', 'libwebp', '-quality', '80']),
+    (320, 'jpg', ['-q:v', '4']),
+    (640, 'webp', ['-c:v', 'libwebp', '-quality', '80']),
+    (640, 'jpg', ['-q:v', '4']),
+    (1920, 'webp', ['-c:v', 'libwebp', '-quality', '80']),
+]
+
+
+def generate_thumbnail_derivatives(thumbnail_path, force=False):
     """
-    Encode video using HandBrakeCLI with NVENC hardware acceleration.
-    Optimized for web streaming with fast-start enabled.
+    Generate the smaller WebP/JPEG versions of a thumbnail.
 
     Args:
-        input_path: Path to input video file
-        output_path: Path to output video file
-        bitrate: Target video bitrate in kbps (default: 5000)
-        resolution: Output resolution as width:height (default: 1920:1080)
-        framerate: Target framerate (default: 60)
+        thumbnail_path: Path to the full-size JPEG thumbnail
+        force: Regenerate derivatives that already exist
+
+    Returns:
+        Number of derivatives generated
     """
-    # Create temporary output path in .cache subfolder
-    cache_dir = input_path.parent / '.cache'
-    cache_dir.mkdir(exist_ok=True)
-    temp_output = cache_dir / f"{output_path.stem}_temp{output_path.suffix}"
+    generated = 0
+
+    for width, extension, codec_args in THUMBNAIL_DERIVATIVES:
+        output_dir = thumbnail_path.parent / str(width)
+        output_dir.mkdir(exist_ok=True)
+        output_path = output_dir / f"{thumbnail_path.stem}.{extension}"
+
+        if output_path.exists() and not force:
+            continue
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(thumbnail_path),
+            '-vf', f"scale='min({width},iw)':-1",  # Never upscale
+            *codec_args,
+            '-y',
+            str(get_partial_path(output_path))
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("  ⚠ ffmpeg not found. Skipping thumbnail derivatives.", file=sys.stderr)
+            break
+
+        if result.returncode == 0:
+            os.replace(get_partial_path(output_path), output_path)
+            generated += 1
+        else:
+            print(f"  ⚠ Thumbnail derivative {width}w {extension} failed: {result.stderr}", file=sys.stderr)
+            get_partial_path(output_path).unlink(missing_ok=True)
+
+    return generated
+
+
+def generate_sprite_sheets(folder_path, suffix='_proxy'):
+    """
+    Generate the WebP sprite sheets of a month folder's thumbnails.
+
+    Sheets are named after a hash of the thumbnail names and sizes, so adding or
+    replacing a thumbnail produces new sheets and existing ones are never stale.
+    The version and tile order must match app.sprites.sprite_layout, so the app
+    finds these sheets instead of rendering its own.
+
+    Args:
+        folder_path: Month folder containing a thumbnails subfolder
+        suffix: Proxy filename suffix used in thumbnail names
+
+    Returns:
+        Number of sheets generated
+    """
+    thumbnails_dir = folder_path / 'thumbnails'
+    if not thumbnails_dir.is_dir():
+        return 0
+
+    thumbnails = sorted(
+        thumbnails_dir.glob(f'*{suffix}.jpg'), key=lambda path: path.name, reverse=True
+    )
+    if not thumbnails:
+        return 0
+
+    fingerprint = "\n".join(f"{path.name}:{path.stat().st_size}" for path in thumbnails)
+    version = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+    sprites_dir = thumbnails_dir / 'sprites'
+    sprites_dir.mkdir(exist_ok=True)
+    generated = 0
+
+    for sheet, start in enumerate(range(0, len(thumbnails), SPRITE_TILES_PER_SHEET)):
+        output_path = sprites_dir / f"{version}-{sheet}.webp"
+        if output_path.exists():
+            continue
+
+        batch = thumbnails[start:start + SPRITE_TILES_PER_SHEET]
+        rows = math.ceil(len(batch) / SPRITE_COLUMNS)
+
+        # Prefer the small derivatives, they decode much faster
+        sources = []
+        for path in batch:
+            small = thumbnails_dir / str(SPRITE_TILE_WIDTH) / path.name
+            sources.append(small if small.exists() else path)
+
+        cmd = [
+            'ffmpeg',
+            '-f', 'image2pipe', '-c:v', 'mjpeg', '-i', 'pipe:0',  # Concatenated JPEGs
+            '-vf', (
+                f"scale={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+                f"setsar=1,tile={SPRITE_COLUMNS}x{rows}"
+            ),
+            '-frames:v', '1',
+            '-c:v', 'libwebp', '-quality', '75',
+            '-y',
+            str(get_partial_path(output_path))
+        ]
+
+        try:
+            result = subprocess.run(
+                cmd, input=b"".join(path.read_bytes() for path in sources), capture_output=True
+            )
+        except FileNotFoundError:
+            print("  ⚠ ffmpeg not found. Skipping sprite sheets.", file=sys.stderr)
+            break
+
+        if result.returncode == 0:
+            os.replace(get_partial_path(output_path), output_path)
+            generated += 1
+        else:
+            get_partial_path(output_path).unlink(missing_ok=True)
+            print(f"  ⚠ Sprite sheet {sheet} failed: {result.stderr.decode(errors='replace')}", file=sys.stderr)
+
+    return generated
+
+
+def get_hls_dir(input_path):
+    """Get the HLS output folder for a clip (hls/<stem> next to the clip)."""
+    return input_path.parent / 'hls' / input_path.stem
+
+
+def get_hls_version(path, *parts):
+    """
+    Version of an HLS stream built from a file, used as its segment name prefix.
+
+    Args:
+        path: File the stream is built from
+        *parts: Encode settings that also change the output (e.g. the ladder)
+    """
+    stat_result = path.stat()
+    fingerprint = ':'.join(
+        [path.name, str(stat_result.st_size), str(stat_result.st_mtime_ns), *parts]
+    )
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:8]
+
+
+def remove_stale_hls(hls_dir, version):
+    """Drop the segments and playlists of previous encodes of a clip."""
+    for path in hls_dir.iterdir():
+        if path.name != 'index.m3u8' and not path.name.startswith(f'{version}_'):
+            path.unlink()
+
+
+def generate_hls(proxy_path, hls_dir, segment_duration=4, video_tag='hvc1'):
+    """
+    Segment a proxy into an fMP4 HLS playlist without re-encoding.
+
+    Segment and init names start with a version derived from the proxy file,
+    so the app can serve them as immutable. Files of older versions are
+    removed once the new playlist is in place.
+
+    Args:
+        proxy_path: Path to the encoded proxy
+        hls_dir: Output folder for index.m3u8 and its segments
+        segment_duration: Target segment length in seconds (cut on keyframes)
+        video_tag: Codec tag for the video track (hvc1 lets Apple devices play HEVC)
+    """
+    version = get_hls_version(proxy_path)
+
+    hls_dir.mkdir(parents=True, exist_ok=True)
+    playlist_path = hls_dir / 'index.m3u8'
 
     cmd = [
+        'ffmpeg',
+        '-i', str(proxy_path),
+        '-c', 'copy',  # Segment the proxy as is
+        '-tag:v', video_tag,
+        '-f', 'hls',
+        '-hls_time', str(segment_duration),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_type', 'fmp4',
+        '-hls_fmp4_init_filename', f'{version}_init.mp4',
+        '-hls_segment_filename', str(hls_dir / f'{version}_%05d.m4s'),
+        '-hls_flags', 'temp_file',  # Never expose a half-written playlist
+        '-y',
+        str(playlist_path)
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        print("  ⚠ ffmpeg not found. Skipping HLS segmentation.", file=sys.stderr)
+        return False
+
+    if result.returncode != 0:
+        print(f"  ⚠ HLS segmentation failed: {result.stderr}", file=sys.stderr)
+        return False
+
+    remove_stale_hls(hls_dir, version)
+    return True
+
+
+# Suggested adaptive bitrate ladder as height:kbps rungs. The top rung matches
+# the proxy; the lower ones keep playback going on slow remote links. Ladders
+# are opt-in: each rung is another encode of the source on top of the proxy.
+SUGGESTED_LADDER = '480p:1200,720p:2500,1080p:5000'
+
+# Rate control and keyframe options per ffmpeg encoder, plus the codec tag for
+# the video track. Scene-cut keyframes are disabled so that every rendition
+# starts its segments on the same frames and players can switch between them.
+LADDER_ENCODERS = {
+    'hevc_nvenc': (['-preset', 'p4', '-no-scenecut', '1'], 'hvc1'),
+    'libx265': (['-preset', 'medium', '-x265-params', 'scenecut=0:open-gop=0:log-level=error'], 'hvc1'),
+    'h264_nvenc': (['-preset', 'p4', '-no-scenecut', '1'], 'avc1'),
+    'libx264': (['-preset', 'medium', '-sc_threshold', '0'], 'avc1'),
+}
+
+
+def parse_ladder(spec):
+    """
+    Parse a bitrate ladder such as "480p:1200,720p:2500,1080p:5000".
+
+    Args:
+        spec: Comma-separated height:kbps rungs (the "p" is optional)
+
+    Returns:
+        List of (height, kbps) tuples, lowest rung first
+
+    Raises:
+        ValueError: If a rung is malformed or a height appears twice
+    """
+    ladder = []
+    for rung in spec.split(','):
+        rung = rung.strip()
+        if not rung:
+            continue
+        height, sep, kbps = rung.partition(':')
+        try:
+            height = int(height.strip().lower().rstrip('p'))
+            kbps = int(kbps)
+        except ValueError:
+            raise ValueError(f"Invalid ladder rung {rung!r}, expected e.g. 720p:2500")
+        if not sep or height <= 0 or kbps <= 0:
+            raise ValueError(f"Invalid ladder rung {rung!r}, expected e.g. 720p:2500")
+        if any(existing == height for existing, _ in ladder):
+            raise ValueError(f"Duplicate ladder height: {height}p")
+        ladder.append((height, kbps))
+
+    if not ladder:
+        raise ValueError("Ladder has no rungs")
+    return sorted(ladder)
+
+
+def format_ladder(ladder):
+    """Format a parsed ladder back into its height:kbps spec."""
+    return ','.join(f'{height}p:{kbps}' for height, kbps in ladder)
+
+
+def has_audio(video_path):
+    """Check whether a video has an audio track (ffmpeg lists it on stderr)."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-i', str(video_path)],
+            capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        return False
+    return 'Audio:' in result.stderr
+
+
+def generate_hls_ladder(input_path, hls_dir, ladder, segment_duration=4,
+                        framerate='60', encoder='hevc_nvenc'):
+    """
+    Encode every rung of a bitrate ladder from the source in one ffmpeg pass.
+
+    The source is decoded once and split into one scaled encode per rung. Each
+    rung gets its own fMP4 playlist, and index.m3u8 becomes the master playlist
+    listing them, so players pick a rendition by bandwidth.
+
+    Args:
+        input_path: Path to the original clip
+        hls_dir: Output folder for index.m3u8 and the renditions
+        ladder: (height, kbps) rungs from parse_ladder
+        segment_duration: Target segment length in seconds
+        framerate: Target framerate
+        encoder: ffmpeg video encoder, a key of LADDER_ENCODERS
+    """
+    encoder_args, video_tag = LADDER_ENCODERS[encoder]
+    ladder_spec = format_ladder(ladder)
+    version = get_hls_version(input_path, ladder_spec, encoder)
+
+    hls_dir.mkdir(parents=True, exist_ok=True)
+    playlist_path = hls_dir / 'index.m3u8'
+
+    # Decode once, then scale a copy of the frames for each rung
+    labels = ''.join(f'[v{i}]' for i in range(len(ladder)))
+    filters = [f'[0:v]split={len(ladder)}{labels}']
+    filters += [f'[v{i}]scale=-2:{height}[out{i}]' for i, (height, _) in enumerate(ladder)]
+
+    # ffmpeg only expands %v in the init name when there are several variants
+    init_variant = '%v' if len(ladder) > 1 else f'{ladder[0][0]}p'
+
+    audio = has_audio(input_path)
+    gop = round(float(framerate) * segment_duration)
+
+    cmd = ['ffmpeg', '-i', str(input_path), '-filter_complex', ';'.join(filters)]
+    stream_map = []
+    for i, (height, kbps) in enumerate(ladder):
+        cmd += ['-map', f'[out{i}]']
+        cmd += [
+            f'-b:v:{i}', f'{kbps}k',
+            f'-maxrate:v:{i}', f'{round(kbps * 1.1)}k',
+            f'-bufsize:v:{i}', f'{kbps * 2}k',
+        ]
+        stream_map.append(f'v:{i},a:{i},name:{height}p' if audio else f'v:{i},name:{height}p')
+    if audio:
+        # Every rendition carries its own copy of the first audio track
+        cmd += ['-map', '0:a:0'] * len(ladder)
+        cmd += ['-c:a', 'aac', '-b:a', '128k']
+
+    cmd += [
+        '-c:v', encoder,
+        *encoder_args,
+        '-tag:v', video_tag,
+        '-r', framerate,
+        # Keyframes on segment boundaries, identical across renditions
+        '-g', str(gop),
+        '-keyint_min', str(gop),
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_duration})',
+        '-f', 'hls',
+        '-hls_time', str(segment_duration),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_type', 'fmp4',
+        '-hls_fmp4_init_filename', f'{version}_{init_variant}_init.mp4',
+        '-hls_segment_filename', str(hls_dir / f'{version}_%v_%05d.m4s'),
+        '-hls_flags', 'temp_file',
+        '-var_stream_map', ' '.join(stream_map),
+        '-master_pl_name', playlist_path.name,
+        '-y',
+        str(hls_dir / f'{version}_%v.m3u8')
+    ]
+
+    print(f"Encoding {len(ladder)} rendition(s): {ladder_spec}")
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        print("  ⚠ ffmpeg not found. Skipping HLS ladder.", file=sys.stderr)
+        return False
+
+    if result.returncode != 0:
+        print(f"  ⚠ HLS ladder encode failed: {result.stderr}", file=sys.stderr)
+        return False
+
+    remove_stale_hls(hls_dir, version)
+    return True
+
+
+def hls_is_current(input_path, hls_dir, args):
+    """Whether a clip's HLS stream exists and was built with the current settings."""
+    playlist_path = hls_dir / 'index.m3u8'
+    if not playlist_path.exists():
+        return False
+    if not args.ladder:
+        return True
+
+    # Ladder streams are versioned by the source and the ladder settings
+    version = get_hls_version(input_path, format_ladder(args.ladder), args.ladder_encoder)
+    return any(hls_dir.glob(f'{version}_*.m3u8'))
+
+
+def segment_clip(input_path, output_path, args):
+    """Build a clip's HLS stream: the ladder from the source, or the proxy as is."""
+    hls_dir = get_hls_dir(input_path)
+    if args.ladder:
+        return generate_hls_ladder(
+            input_path,
+            hls_dir,
+            args.ladder,
+            args.hls_segment_duration,
+            args.framerate,
+            args.ladder_encoder
+        )
+    return generate_hls(output_path, hls_dir, args.hls_segment_duration, get_video_tag(args.profile))
+
+
+# Proxy encoder profiles. HandBrakeCLI profiles share the rate, size and
+# container options in build_handbrake_command; ffmpeg profiles are for hosts
+# without HandBrake. nvenc_h265 is the original GPU setup.
+ENCODE_PROFILES = {
+    'nvenc_h265': ('HandBrakeCLI', [
+        '--encoder', 'nvenc_h265',  # NVENC H.265 hardware encoder
+        '--encoder-preset', 'medium',
+        '--encoder-profile', 'main',  # H.265 Main profile for better compatibility
+        '--encoder-level', '4.1',  # H.265 level 4.1 (supports 1080p60)
+    ]),
+    'x265': ('HandBrakeCLI', [
+        '--encoder', 'x265',
+        '--encoder-preset', 'fast',
+        '--encoder-profile', 'main',
+    ]),
+    'x264': ('HandBrakeCLI', [
+        '--encoder', 'x264',
+        '--encoder-preset', 'fast',
+        '--encoder-profile', 'high',
+    ]),
+    'svt_av1': ('HandBrakeCLI', [
+        '--encoder', 'svt_av1',
+        '--encoder-preset', '8',
+    ]),
+    'ffmpeg_nvenc_h265': ('ffmpeg', [
+        '-c:v', 'hevc_nvenc', '-preset', 'p4', '-profile:v', 'main', '-tag:v', 'hvc1',
+    ]),
+    'ffmpeg_x265': ('ffmpeg', [
+        '-c:v', 'libx265', '-preset', 'fast', '-x265-params', 'log-level=error', '-tag:v', 'hvc1',
+    ]),
+    'ffmpeg_x264': ('ffmpeg', [
+        '-c:v', 'libx264', '-preset', 'fast', '-profile:v', 'high',
+    ]),
+    'ffmpeg_svt_av1': ('ffmpeg', [
+        '-c:v', 'libsvtav1', '-preset', '8',
+    ]),
+}
+
+
+def get_ladder_encoder(profile):
+    """
+    Default HLS ladder encoder for a proxy profile: the same codec family and
+    hardware, so hosts that can run the profile can also encode the ladder.
+    AV1 profiles fall back to libx264, as there is no AV1 ladder encoder.
+    """
+    if profile.endswith('nvenc_h265'):
+        return 'hevc_nvenc'
+    if profile.endswith('x265'):
+        return 'libx265'
+    return 'libx264'
+
+
+def get_video_tag(profile):
+    """MP4 codec tag of a profile's video track, for segmenting its proxies."""
+    if profile.endswith('x264'):
+        return 'avc1'
+    if profile.endswith('av1'):
+        return 'av01'
+    return 'hvc1'
+
+
+def build_handbrake_command(input_path, output_path, encoder_args, bitrate, resolution, framerate):
+    """Build the HandBrakeCLI command for a proxy encode."""
+    return [
         'HandBrakeCLI',
         '-i', str(input_path),
-        '-o', str(temp_output),  # Encode to temp location first
+        '-o', str(output_path),
 
         # Video encoder settings
-        '--encoder', 'nvenc_h265',  # NVENC H.265 hardware encoder
-        '--encoder-preset', 'medium',  # Quality preset
+        *encoder_args,
         '--vb', bitrate,  # Video bitrate
         '--width', resolution.split(':')[0],  # Video width
         '--height', resolution.split(':')[1],  # Video height
@@ -135,8 +721,6 @@ def encode_video(input_path, output_path, bitrate='5000', resolution='1920:1080'
 
         # Streaming optimization
         '--optimize',  # Enable web optimization (fast-start/moov atom at beginning)
-        '--encoder-profile', 'main',  # H.265 Main profile for better compatibility
-        '--encoder-level', '4.1',  # H.265 level 4.1 (supports 1080p60)
 
         # Audio settings
         '--all-audio',  # Copy all audio tracks
@@ -147,27 +731,76 @@ def encode_video(input_path, output_path, bitrate='5000', resolution='1920:1080'
         '--align-av',  # Align audio/video timestamps for better seeking
     ]
 
-    print(f"Encoding: {input_path.name}")
-    print(f"Command: {' '.join(cmd)}")
+
+def build_ffmpeg_command(input_path, output_path, encoder_args, bitrate, resolution, framerate):
+    """Build the ffmpeg command for a proxy encode, matching the HandBrake output."""
+    width, height = resolution.split(':')
+    return [
+        'ffmpeg',
+        '-i', str(input_path),
+        '-map', '0:v:0',
+        '-map', '0:a?',  # All audio tracks, if any
+        '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease:force_divisible_by=2',
+        *encoder_args,
+        '-b:v', f'{bitrate}k',
+        '-r', framerate,  # Constant framerate
+        '-c:a', 'copy',
+        '-movflags', '+faststart',  # moov atom at the beginning for streaming
+        '-f', 'mp4',
+        '-y',
+        str(output_path)
+    ]
+
+
+def encode_video(input_path, output_path, bitrate='5000', resolution='1920:1080', framerate='60',
+                 quiet=False, profile='nvenc_h265'):
+    """
+    Encode video with one of the ENCODE_PROFILES (NVENC H.265 by default).
+    Optimized for web streaming with fast-start enabled.
+
+    Args:
+        input_path: Path to input video file
+        output_path: Path to output video file
+        bitrate: Target video bitrate in kbps (default: 5000)
+        resolution: Output resolution as width:height (default: 1920:1080)
+        framerate: Target framerate (default: 60)
+        quiet: Capture the encoder's output instead of showing its progress,
+            for parallel encodes; it is printed only if the encode fails
+        profile: Encoder profile, a key of ENCODE_PROFILES
+    """
+    # Create temporary output path in .cache subfolder
+    cache_dir = input_path.parent / '.cache'
+    cache_dir.mkdir(exist_ok=True)
+    temp_output = cache_dir / f"{output_path.stem}_temp{output_path.suffix}"
+
+    # Encode to temp location first
+    tool, encoder_args = ENCODE_PROFILES[profile]
+    build_command = build_handbrake_command if tool == 'HandBrakeCLI' else build_ffmpeg_command
+    cmd = build_command(input_path, temp_output, encoder_args, bitrate, resolution, framerate)
+
+    print(f"Encoding: {input_path.name} ({profile})")
+    if not quiet:
+        print(f"Command: {' '.join(cmd)}")
 
     try:
-        result = subprocess.run(cmd, capture_output=False)
+        result = subprocess.run(cmd, capture_output=quiet, text=quiet)
 
         if result.returncode == 0:
             # Only move to final location if encoding succeeded
-            import shutil
             shutil.move(str(temp_output), str(output_path))
             print(f"✓ Successfully encoded: {output_path.name}\n")
             return True
         else:
-            print(f"✗ HandBrakeCLI failed with exit code {result.returncode}: {input_path.name}\n", file=sys.stderr)
+            print(f"✗ {tool} failed with exit code {result.returncode}: {input_path.name}\n", file=sys.stderr)
+            if quiet:
+                print(result.stderr[-2000:], file=sys.stderr)
             # Clean up partial output file if it exists
             if temp_output.exists():
                 temp_output.unlink()
             return False
     except FileNotFoundError:
-        print("Error: HandBrakeCLI not found. Please install HandBrake CLI.", file=sys.stderr)
-        sys.exit(1)
+        print(f"✗ {tool} not found. Install it or choose another --profile.", file=sys.stderr)
+        return False
     except KeyboardInterrupt:
         # Clean up temp file on interrupt
         print(f"\n\n⚠ Interrupted! Cleaning up temporary file...\n", file=sys.stderr)
@@ -176,66 +809,438 @@ def encode_video(input_path, output_path, bitrate='5000', resolution='1920:1080'
         raise
 
 
-def process_folder(folder_path, args):
-    """Process all video files in a single folder."""
-    video_files = get_video_files(folder_path)
+def measure_ssim(encoded_path, source_path, framerate):
+    """
+    Compare an encode with its source using ffmpeg's SSIM filter.
+
+    The source is scaled to the encode's size and framerate first, so the
+    score reflects encoder quality rather than the resize.
+
+    Returns:
+        Mean SSIM (1.0 is identical), or None if it couldn't be measured
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner',
+        '-i', str(encoded_path),
+        '-i', str(source_path),
+        '-lavfi', f'[1:v][0:v]scale2ref[ref][enc];[ref]fps={framerate}[ref];[enc][ref]ssim',
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    match = re.search(r'SSIM .* All:(\d+(?:\.\d+)?)', result.stderr)
+    return float(match.group(1)) if match else None
+
 
-    if not video_files:
-        return 0, 0, 0
+def run_benchmark(args):
+    """
+    Encode a fixed sample set with each profile and report throughput and size.
 
-    print(f"\n{'='*60}")
-    print(f"Processing folder: {folder_path.name}")
-    print(f"{'='*60}")
-    print(f"Found {len(video_files)} video file(s)\n")
+    Every sample is encoded with the same bitrate, resolution and framerate as
+    a real run, into a temporary folder. Reports wall time, encode speed in
+    output frames per second, actual bitrate, output size and SSIM against the
+    source, per sample and per profile.
+    """
+    samples = get_video_files(args.benchmark)
+    if not samples:
+        print(f"No sample videos found in {args.benchmark}")
+        return
 
-    encoded_count = 0
-    skipped_count = 0
-    failed_count = 0
+    profiles = args.benchmark_profiles or list(ENCODE_PROFILES)
+    available = [name for name in profiles if shutil.which(ENCODE_PROFILES[name][0])]
+    for name in profiles:
+        if name not in available:
+            print(f"⊘ Skipping profile {name}: {ENCODE_PROFILES[name][0]} not found")
 
-    for video_file in video_files:
-        output_path = get_output_path(video_file, args.suffix)
-        thumbnail_path = get_thumbnail_path(video_file, args.suffix)
+    print(f"Benchmarking {len(available)} profile(s) on {len(samples)} sample(s) "
+          f"at {args.bitrate} kbps, {args.resolution}, {args.framerate} fps\n")
 
-        # Skip if already encoded (resumable)
-        if output_path.exists() and not args.force:
-            print(f"⊘ Skipping (already exists): {video_file.name}")
-            skipped_count += 1
+    durations = {sample: probe_duration(sample) for sample in samples}
+    rows = []
 
-            # Still generate thumbnail if it doesn't exist
-            if not thumbnail_path.exists():
-                print(f"  Generating missing thumbnail: {thumbnail_path.name}")
-                if generate_thumbnail(video_file, thumbnail_path):
-                    print(f"  ✓ Thumbnail generated\n")
-                else:
-                    print(f"  ⚠ Thumbnail generation failed\n")
-            continue
+    with tempfile.TemporaryDirectory(prefix='encode-benchmark-') as temp_dir:
+        for name in available:
+            totals = {'seconds': 0.0, 'frames': 0.0, 'bytes': 0, 'duration': 0.0, 'ok': True}
+
+            for sample in samples:
+                output_path = Path(temp_dir) / f"{sample.stem}_{name}.mp4"
+                started = time.monotonic()
+                ok = encode_video(
+                    sample, output_path, args.bitrate, args.resolution, args.framerate,
+                    quiet=True, profile=name
+                )
+                seconds = time.monotonic() - started
+
+                if not ok:
+                    totals['ok'] = False
+                    rows.append((name, sample.name, seconds, None, None, None, None))
+                    continue
+
+                size = output_path.stat().st_size
+                duration = probe_duration(output_path) or durations[sample]
+                frames = duration * float(args.framerate) if duration else None
+                kbps = size * 8 / duration / 1000 if duration else None
+                ssim = measure_ssim(output_path, sample, args.framerate)
+                rows.append((name, sample.name, seconds, frames and frames / seconds, kbps, size, ssim))
+
+                totals['seconds'] += seconds
+                totals['frames'] += frames or 0
+                totals['bytes'] += size
+                totals['duration'] += duration or 0
+                output_path.unlink()
+
+            if totals['ok'] and totals['seconds']:
+                rows.append((
+                    name, 'TOTAL', totals['seconds'],
+                    totals['frames'] / totals['seconds'] if totals['frames'] else None,
+                    totals['bytes'] * 8 / totals['duration'] / 1000 if totals['duration'] else None,
+                    totals['bytes'], None
+                ))
+
+    # encode_video stages its output next to the samples
+    try:
+        (Path(args.benchmark) / '.cache').rmdir()
+    except OSError:
+        pass
+
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    print("\n" + "="*60)
+    print("BENCHMARK RESULTS")
+    print("="*60)
+    print(f"{'profile':<18} {'sample':<28} {'wall s':>8} {'fps':>8} {'kbps':>8} {'size MB':>8} {'ssim':>7}")
+    for name, sample, seconds, fps, kbps, size, ssim in rows:
+        print(
+            f"{name:<18} {sample[:28]:<28} {seconds:>8.1f} {fmt(fps, '.1f'):>8} "
+            f"{fmt(kbps, '.0f'):>8} {fmt(size and size / 1e6, '.2f'):>8} {fmt(ssim, '.4f'):>7}"
+        )
+
+
+# Bytes read from each of the start, middle and end of a source for its hash
+PARTIAL_HASH_BLOCK = 1024 * 1024
+
+
+def partial_hash(path, size):
+    """
+    Hash a file's size and three sample blocks instead of its whole content.
+
+    Cheap even for multi-GB recordings, and still changes when a clip is
+    re-recorded or trimmed under the same name.
+    """
+    digest = hashlib.sha1(str(size).encode('utf-8'))
+    with open(path, 'rb') as f:
+        for offset in (0, max(size // 2 - PARTIAL_HASH_BLOCK // 2, 0), max(size - PARTIAL_HASH_BLOCK, 0)):
+            f.seek(offset)
+            digest.update(f.read(PARTIAL_HASH_BLOCK))
+    return digest.hexdigest()
+
+
+class JobState:
+    """
+    Manifest of what has been encoded from each source clip, and how.
+
+    Stored as JSON in the input folder, keyed by the clip's path relative to
+    it. Each record holds the source's size, mtime and partial hash, plus the
+    finished stages (proxy, thumbnail, hls) with the settings they were built
+    with and their outputs. A stage counts as done only while the source
+    content, the settings and the outputs are all unchanged, so re-recorded
+    clips and new encoder settings are picked up without --force, and a
+    resumed run doesn't re-check every output or re-probe every source.
+
+    The size and mtime are trusted when they match; otherwise the partial hash
+    decides, so a copied or touched clip isn't re-encoded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.jobs = {}
+        if path.exists():
+            try:
+                self.jobs = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                print(f"⚠ Ignoring unreadable job state {path}: {e}", file=sys.stderr)
+
+        # Records from before the manifest had stages are treated as unknown
+        self.jobs = {key: entry for key, entry in self.jobs.items() if 'stages' in entry}
+        self.known = set(self.jobs)
+
+    def _key(self, video_file):
+        """Clips are keyed by their path relative to the input folder."""
+        return os.path.relpath(video_file, self.path.parent)
+
+    def _relative(self, path):
+        """Output paths are stored relative to the input folder too."""
+        return os.path.relpath(path, self.path.parent)
+
+    def _entry(self, video_file):
+        """Get the clip's record, reset if the source content changed."""
+        key = self._key(video_file)
+        stat_result = video_file.stat()
+        entry = self.jobs.get(key)
+        if entry and entry['size'] == stat_result.st_size and entry['mtime_ns'] == stat_result.st_mtime_ns:
+            return entry
+
+        content_hash = partial_hash(video_file, stat_result.st_size)
+        if not entry or entry['size'] != stat_result.st_size or entry['hash'] != content_hash:
+            entry = {'size': stat_result.st_size, 'hash': content_hash, 'stages': {}}
+        entry['mtime_ns'] = stat_result.st_mtime_ns
+        self.jobs[key] = entry
+        return entry
+
+    def is_new(self, video_file):
+        """Whether the manifest had no record of the clip when the run started."""
+        return self._key(video_file) not in self.known
+
+    def is_done(self, video_file, stage, settings):
+        """Whether a stage is done for the clip's current content and these settings."""
+        with self.lock:
+            done = self._entry(video_file)['stages'].get(stage)
+        if not done or done['settings'] != settings:
+            return False
+        return all((self.path.parent / output).exists() for output in done['outputs'])
+
+    def mark_done(self, video_file, stage, settings, outputs):
+        """Record a finished stage and its outputs, and save the manifest."""
+        with self.lock:
+            entry = self._entry(video_file)
+            entry['stages'][stage] = {
+                'settings': settings,
+                'outputs': [self._relative(output) for output in outputs],
+            }
+
+            # Write atomically, an interrupted run must not corrupt the manifest
+            temp_path = self.path.with_name(f"{self.path.name}.tmp")
+            temp_path.write_text(json.dumps(self.jobs, indent=1), encoding='utf-8')
+            os.replace(temp_path, self.path)
+
+
+def get_stage_settings(args):
+    """Settings each stage's output depends on, as recorded in the manifest."""
+    settings = {
+        'proxy': f"{args.profile}:{args.bitrate}:{args.resolution}:{args.framerate}",
+        'thumbnail': f"{THUMBNAIL_METHOD}:{len(THUMBNAIL_DERIVATIVES)}",
+    }
+    if args.ladder:
+        settings['hls'] = f"{format_ladder(args.ladder)}:{args.ladder_encoder}:{args.hls_segment_duration}"
+    else:
+        settings['hls'] = f"copy:{args.hls_segment_duration}"
+    return settings
+
+
+def get_thumbnail_outputs(thumbnail_path):
+    """Full-size thumbnail and derivative paths of a clip."""
+    return [thumbnail_path] + [
+        thumbnail_path.parent / str(width) / f"{thumbnail_path.stem}.{extension}"
+        for width, extension, _ in THUMBNAIL_DERIVATIVES
+    ]
+
+
+def adopt_existing_outputs(video_file, args, state, settings):
+    """
+    Record outputs of a clip the manifest doesn't know yet as done.
+
+    Trees encoded before the manifest existed would otherwise be encoded
+    again from scratch. Outputs are only adopted if they are newer than the
+    source, and are assumed to match the current settings.
+    """
+    source_mtime = video_file.stat().st_mtime
+    output_path = get_output_path(video_file, args.suffix)
+    thumbnail_outputs = get_thumbnail_outputs(get_thumbnail_path(video_file, args.suffix))
+    hls_dir = get_hls_dir(video_file)
+
+    if output_path.exists() and output_path.stat().st_mtime >= source_mtime:
+        state.mark_done(video_file, 'proxy', settings['proxy'], [output_path])
+    if all(path.exists() and path.stat().st_mtime >= source_mtime for path in thumbnail_outputs):
+        state.mark_done(video_file, 'thumbnail', settings['thumbnail'], thumbnail_outputs)
+    if not args.no_hls and hls_is_current(video_file, hls_dir, args):
+        state.mark_done(video_file, 'hls', settings['hls'], [hls_dir / 'index.m3u8'])
+
+
+def queue_job(jobs, pool, function, *args):
+    """Submit a job to a pool and track its future in a (thread-safe) list."""
+    jobs.append(pool.submit(function, *args))
 
-        success = encode_video(
+
+def run_thumbnail_job(video_file, args, state, settings):
+    """
+    Generate a clip's thumbnail (from its proxy) and the derivatives.
+
+    Runs on the thumbnail worker pool once the proxy is ready, while the
+    encode worker moves on to the HLS stream and the next clip.
+    """
+    thumbnail_path = get_thumbnail_path(video_file, args.suffix)
+    output_path = get_output_path(video_file, args.suffix)
+
+    print(f"Generating thumbnail: {thumbnail_path.name}")
+    if not generate_thumbnail(output_path, thumbnail_path):
+        print(f"⚠ Thumbnail generation failed: {video_file.name}")
+        return False
+    generated = generate_thumbnail_derivatives(thumbnail_path, force=True)
+    print(f"✓ Thumbnail and {generated} derivative(s) generated: {thumbnail_path.name}")
+
+    if generated == len(THUMBNAIL_DERIVATIVES):
+        state.mark_done(
+            video_file, 'thumbnail', settings['thumbnail'], get_thumbnail_outputs(thumbnail_path)
+        )
+    return True
+
+
+def run_encode_job(video_file, encode, segment, queue_thumbnail, args, state, settings):
+    """
+    Encode a clip's proxy and/or build its HLS stream.
+
+    Runs on the encode worker pool. queue_thumbnail, if given, is called as
+    soon as the proxy is ready, so the thumbnail is taken from it in parallel
+    with the HLS encode.
+
+    Returns:
+        'encoded', 'skipped' or 'failed' for the proxy
+    """
+    output_path = get_output_path(video_file, args.suffix)
+    quiet = args.encode_workers > 1  # Interleaved HandBrake progress is unreadable
+
+    if encode:
+        if not encode_video(
             video_file,
             output_path,
             args.bitrate,
             args.resolution,
-            args.framerate
-        )
+            args.framerate,
+            quiet=quiet,
+            profile=args.profile
+        ):
+            return 'failed'
+        state.mark_done(video_file, 'proxy', settings['proxy'], [output_path])
+        result = 'encoded'
+    else:
+        result = 'skipped'
 
-        if success:
-            encoded_count += 1
+    if queue_thumbnail:
+        queue_thumbnail()
 
-            # Generate thumbnail from the original video
-            print(f"Generating thumbnail: {thumbnail_path.name}")
-            if generate_thumbnail(video_file, thumbnail_path):
-                print(f"✓ Thumbnail generated: {thumbnail_path.name}\n")
-            else:
-                print(f"⚠ Thumbnail generation failed (continuing anyway)\n")
+    if segment:
+        hls_dir = get_hls_dir(video_file)
+        print(f"Segmenting for HLS: {video_file.stem}")
+        if segment_clip(video_file, output_path, args):
+            print(f"✓ HLS stream generated: {video_file.stem}")
+            state.mark_done(video_file, 'hls', settings['hls'], [hls_dir / 'index.m3u8'])
         else:
-            failed_count += 1
+            print(f"⚠ HLS segmentation failed (continuing anyway): {video_file.name}")
 
-    return encoded_count, skipped_count, failed_count
+    return result
 
 
-def main():
+def process_folders(month_folders, args):
+    """
+    Process all video files in the month folders.
+
+    Returns:
+        (encoded, skipped, failed) counts
+    """
+    return process_clips({folder: get_video_files(folder) for folder in month_folders}, args)
+
+
+def process_clips(clips_by_folder, args, state=None):
+    """
+    Process the given video files with the encode and thumbnail pools.
+
+    The manifest (see JobState) decides what each clip needs: a proxy encode
+    when the source content or the encoder settings changed, a thumbnail when
+    it was never completed, and an HLS stream when the proxy or the ladder
+    changed. Encodes run on --encode-workers threads, thumbnails on
+    --thumbnail-workers threads. A thumbnail is queued as soon as its proxy
+    is written, so it never waits for the HLS encode or other clips. Sprite
+    sheets are built per folder once all of its thumbnails are done.
+
+    Args:
+        clips_by_folder: Video files to process, per month folder
+        args: Parsed encode.py options (see parse_args)
+        state: Manifest to use (default: loaded from the input folder)
+
+    Returns:
+        (encoded, skipped, failed) counts
+    """
+    state = state or JobState(Path(args.input_dir) / JOB_STATE_FILENAME)
+    settings = get_stage_settings(args)
+    counts = {'encoded': 0, 'skipped': 0, 'failed': 0}
+
+    encode_pool = ThreadPoolExecutor(args.encode_workers, thread_name_prefix='encode')
+    thumbnail_pool = ThreadPoolExecutor(args.thumbnail_workers, thread_name_prefix='thumbnail')
+    encode_jobs = {}
+    thumbnail_jobs = {}
+
+    try:
+        for folder_path, video_files in clips_by_folder.items():
+            if not video_files:
+                continue
+
+            print(f"{folder_path.name}: {len(video_files)} video file(s)")
+            folder_encodes = encode_jobs.setdefault(folder_path, [])
+            folder_thumbnails = thumbnail_jobs.setdefault(folder_path, [])
+
+            for video_file in video_files:
+                if not args.force and state.is_new(video_file):
+                    adopt_existing_outputs(video_file, args, state, settings)
+
+                def needs(stage):
+                    return args.force or not state.is_done(video_file, stage, settings[stage])
+
+                encode = needs('proxy')
+                segment = not args.no_hls and (encode or needs('hls'))
+
+                # A new proxy gets a fresh thumbnail, as the old one may be stale
+                queue_thumbnail = None
+                if encode or needs('thumbnail'):
+                    queue_thumbnail = functools.partial(
+                        queue_job, folder_thumbnails, thumbnail_pool,
+                        run_thumbnail_job, video_file, args, state, settings
+                    )
+
+                if encode or segment:
+                    folder_encodes.append(encode_pool.submit(
+                        run_encode_job, video_file, encode, segment, queue_thumbnail,
+                        args, state, settings
+                    ))
+                elif queue_thumbnail:
+                    # The proxy is up to date, so the thumbnail can start right away
+                    queue_thumbnail()
+                    counts['skipped'] += 1
+                else:
+                    counts['skipped'] += 1
+
+        print(f"Queued {sum(len(jobs) for jobs in encode_jobs.values())} encode job(s)\n")
+
+        for folder_path, jobs in encode_jobs.items():
+            # Encode jobs queue their thumbnails, so once a folder's encodes are
+            # done its thumbnail list is complete; sprites need all of them
+            for job in jobs:
+                counts[job.result()] += 1
+            wait(thumbnail_jobs[folder_path])
+            generated = generate_sprite_sheets(folder_path, args.suffix)
+            if generated:
+                print(f"✓ {generated} sprite sheet(s) generated for {folder_path.name}")
+    except KeyboardInterrupt:
+        # Running encoders get the interrupt too; drop everything still queued.
+        # Finished stages are already in the manifest.
+        print(f"\n\n⚠ Interrupted! Cancelling queued jobs...\n", file=sys.stderr)
+        encode_pool.shutdown(wait=False, cancel_futures=True)
+        thumbnail_pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    encode_pool.shutdown()
+    thumbnail_pool.shutdown()
+    return counts['encoded'], counts['skipped'], counts['failed']
+
+
+def build_parser():
+    """Build the command line parser (also used by ingest.py)."""
     parser = argparse.ArgumentParser(
-        description='Generate quality proxies for video clips using HandBrakeCLI with NVENC acceleration.'
+        description='Generate quality proxies for video clips using HandBrakeCLI with NVENC acceleration '
+                    '(or another encoder profile).'
     )
     parser.add_argument(
         'input_dir',
@@ -258,6 +1263,23 @@ def main():
         default='60',
         help='Target framerate (default: 60)'
     )
+    parser.add_argument(
+        '-p', '--profile',
+        choices=list(ENCODE_PROFILES),
+        default='nvenc_h265',
+        help='Proxy encoder profile; ffmpeg_* profiles work without HandBrakeCLI (default: nvenc_h265)'
+    )
+    parser.add_argument(
+        '--benchmark',
+        metavar='SAMPLES_DIR',
+        help='Encode the videos in SAMPLES_DIR with each profile and report speed, '
+             'bitrate, size and SSIM instead of processing input_dir'
+    )
+    parser.add_argument(
+        '--benchmark-profiles',
+        type=lambda value: value.split(','),
+        help='Comma-separated profiles to benchmark (default: all installed)'
+    )
     parser.add_argument(
         '--suffix',
         default='_proxy',
@@ -266,10 +1288,94 @@ def main():
     parser.add_argument(
         '--force',
         action='store_true',
-        help='Re-encode files even if output already exists'
+        help='Re-encode files even if the manifest says they are up to date'
+    )
+    parser.add_argument(
+        '--encode-workers',
+        type=int,
+        default=2,
+        help='Concurrent proxy/HLS encodes; consumer NVENC GPUs allow a few sessions (default: 2)'
+    )
+    parser.add_argument(
+        '--thumbnail-workers',
+        type=int,
+        default=4,
+        help='Concurrent thumbnail jobs, run alongside the encodes (default: 4)'
+    )
+    parser.add_argument(
+        '--no-hls',
+        action='store_true',
+        help='Skip segmenting proxies into HLS streams'
+    )
+    parser.add_argument(
+        '--hls-segment-duration',
+        type=int,
+        default=4,
+        help='Target HLS segment length in seconds, cut on keyframes (default: 4)'
+    )
+    parser.add_argument(
+        '--ladder',
+        default='',
+        help=f'Encode an HLS bitrate ladder of height:kbps rungs from the source, e.g. '
+             f'{SUGGESTED_LADDER} (default: none, the proxy is segmented as a single '
+             'rendition without re-encoding)'
+    )
+    parser.add_argument(
+        '--ladder-encoder',
+        choices=sorted(LADDER_ENCODERS),
+        help='ffmpeg video encoder for the ladder renditions (default: follows --profile: '
+             'hevc_nvenc for NVENC, libx265 for x265, libx264 otherwise)'
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def parse_args(argv=None):
+    """
+    Parse and validate encode.py options.
+
+    Args:
+        argv: Arguments to parse (default: sys.argv[1:])
+
+    Returns:
+        Options namespace, with the ladder parsed into (height, kbps) rungs
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.encode_workers < 1 or args.thumbnail_workers < 1:
+        parser.error('worker counts must be at least 1')
+
+    if not args.ladder or args.ladder.lower() == 'none':
+        args.ladder = None
+    else:
+        try:
+            args.ladder = parse_ladder(args.ladder)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.ladder_encoder is None:
+        args.ladder_encoder = get_ladder_encoder(args.profile)
+
+    for name in args.benchmark_profiles or []:
+        if name not in ENCODE_PROFILES:
+            parser.error(f"unknown profile {name!r}, choose from {', '.join(ENCODE_PROFILES)}")
+
+    return args
+
+
+def main():
+    args = parse_args()
+
+    if args.benchmark:
+        run_benchmark(args)
+        return
+
+    # Existing proxies still get thumbnails and HLS streams without the encoder
+    tool = ENCODE_PROFILES[args.profile][0]
+    if not shutil.which(tool):
+        print(f"⚠ {tool} not found for profile {args.profile}; new proxies will fail to encode. "
+              f"Install it or choose another --profile.", file=sys.stderr)
 
     # Find all month folders
     month_folders = get_month_folders(args.input_dir)
@@ -281,16 +1387,7 @@ def main():
 
     print(f"Found {len(month_folders)} month folder(s): {', '.join(f.name for f in month_folders)}")
 
-    # Process each month folder
-    total_encoded = 0
-    total_skipped = 0
-    total_failed = 0
-
-    for month_folder in month_folders:
-        encoded, skipped, failed = process_folder(month_folder, args)
-        total_encoded += encoded
-        total_skipped += skipped
-        total_failed += failed
+    total_encoded, total_skipped, total_failed = process_folders(month_folders, args)
 
     # Print overall summary
     print("\n" + "="*60)
@@ -298,7 +1395,7 @@ def main():
     print("="*60)
     print(f"Month folders processed: {len(month_folders)}")
     print(f"Successfully encoded: {total_encoded}")
-    print(f"Skipped (already exist): {total_skipped}")
+    print(f"Skipped (up to date): {total_skipped}")
     print(f"Failed: {total_failed}")
 
 
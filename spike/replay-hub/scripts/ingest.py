@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Watch storage for new clips and ingest them as they appear.
+
+Replaces running arrange.py, encode.py and migrate_metadata.py by hand.
+
+Local storage: recordings dropped in the storage root are arranged into
+their YYYY-MM folder (as arrange.py does). Recordings placed directly in a
+month folder are taken as they are. Each new recording is encoded with
+encode.py (proxy, thumbnail, HLS) and added to the database with a
+single-row upsert. Changes are picked up with inotify on Linux, or by
+polling directory mtimes elsewhere.
+
+WebDAV storage: clips are encoded elsewhere, so the watcher polls the
+folder ETags (or mtimes, if the server sends none) and upserts the clips of
+the month folders that changed. The newest month is checked on every poll,
+for servers whose folder ETags don't change when a subfolder does.
+
+Each pass lists only the storage root and the folders that changed, so its
+cost grows with the number of new clips, not with the library. On startup,
+clips missing from the database are caught up once.
+
+Usage:
+    python scripts/ingest.py [--interval SECONDS] [--settle SECONDS] [--no-encode] [encode.py options]
+
+Options that ingest.py doesn't know are passed on to encode.py, e.g.
+--profile ffmpeg_x265 or --ladder 480p:1200,720p:2500,1080p:5000.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Add parent directory to path for imports, and this directory for the
+# sibling scripts
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import arrange
+import encode
+from app.config import settings
+from app.database import MetadataDB
+from app.file_client import FileClient, WebDAVFileClient
+from app.hls import parse_master_playlist
+from migrate_metadata import add_scanned_clips, scan_month
+
+logging.basicConfig(
+    format="[%(levelname)8s] %(asctime)s %(filename)16s:L%(lineno)-3d %(funcName)16s() : %(message)s",
+    level=settings.log_level.upper(),
+)
+logger = logging.getLogger(__name__)
+
+MONTH_PATTERN = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi", ".webm")
+# Seconds before a clip whose arrange, encode or registration failed is tried again
+RETRY_SECONDS = 600.0
+
+
+class Inotify:
+    """Minimal inotify binding through libc, for watching single directories."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_ISDIR = 0x40000000
+    IN_IGNORED = 0x00008000
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        """
+        Open an inotify instance.
+
+        Raises:
+            OSError: If inotify is not available (e.g., not on Linux)
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths: Dict[int, Path] = {}
+
+    def add_watch(self, path: Path, mask: int):
+        """Watch a directory (not recursively) for the events in mask."""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+
+    def read(self, timeout: float) -> List[Tuple[Path, int, str]]:
+        """
+        Wait up to timeout seconds for events.
+
+        Returns:
+            (directory, mask, name) per event
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+
+            if mask & self.IN_IGNORED:
+                # The directory was removed
+                self.paths.pop(wd, None)
+            elif wd in self.paths:
+                events.append((self.paths[wd], mask, name))
+        return events
+
+
+class LocalIngest:
+    """Arrange, encode and register new recordings on local storage."""
+
+    WATCH_MASK = Inotify.IN_CLOSE_WRITE | Inotify.IN_MOVED_TO | Inotify.IN_CREATE
+
+    def __init__(
+        self,
+        root: Path,
+        db: MetadataDB,
+        encode_args: Optional[argparse.Namespace],
+        interval: float,
+        settle: float,
+    ):
+        """
+        Initialize the local watcher.
+
+        Args:
+            root: Storage root holding the YYYY-MM folders
+            db: Database to register clips in
+            encode_args: Parsed encode.py options, or None to skip encoding
+            interval: Seconds between polls when inotify is unavailable
+            settle: Seconds a file's size and mtime must stay unchanged
+                before it counts as completely written
+        """
+        self.root = root
+        self.db = db
+        self.encode_args = encode_args
+        self.state = encode.JobState(root / encode.JOB_STATE_FILENAME) if encode_args else None
+        self.interval = interval
+        self.settle = settle
+
+        # Files waiting to settle: path -> ((size, mtime_ns), unchanged since)
+        self.pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        # Signature of each file when it was ingested, to ignore repeat events
+        self.ingested: Dict[Path, Tuple[int, int]] = {}
+        # Files whose ingest failed -> when to try them again
+        self.retry_at: Dict[Path, float] = {}
+        # Files waiting for encode.py to write their proxy (with --no-encode)
+        self.awaiting_proxy: Set[Path] = set()
+        # Directory mtimes for polling
+        self.dir_mtimes: Dict[Path, int] = {}
+
+        try:
+            self.inotify: Optional[Inotify] = Inotify()
+        except OSError as e:
+            logger.info(f"inotify unavailable ({e}); polling every {interval}s")
+            self.inotify = None
+
+    def month_folders(self) -> List[Path]:
+        """Month folders in the storage root."""
+        return sorted(
+            path
+            for path in self.root.iterdir()
+            if path.is_dir() and MONTH_PATTERN.fullmatch(path.name)
+        )
+
+    def watch_dir(self, path: Path):
+        """Start watching a directory (the root or a month folder)."""
+        if self.inotify:
+            self.inotify.add_watch(path, self.WATCH_MASK)
+        else:
+            self.dir_mtimes[path] = -1  # Listed on the next poll
+
+    def add_candidate(self, path: Path):
+        """Queue a video file to be ingested once it has settled."""
+        if path.suffix.lower() not in VIDEO_EXTENSIONS or path.name.startswith("."):
+            return
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            return
+        signature = (stat_result.st_size, stat_result.st_mtime_ns)
+        if self.ingested.get(path) == signature or path in self.pending:
+            return
+        self.pending[path] = (signature, time.monotonic())
+
+    def catch_up(self):
+        """Queue loose recordings and clips of month folders that are missing from the database."""
+        for path in self.root.iterdir():
+            if path.is_file():
+                self.add_candidate(path)
+
+        for folder in self.month_folders():
+            self.watch_dir(folder)
+            known = self.db.get_clip_paths_for_month(folder.name)
+            for video_file in encode.get_video_files(folder):
+                if f"{folder.name}/{video_file.stem}.mp4" not in known:
+                    self.add_candidate(video_file)
+
+        logger.info(f"Catching up on {len(self.pending)} clip(s) missing from the database")
+
+    def poll(self, timeout: float):
+        """Wait for changes and queue new video files."""
+        if self.inotify:
+            for directory, mask, name in self.inotify.read(timeout):
+                path = directory / name
+                if mask & Inotify.IN_ISDIR:
+                    # A new month folder, possibly moved in with clips inside
+                    if directory == self.root and MONTH_PATTERN.fullmatch(name):
+                        self.watch_dir(path)
+                        for video_file in encode.get_video_files(path):
+                            self.add_candidate(video_file)
+                elif mask & (Inotify.IN_CLOSE_WRITE | Inotify.IN_MOVED_TO):
+                    self.add_candidate(path)
+            return
+
+        time.sleep(timeout)
+        for folder in self.month_folders():
+            self.dir_mtimes.setdefault(folder, -1)
+        for directory, last_mtime in list(self.dir_mtimes.items()):
+            try:
+                mtime = directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                del self.dir_mtimes[directory]
+                continue
+            if mtime == last_mtime:
+                continue
+            self.dir_mtimes[directory] = mtime
+            for path in directory.iterdir():
+                if path.is_file():
+                    self.add_candidate(path)
+
+    def settled(self) -> List[Path]:
+        """Take the pending files whose size and mtime stopped changing."""
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            current = (stat_result.st_size, stat_result.st_mtime_ns)
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[path]
+                ready.append(path)
+        return ready
+
+    def ingest(self, paths: List[Path]):
+        """
+        Arrange, encode and register a batch of settled recordings.
+
+        A clip that fails at any step is retried after RETRY_SECONDS; the
+        rest of the batch carries on.
+        """
+        clips_by_folder: Dict[Path, List[Path]] = {}
+        for path in paths:
+            if path.parent == self.root:
+                try:
+                    path = arrange.arrange_file(path, self.root)
+                except Exception:
+                    logger.exception(f"Could not arrange {path.name}")
+                    self.schedule_retry(path)
+                    continue
+                logger.info(f"Arranged {path.name} into {path.parent.name}")
+            clips_by_folder.setdefault(path.parent, []).append(path)
+
+        if self.encode_args:
+            try:
+                encode.process_clips(clips_by_folder, self.encode_args, self.state)
+            except Exception:
+                # Clips whose proxy was written are still registered below
+                logger.exception(f"Encoding {len(paths)} clip(s) failed")
+
+        for folder, video_files in clips_by_folder.items():
+            for video_file in video_files:
+                if not self.encode_args and not self.proxy_file(video_file).exists():
+                    # Retrying on a timer can't help; wait for the proxy instead
+                    logger.info(f"Waiting for a proxy of {folder.name}/{video_file.name}")
+                    self.awaiting_proxy.add(video_file)
+                    continue
+
+                try:
+                    registered = self.register(folder.name, video_file)
+                except Exception:
+                    logger.exception(f"Could not add {folder.name}/{video_file.name}")
+                    registered = False
+                if not registered:
+                    self.schedule_retry(video_file)
+                    continue
+
+                try:
+                    stat_result = video_file.stat()
+                except FileNotFoundError:
+                    continue
+                self.ingested[video_file] = (stat_result.st_size, stat_result.st_mtime_ns)
+                self.retry_at.pop(video_file, None)
+
+    def schedule_retry(self, path: Path):
+        """Try a failed file again after RETRY_SECONDS."""
+        logger.info(f"Retrying {path.name} in {RETRY_SECONDS:.0f}s")
+        self.retry_at[path] = time.monotonic() + RETRY_SECONDS
+
+    def queue_retries(self):
+        """Queue the failed files that are due for another try, and those whose proxy appeared."""
+        now = time.monotonic()
+        for path, due in list(self.retry_at.items()):
+            if due <= now:
+                del self.retry_at[path]
+                self.add_candidate(path)
+
+        for path in list(self.awaiting_proxy):
+            if not path.exists():
+                self.awaiting_proxy.discard(path)
+            elif self.proxy_file(path).exists():
+                self.awaiting_proxy.discard(path)
+                self.add_candidate(path)
+
+    @staticmethod
+    def proxy_file(video_file: Path) -> Path:
+        """Where encode.py writes a clip's proxy."""
+        return video_file.parent / "proxies" / f"{video_file.stem}{settings.proxy_suffix}.mp4"
+
+    def register(self, month: str, video_file: Path) -> bool:
+        """
+        Upsert a clip's row, if its proxy exists.
+
+        Returns:
+            True if the clip was added
+        """
+        suffix = settings.proxy_suffix
+        display_name = f"{video_file.stem}.mp4"
+        proxy_file = self.proxy_file(video_file)
+        if not proxy_file.exists():
+            logger.warning(f"No proxy for {month}/{video_file.name}; not added")
+            return False
+
+        has_thumbnail = (
+            video_file.parent / "thumbnails" / f"{video_file.stem}{suffix}.jpg"
+        ).exists()
+        self.db.add_clip(month, display_name, f"{month}/proxies/{proxy_file.name}", has_thumbnail)
+
+        playlist = encode.get_hls_dir(video_file) / "index.m3u8"
+        renditions = parse_master_playlist(playlist.read_text()) if playlist.exists() else []
+        self.db.update_clip_renditions_bulk(
+            [(f"{month}/{display_name}", [rendition.model_dump() for rendition in renditions])]
+        )
+        logger.info(f"Added {month}/{display_name}")
+        return True
+
+    def run(self):
+        """Watch forever."""
+        self.watch_dir(self.root)
+        self.catch_up()
+        logger.info(f"Watching {self.root}")
+
+        while True:
+            try:
+                # Check pending files often enough to notice when they settle
+                self.poll(min(self.settle, self.interval) if self.pending else self.interval)
+                self.queue_retries()
+                ready = self.settled()
+                if ready:
+                    self.ingest(ready)
+            except Exception:
+                logger.exception("Ingest pass failed")
+                time.sleep(min(self.settle, self.interval))
+
+
+class WebDAVIngest:
+    """Register clips that appear in WebDAV month folders."""
+
+    def __init__(self, file_client: FileClient, db: MetadataDB, interval: float):
+        """
+        Initialize the WebDAV poller.
+
+        Args:
+            file_client: Storage client
+            db: Database to register clips in
+            interval: Seconds between polls
+        """
+        self.file_client = file_client
+        self.db = db
+        self.interval = interval
+        # Last seen ETag (or mtime) per folder path
+        self.signatures: Dict[str, object] = {}
+
+    @staticmethod
+    def signature(entry) -> object:
+        """Change marker of a folder: its ETag, or its mtime without one."""
+        return entry.etag or entry.mtime
+
+    def poll(self):
+        """List the root, then rescan the months whose folders changed."""
+        months = {
+            entry.name: entry
+            for entry in self.file_client.scandir("")
+            if entry.is_dir and MONTH_PATTERN.fullmatch(entry.name)
+        }
+        changed = [
+            name
+            for name, entry in months.items()
+            if self.signatures.get(name) != self.signature(entry)
+        ]
+        if months:
+            changed.append(max(months))
+
+        for month in sorted(set(changed), reverse=True):
+            # The proxies folder tells whether the month has new clips
+            subfolders = {
+                entry.name: entry for entry in self.file_client.scandir(month) if entry.is_dir
+            }
+            markers = tuple(
+                self.signature(subfolders[name]) if name in subfolders else None
+                for name in ("proxies", "thumbnails", "hls")
+            )
+            if self.signatures.get(f"{month}/") != markers:
+                clips = scan_month(self.file_client, month)
+                if clips:
+                    result = add_scanned_clips(self.db, clips)
+                    logger.info(
+                        f"{month}: {result['inserted']} new clip(s), {result['updated']} updated"
+                    )
+                self.signatures[f"{month}/"] = markers
+            self.signatures[month] = self.signature(months[month])
+
+    def run(self):
+        """Poll forever."""
+        logger.info(f"Polling {settings.webdav_url} every {self.interval}s")
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Poll failed")
+            time.sleep(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch storage for new clips and ingest them",
+        epilog="Other options are passed on to encode.py.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30.0,
+        help="Seconds between polls (WebDAV, or local storage without inotify) (default: 30)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=10.0,
+        help="Seconds a new recording must stay unchanged before it is ingested (default: 10)",
+    )
+    parser.add_argument(
+        "--no-encode",
+        action="store_true",
+        help="Only arrange and register clips; leave encoding to encode.py (clips are "
+        "added once their proxy exists)",
+    )
+    args, encode_argv = parser.parse_known_args()
+
+    db = MetadataDB()
+
+    if settings.storage_backend == "local":
+        root = Path(settings.local_root_path).expanduser().resolve()
+        encode_args = None if args.no_encode else encode.parse_args([str(root), *encode_argv])
+        LocalIngest(root, db, encode_args, args.interval, args.settle).run()
+    else:
+        if encode_argv:
+            parser.error(f"unrecognized arguments: {' '.join(encode_argv)}")
+        # Not FileClient.create(): the stat cache would hide the changes being polled for
+        WebDAVIngest(WebDAVFileClient(), db, args.interval).run()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -12,8 +12,10 @@ Options:
 
 import argparse
 import json
+import logging
 import sys
 from pathlib import Path
+from typing import Dict, List, NamedTuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -21,74 +23,154 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.config import settings
 from app.database import MetadataDB
 from app.file_client import FileClient
+from app.hls import HLS_PLAYLIST, hls_path, parse_master_playlist
+from app.models import Rendition
+
+logger = logging.getLogger(__name__)
+
+
+class ScannedClip(NamedTuple):
+    """A clip found in storage by scan_month."""
+
+    month: str
+    display_name: str
+    proxy_path: str
+    has_thumbnail: bool
+    renditions: List[Rendition]
+
+
+def scan_month(file_client: FileClient, month: str) -> List[ScannedClip]:
+    """
+    List the clips of one month folder with their thumbnail and HLS ladder.
+
+    Needs one listing each of the proxies, thumbnails and hls folders, plus
+    one read per HLS master playlist. Also used by ingest.py for the months
+    that changed.
+    """
+    proxy_dir = f"{month}/proxies"
+    thumbnails_dir = f"{month}/thumbnails"
+
+    # Get proxy videos
+    try:
+        video_files = [
+            entry.name for entry in file_client.scandir(proxy_dir)
+            if not entry.is_dir and entry.name.endswith('.mp4')
+        ]
+    except Exception:
+        return []
+
+    if not video_files:
+        return []
+
+    # Get thumbnails for this month
+    thumbnail_files = set()
+    try:
+        thumbnail_files = set(
+            entry.name for entry in file_client.scandir(thumbnails_dir)
+            if not entry.is_dir and entry.name.endswith('.jpg')
+        )
+    except Exception:
+        pass
+
+    # Clips with an HLS stream from encode.py
+    hls_stems = set()
+    try:
+        hls_stems = set(
+            entry.name for entry in file_client.scandir(f"{month}/hls") if entry.is_dir
+        )
+    except Exception:
+        pass
+
+    clips = []
+    for proxy_filename in video_files:
+        # Get display name (strip _proxy suffix)
+        display_name = file_client.get_display_name(proxy_filename)
+
+        # Check if thumbnail exists
+        display_stem = Path(display_name).stem
+        thumbnail_filename = f"{display_stem}{settings.proxy_suffix}.jpg"
+
+        # Record the bitrate ladder from the master playlist
+        renditions = []
+        if display_stem in hls_stems:
+            try:
+                playlist = file_client.read_file(hls_path(month, display_name, HLS_PLAYLIST))
+                renditions = parse_master_playlist(playlist.decode('utf-8'))
+            except Exception as e:
+                logger.warning(f"Could not read HLS playlist of {month}/{display_name}: {e}")
+
+        clips.append(ScannedClip(
+            month=month,
+            display_name=display_name,
+            proxy_path=f"{proxy_dir}/{proxy_filename}",
+            has_thumbnail=thumbnail_filename in thumbnail_files,
+            renditions=renditions,
+        ))
+    return clips
+
+
+def add_scanned_clips(db: MetadataDB, clips: List[ScannedClip]) -> Dict[str, int]:
+    """Upsert scanned clips and their HLS ladders in one transaction each."""
+    result = db.add_clips_bulk(
+        (clip.month, clip.display_name, clip.proxy_path, clip.has_thumbnail) for clip in clips
+    )
+    db.update_clip_renditions_bulk(
+        (f"{clip.month}/{clip.display_name}", [rendition.model_dump() for rendition in clip.renditions])
+        for clip in clips
+    )
+    return result
 
 
 def scan_clips(file_client: FileClient, db: MetadataDB, dry_run: bool = False) -> dict:
-    """Scan storage for all clips and add them to the database."""
+    """Scan storage for all clips and add them, with their HLS ladders, to the database."""
     print("\n" + "=" * 60)
     print("Step 1: Scanning for clips")
     print("=" * 60)
 
-    stats = {'added': 0, 'updated': 0, 'failed': 0}
+    stats = {'added': 0, 'updated': 0, 'failed': 0, 'ladders': 0}
 
-    # List all month directories
+    # List all month directories (one request per directory listing; scandir
+    # returns types and sizes so no per-file lookups are needed)
     try:
-        months = file_client.list_directories("")
+        months = [entry.name for entry in file_client.scandir("") if entry.is_dir]
     except Exception as e:
         print(f"Error listing directories: {e}")
         return stats
 
     print(f"Found {len(months)} month(s)\n")
 
-    for month in sorted(months, reverse=True):
-        proxy_dir = f"{month}/proxies"
-        thumbnails_dir = f"{month}/thumbnails"
-
-        # Get proxy videos
-        try:
-            proxy_files = file_client.list_files(proxy_dir, pattern="", exclude_proxy=False)
-            video_files = [f for f in proxy_files if f.endswith('.mp4')]
-        except Exception:
-            continue
-
-        if not video_files:
-            continue
-
-        # Get thumbnails for this month
-        thumbnail_files = set()
-        try:
-            thumbnail_list = file_client.list_files(thumbnails_dir, pattern="", exclude_proxy=False)
-            thumbnail_files = set(f for f in thumbnail_list if f.endswith('.jpg'))
-        except Exception:
-            pass
-
-        print(f"{month}: {len(video_files)} clips, {len(thumbnail_files)} thumbnails")
-
-        for proxy_filename in video_files:
-            # Get display name (strip _proxy suffix)
-            display_name = file_client.get_display_name(proxy_filename)
-            proxy_path = f"{proxy_dir}/{proxy_filename}"
-
-            # Check if thumbnail exists
-            display_stem = Path(display_name).stem
-            thumbnail_filename = f"{display_stem}{settings.proxy_suffix}.jpg"
-            has_thumbnail = thumbnail_filename in thumbnail_files
+    # Collect every clip first, then upsert them all in one transaction
+    pending = []
 
+    for month in sorted(months, reverse=True):
+        clips = scan_month(file_client, month)
+        if clips:
+            print(
+                f"{month}: {len(clips)} clips, "
+                f"{sum(clip.has_thumbnail for clip in clips)} thumbnails, "
+                f"{sum(bool(clip.renditions) for clip in clips)} HLS ladders"
+            )
+        known_paths = db.get_clip_paths_for_month(month) if dry_run and clips else set()
+
+        for clip in clips:
             if dry_run:
-                status = "NEW" if not db.clip_exists(f"{month}/{display_name}") else "UPDATE"
-                print(f"  [{status}] {display_name} (thumb: {has_thumbnail})")
+                status = "UPDATE" if f"{month}/{clip.display_name}" in known_paths else "NEW"
+                ladder = "/".join(rendition.name for rendition in clip.renditions) or "-"
+                print(f"  [{status}] {clip.display_name} (thumb: {clip.has_thumbnail}, ladder: {ladder})")
                 stats['added'] += 1
             else:
-                try:
-                    is_new = not db.clip_exists(f"{month}/{display_name}")
-                    db.add_clip(month, display_name, proxy_path, has_thumbnail)
-                    if is_new:
-                        stats['added'] += 1
-                    else:
-                        stats['updated'] += 1
-                except Exception as e:
-                    print(f"  ERROR adding {display_name}: {e}")
-                    stats['failed'] += 1
+                pending.append(clip)
+            if clip.renditions:
+                stats['ladders'] += 1
+
+    if pending:
+        try:
+            result = add_scanned_clips(db, pending)
+            stats['added'] += result['inserted']
+            stats['updated'] += result['updated']
+        except Exception as e:
+            print(f"  ERROR adding clips: {e}")
+            stats['failed'] += len(pending)
 
     return stats
 
@@ -103,18 +185,23 @@ def migrate_metadata(file_client: FileClient, db: MetadataDB, dry_run: bool = Fa
 
     # List all month directories
     try:
-        months = file_client.list_directories("")
+        months = [entry.name for entry in file_client.scandir("") if entry.is_dir]
     except Exception as e:
         print(f"Error listing directories: {e}")
         return stats
 
+    # Collect every metadata file first, then save them all in one transaction
+    pending = []
+
     for month in sorted(months, reverse=True):
         metadata_dir = f"{month}/metadata"
 
         # Get metadata files
         try:
-            files = file_client.list_files(metadata_dir, pattern="", exclude_proxy=False)
-            metadata_files = [f for f in files if f.endswith('.metadata.json')]
+            metadata_files = [
+                entry.name for entry in file_client.scandir(metadata_dir)
+                if not entry.is_dir and entry.name.endswith('.metadata.json')
+            ]
         except Exception:
             continue
 
@@ -142,9 +229,8 @@ def migrate_metadata(file_client: FileClient, db: MetadataDB, dry_run: bool = Fa
                     print(f"  -> {filename}: {fields}")
                     stats['migrated'] += 1
                 else:
-                    db.save_metadata(clip_path, metadata)
-                    print(f"  -> Migrated: {filename}")
-                    stats['migrated'] += 1
+                    pending.append((clip_path, metadata))
+                    print(f"  -> Read: {filename}")
 
             except json.JSONDecodeError as e:
                 print(f"  -> ERROR (invalid JSON) {filename}: {e}")
@@ -153,6 +239,14 @@ def migrate_metadata(file_client: FileClient, db: MetadataDB, dry_run: bool = Fa
                 print(f"  -> ERROR {filename}: {e}")
                 stats['failed'] += 1
 
+    if pending:
+        try:
+            db.save_metadata_bulk(pending)
+            stats['migrated'] += len(pending)
+        except Exception as e:
+            print(f"  -> ERROR saving metadata: {e}")
+            stats['failed'] += len(pending)
+
     return stats
 
 
@@ -202,6 +296,7 @@ def main():
     print(f"Clips added:      {clip_stats['added']}")
     print(f"Clips updated:    {clip_stats['updated']}")
     print(f"Clips failed:     {clip_stats['failed']}")
+    print(f"HLS ladders:      {clip_stats['ladders']}")
     if not args.scan_only:
         print(f"Metadata migrated: {metadata_stats['migrated']}")
         print(f"Metadata failed:   {metadata_stats['failed']}")
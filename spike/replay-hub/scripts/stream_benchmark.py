@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Measure seek latency and sustained throughput of a running Replay Hub's video stream.
+
+Plays a clip the way a browser does: open-ended "bytes=N-" requests, each
+continuing where the previous response ended, then seeks to random offsets.
+Run it against the server with different STREAM_WINDOW_* and
+STREAM_READAHEAD_MAX_BYTES settings to tune them.
+
+Usage:
+    python scripts/stream_benchmark.py URL CLIP_PATH [--seeks N] [--runs N]
+
+Example:
+    python scripts/stream_benchmark.py http://localhost:8080 "2024-11/proxies/clip_proxy.mp4"
+"""
+
+import argparse
+import random
+import statistics
+import time
+from urllib.parse import quote
+
+import httpx
+
+
+def timed_get(client: httpx.Client, url: str, start: int):
+    """
+    Request an open-ended range and read the whole response.
+
+    Returns:
+        (seconds to first byte, seconds in total, bytes received, file size)
+    """
+    started = time.perf_counter()
+    first_byte = None
+    received = 0
+    with client.stream("GET", url, headers={"Range": f"bytes={start}-"}) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            received += len(chunk)
+        content_range = response.headers.get("content-range", "")
+    total = time.perf_counter() - started
+
+    file_size = int(content_range.rsplit("/", 1)[1]) if "/" in content_range else received
+    return first_byte or total, total, received, file_size
+
+
+def play_through(client: httpx.Client, url: str):
+    """
+    Fetch a whole clip with sequential open-ended ranges.
+
+    Returns:
+        (number of requests, bytes received, seconds, first-byte latency per request,
+        file size)
+    """
+    position, file_size = 0, None
+    requests, received, seconds = 0, 0, 0.0
+    latencies = []
+    while file_size is None or position < file_size:
+        first_byte, total, size, file_size = timed_get(client, url, position)
+        if not size:
+            break
+        requests += 1
+        received += size
+        seconds += total
+        latencies.append(first_byte)
+        position += size
+    return requests, received, seconds, latencies, file_size
+
+
+def seek(client: httpx.Client, url: str, file_size: int, seeks: int):
+    """
+    Request open-ended ranges at random offsets.
+
+    Returns:
+        (first-byte latency per seek, total time per seek, bytes per response)
+    """
+    first_bytes, totals, sizes = [], [], []
+    for _ in range(seeks):
+        first_byte, total, size, _ = timed_get(client, url, random.randrange(file_size))
+        first_bytes.append(first_byte)
+        totals.append(total)
+        sizes.append(size)
+    return first_bytes, totals, sizes
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure seek latency and sustained throughput of the video stream route"
+    )
+    parser.add_argument("url", help="Base URL of the server (e.g., http://localhost:8080)")
+    parser.add_argument(
+        "clip", help="Clip path as in the player URL (e.g., 2024-11/proxies/x_proxy.mp4)"
+    )
+    parser.add_argument("--seeks", type=int, default=20, help="Random seeks per run (default: 20)")
+    parser.add_argument(
+        "--runs", type=int, default=3, help="Play-throughs and seek rounds (default: 3)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the seek offsets (default: 0)"
+    )
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    url = f"{args.url.rstrip('/')}/clips/{quote(args.clip)}/stream"
+
+    rows = []
+    with httpx.Client(timeout=60) as client:
+        for run in range(1, args.runs + 1):
+            requests, received, seconds, latencies, file_size = play_through(client, url)
+            first_bytes, totals, sizes = seek(client, url, file_size, args.seeks)
+            rows.append(
+                (
+                    run,
+                    requests,
+                    received / requests / 1e6,
+                    received / seconds / 1e6,
+                    statistics.median(latencies) * 1000,
+                    statistics.median(first_bytes) * 1000,
+                    percentile(first_bytes, 0.95) * 1000,
+                    statistics.median(totals) * 1000,
+                    statistics.mean(sizes) / 1e6,
+                )
+            )
+
+    print("\n" + "=" * 60)
+    print("STREAM BENCHMARK RESULTS")
+    print("=" * 60)
+    print(f"{url}\n")
+    print(
+        f"{'run':>3} {'reqs':>5} {'MB/req':>7} {'MB/s':>7} {'ttfb ms':>8} "
+        f"{'seek p50':>9} {'seek p95':>9} {'seek full':>10} {'seek MB':>8}"
+    )
+    for run, requests, mb_per_request, mb_per_second, ttfb, p50, p95, full, seek_mb in rows:
+        print(
+            f"{run:>3} {requests:>5} {mb_per_request:>7.2f} {mb_per_second:>7.1f} {ttfb:>8.1f} "
+            f"{p50:>9.1f} {p95:>9.1f} {full:>10.1f} {seek_mb:>8.2f}"
+        )
+    print("\nMB/s: sequential play-through throughput; ttfb: median first-byte latency of its")
+    print("requests. seek p50/p95: first-byte latency of random seeks; seek full: median time")
+    print("until a seek's whole response arrived.")
+
+
+if __name__ == "__main__":
+    main()
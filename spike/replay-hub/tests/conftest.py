@@ -0,0 +1,26 @@
+"""Shared test setup.
+
+Settings are read from the environment when app.config is first imported,
+and some modules create their database and storage clients at import time,
+so point them at a scratch directory before any test imports the app.
+
+The scripts directory is put on the path so tests can import them the way
+they import each other (e.g. "import encode").
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+_scratch = tempfile.mkdtemp(prefix="replay-hub-tests-")
+
+os.environ.update(
+    STORAGE_BACKEND="local",
+    LOCAL_ROOT_PATH=os.path.join(_scratch, "storage"),
+    DATABASE_PATH=os.path.join(_scratch, "metadata.db"),
+    THUMBNAIL_CACHE_DIR="",
+    LOG_LEVEL="WARNING",
+)
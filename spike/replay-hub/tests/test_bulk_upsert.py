@@ -0,0 +1,47 @@
+"""Tests for bulk clip and metadata upserts."""
+
+from app.database import UPSERT_KEY_BATCH, MetadataDB
+
+
+def test_bulk_upserts_count_new_and_existing_rows(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    count = UPSERT_KEY_BATCH + 100
+    try:
+        clips = [("2024-11", f"c{i}.mp4", f"c{i}_proxy.mp4", False) for i in range(count)]
+        assert db.add_clips_bulk(clips) == {"inserted": count, "updated": 0}
+
+        # Overlaps the first batch across a key batch boundary
+        clips = [("2024-11", f"c{i}.mp4", "", True) for i in range(count - 200, count + 50)]
+        assert db.add_clips_bulk(clips) == {"inserted": 50, "updated": 200}
+
+        items = [(f"2024-11/c{i}.mp4", {"metadata": {"map": "Mirage"}}) for i in range(3)]
+        assert db.save_metadata_bulk(items) == {"inserted": 3, "updated": 0}
+        items = [(f"2024-11/c{i}.mp4", {"metadata": {"map": "Nuke"}}) for i in range(5)]
+        assert db.save_metadata_bulk(items) == {"inserted": 2, "updated": 3}
+        assert db.add_clips_bulk([]) == {"inserted": 0, "updated": 0}
+    finally:
+        db.close()
+
+
+def test_bulk_upsert_repeated_key_counts_once_and_last_row_wins(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    try:
+        clips = [
+            ("2024-11", "a.mp4", "old_proxy.mp4", False),
+            ("2024-11", "b.mp4", "b_proxy.mp4", False),
+            ("2024-11", "a.mp4", "new_proxy.mp4", True),
+        ]
+        assert db.add_clips_bulk(clips) == {"inserted": 2, "updated": 0}
+        rows = {row["filename"]: row for row in db.get_clips_for_month("2024-11")}
+        assert rows["a.mp4"]["proxy_path"] == "new_proxy.mp4"
+        assert rows["a.mp4"]["has_thumbnail"] == 1
+
+        items = [
+            ("2024-11/a.mp4", {"metadata": {"map": "Mirage"}}),
+            ("2024-11/a.mp4", {"metadata": {"map": "Nuke"}}),
+        ]
+        assert db.save_metadata_bulk(items) == {"inserted": 1, "updated": 0}
+        assert db.save_metadata_bulk(items) == {"inserted": 0, "updated": 1}
+        assert db.get_metadata("2024-11/a.mp4")["metadata"]["map"] == "Nuke"
+    finally:
+        db.close()
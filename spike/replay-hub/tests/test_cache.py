@@ -0,0 +1,44 @@
+"""Tests for the in-process caches."""
+
+from app.cache import ByteLRUCache
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ByteLRUCache(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 8
+
+
+def test_disk_tier_serves_entries_after_restart(tmp_path):
+    ByteLRUCache(max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=100).set("a", b"a" * 10)
+
+    cache = ByteLRUCache(max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=100)
+    assert cache.stats()["disk_bytes"] == 10
+    assert cache.get("a") == b"a" * 10
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_rewriting_a_disk_entry_counts_only_the_difference(tmp_path):
+    cache = ByteLRUCache(max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=1000)
+    for _ in range(5):
+        cache.set("a", b"a" * 30)
+    assert cache.stats()["disk_bytes"] == 30
+
+    cache.set("a", b"a" * 10)
+    assert cache.stats()["disk_bytes"] == 10
+
+
+def test_disk_tier_prunes_oldest_entries(tmp_path):
+    cache = ByteLRUCache(max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=100)
+    for key in "abcd":
+        cache.set(key, key.encode() * 30)
+
+    assert cache.stats()["disk_bytes"] <= 90
+    assert cache.get("d") == b"d" * 30
@@ -0,0 +1,82 @@
+"""Tests for bitrate ladder specs and master playlist parsing."""
+
+import pytest
+
+from app.hls import hls_media_type, parse_master_playlist
+from app.models import Rendition
+from encode import format_ladder, parse_args, parse_ladder
+
+MASTER_PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-INDEPENDENT-SEGMENTS
+#EXT-X-STREAM-INF:BANDWIDTH=5500000,AVERAGE-BANDWIDTH=5000000,RESOLUTION=1920x1080,CODECS="hvc1.1.6.L123.B0,mp4a.40.2"
+a1b2_1080p.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=1320000,RESOLUTION=854x480,CODECS="hvc1.1.6.L93.B0,mp4a.40.2"
+a1b2_480p.m3u8
+#EXT-X-STREAM-INF:RESOLUTION=1280x720,CODECS="hvc1.1.6.L120.B0",BANDWIDTH=2750000
+a1b2_720p.m3u8
+"""
+
+
+def test_parse_ladder_sorts_rungs_and_allows_missing_p():
+    assert parse_ladder("1080p:5000, 480:1200,720p:2500,") == [
+        (480, 1200),
+        (720, 2500),
+        (1080, 5000),
+    ]
+
+
+def test_format_ladder_round_trip():
+    spec = "480p:1200,720p:2500,1080p:5000"
+    assert format_ladder(parse_ladder(spec)) == spec
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    [
+        ("720p", "Invalid ladder rung"),
+        ("720p:fast", "Invalid ladder rung"),
+        ("0p:1000", "Invalid ladder rung"),
+        ("720p:-5", "Invalid ladder rung"),
+        ("720p:2500,720:3000", "Duplicate ladder height"),
+        (" , ", "no rungs"),
+    ],
+)
+def test_parse_ladder_rejects(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_ladder(spec)
+
+
+def test_parse_master_playlist_orders_by_bandwidth():
+    renditions = parse_master_playlist(MASTER_PLAYLIST)
+    assert renditions == [
+        Rendition(width=854, height=480, bandwidth=1320000),
+        Rendition(width=1280, height=720, bandwidth=2750000),
+        Rendition(width=1920, height=1080, bandwidth=5500000),
+    ]
+    assert [rendition.name for rendition in renditions] == ["480p", "720p", "1080p"]
+
+
+def test_parse_master_playlist_skips_incomplete_variants():
+    text = "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=1000\nx.m3u8\n#EXT-X-STREAM-INF:RESOLUTION=1x\n"
+    assert parse_master_playlist(text) == []
+
+
+def test_parse_master_playlist_of_media_playlist():
+    text = "#EXTM3U\n#EXT-X-TARGETDURATION:4\n#EXTINF:4.0,\nseg_00000.m4s\n#EXT-X-ENDLIST\n"
+    assert parse_master_playlist(text) == []
+
+
+def test_hls_media_type():
+    assert hls_media_type("index.m3u8") == "application/vnd.apple.mpegurl"
+    assert hls_media_type("a1b2_720p_00003.m4s") == "video/iso.segment"
+    assert hls_media_type("a1b2_720p_init.mp4") == "video/mp4"
+    assert hls_media_type("../secrets.m3u8") is None
+    assert hls_media_type(".hidden.m3u8") is None
+    assert hls_media_type("notes.txt") is None
+
+
+def test_ladder_is_opt_in():
+    assert parse_args([]).ladder is None
+    assert parse_args(["--ladder", "none"]).ladder is None
+    assert parse_args(["--ladder", "720p:2500,480p:1200"]).ladder == [(480, 1200), (720, 2500)]
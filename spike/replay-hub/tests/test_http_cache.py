@@ -0,0 +1,92 @@
+"""Tests for HTTP validators and conditional request evaluation."""
+
+from starlette.requests import Request
+
+from app.http_cache import (
+    etag_matches,
+    http_date,
+    not_modified,
+    parse_http_date,
+    parse_iso_timestamp,
+    range_allowed,
+    validator_headers,
+)
+
+MTIME = 1_700_000_000.75
+LAST_MODIFIED = "Tue, 14 Nov 2023 22:13:20 GMT"
+ETAG = '"abc-123"'
+
+
+def request(**headers: str) -> Request:
+    """Build a GET request with the given headers (underscores become dashes)."""
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_http_date_round_trip():
+    assert http_date(MTIME) == LAST_MODIFIED
+    assert parse_http_date(LAST_MODIFIED) == int(MTIME)
+
+
+def test_parse_http_date_invalid():
+    assert parse_http_date(None) is None
+    assert parse_http_date("") is None
+    assert parse_http_date("yesterday") is None
+
+
+def test_parse_iso_timestamp_naive_is_utc():
+    assert parse_iso_timestamp("2023-11-14T22:13:20.750000") == MTIME
+    assert parse_iso_timestamp("2023-11-14T23:13:20.750000+01:00") == MTIME
+    assert parse_iso_timestamp("not a date") is None
+    assert parse_iso_timestamp(None) is None
+
+
+def test_validator_headers():
+    assert validator_headers(ETAG, MTIME) == {"ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+    assert validator_headers(None, None) == {}
+
+
+def test_etag_matches_weak_comparison_and_lists():
+    assert etag_matches(request(if_none_match=ETAG), ETAG)
+    assert etag_matches(request(if_none_match=f'"other", W/{ETAG}'), ETAG)
+    assert etag_matches(request(if_none_match="*"), ETAG)
+    assert not etag_matches(request(if_none_match='"other"'), ETAG)
+    assert not etag_matches(request(), ETAG)
+    assert not etag_matches(request(if_none_match=ETAG), None)
+
+
+def test_not_modified_by_date():
+    assert not_modified(request(if_modified_since=LAST_MODIFIED), ETAG, MTIME)
+    assert not_modified(request(if_modified_since=http_date(MTIME + 60)), ETAG, MTIME)
+    assert not not_modified(request(if_modified_since=http_date(MTIME - 60)), ETAG, MTIME)
+    assert not not_modified(request(if_modified_since=LAST_MODIFIED), ETAG, None)
+    assert not not_modified(request(if_modified_since="garbage"), ETAG, MTIME)
+
+
+def test_not_modified_if_none_match_takes_precedence():
+    # A stale ETag means modified, even though the date would say otherwise
+    assert not not_modified(
+        request(if_none_match='"stale"', if_modified_since=LAST_MODIFIED), ETAG, MTIME
+    )
+    assert not_modified(
+        request(if_none_match=ETAG, if_modified_since=http_date(MTIME - 60)), ETAG, MTIME
+    )
+
+
+def test_range_allowed_without_if_range():
+    assert range_allowed(request(range="bytes=0-"), ETAG, MTIME)
+
+
+def test_range_allowed_strong_etag_comparison():
+    assert range_allowed(request(if_range=ETAG), ETAG, MTIME)
+    assert not range_allowed(request(if_range='"stale"'), ETAG, MTIME)
+    # Weak ETags never validate a range, on either side
+    assert not range_allowed(request(if_range=f"W/{ETAG}"), ETAG, MTIME)
+    assert not range_allowed(request(if_range=f"W/{ETAG}"), f"W/{ETAG}", MTIME)
+    assert not range_allowed(request(if_range=ETAG), None, MTIME)
+
+
+def test_range_allowed_exact_date():
+    assert range_allowed(request(if_range=LAST_MODIFIED), ETAG, MTIME)
+    assert not range_allowed(request(if_range=http_date(MTIME + 60)), ETAG, MTIME)
+    assert not range_allowed(request(if_range=LAST_MODIFIED), ETAG, None)
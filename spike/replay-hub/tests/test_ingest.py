@@ -0,0 +1,158 @@
+"""Tests for the local ingest watcher: settling, registration and retries."""
+
+import pytest
+
+import ingest
+from app.database import MetadataDB
+
+
+class Clock:
+    """Stand-in for time.monotonic and time.sleep that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class NoInotify:
+    def __init__(self):
+        raise OSError("disabled in tests")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ingest.time, "monotonic", clock)
+    monkeypatch.setattr(ingest.time, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def watcher(tmp_path, db, clock, monkeypatch):
+    monkeypatch.setattr(ingest, "Inotify", NoInotify)
+    root = tmp_path / "storage"
+    (root / "2024-11").mkdir(parents=True)
+    watcher = ingest.LocalIngest(root, db, encode_args=None, interval=30, settle=10)
+    watcher.watch_dir(root)
+    return watcher
+
+
+def record(watcher, name, content=b"video"):
+    path = watcher.root / "2024-11" / name
+    path.write_bytes(content)
+    return path
+
+
+def write_proxy(path):
+    proxy = path.parent / "proxies" / f"{path.stem}_proxy.mp4"
+    proxy.parent.mkdir(exist_ok=True)
+    proxy.write_bytes(b"proxy")
+
+
+def step(watcher):
+    """One pass of LocalIngest.run: poll, queue retries, ingest settled files."""
+    watcher.poll(min(watcher.settle, watcher.interval) if watcher.pending else watcher.interval)
+    watcher.queue_retries()
+    ready = watcher.settled()
+    if ready:
+        watcher.ingest(ready)
+    return ready
+
+
+def clips(db):
+    return [row["filename"] for row in db.get_clips_for_month("2024-11")]
+
+
+def test_polling_finds_new_files_and_waits_for_them_to_settle(watcher, db, clock):
+    path = record(watcher, "a.mp4")
+    write_proxy(path)
+
+    assert step(watcher) == []
+    assert path in watcher.pending
+    # Still being written: the settle time starts over
+    path.write_bytes(b"video, longer")
+    assert step(watcher) == []
+    assert step(watcher) == [path]
+    assert clips(db) == ["a.mp4"]
+
+    # Events for the unchanged file don't ingest it again
+    watcher.add_candidate(path)
+    assert path not in watcher.pending
+
+
+def test_ignores_hidden_and_non_video_files(watcher):
+    watcher.add_candidate(record(watcher, ".a.mp4"))
+    watcher.add_candidate(record(watcher, "notes.txt"))
+    assert watcher.pending == {}
+
+
+def test_no_encode_waits_for_the_proxy_instead_of_retrying(watcher, db, clock):
+    path = record(watcher, "a.mp4")
+    watcher.add_candidate(path)
+    clock.now += watcher.settle
+    watcher.ingest(watcher.settled())
+
+    assert watcher.awaiting_proxy == {path}
+    assert watcher.retry_at == {}
+    assert clips(db) == []
+
+    clock.now += ingest.RETRY_SECONDS * 10
+    watcher.queue_retries()
+    assert watcher.pending == {}
+
+    write_proxy(path)
+    watcher.queue_retries()
+    assert path in watcher.pending and watcher.awaiting_proxy == set()
+    clock.now += watcher.settle
+    watcher.ingest(watcher.settled())
+    assert clips(db) == ["a.mp4"]
+
+
+def test_failed_registration_is_retried_after_the_retry_delay(watcher, db, clock, monkeypatch):
+    path = record(watcher, "a.mp4")
+    write_proxy(path)
+    real_register = watcher.register
+
+    def failing_register(month, video_file):
+        raise OSError("database is locked")
+
+    monkeypatch.setattr(watcher, "register", failing_register)
+    watcher.add_candidate(path)
+    clock.now += watcher.settle
+    watcher.ingest(watcher.settled())
+    assert watcher.retry_at == {path: clock.now + ingest.RETRY_SECONDS}
+    assert path not in watcher.ingested
+
+    monkeypatch.setattr(watcher, "register", real_register)
+    clock.now += ingest.RETRY_SECONDS - 1
+    watcher.queue_retries()
+    assert watcher.pending == {}
+
+    clock.now += 1
+    watcher.queue_retries()
+    assert path in watcher.pending
+    clock.now += watcher.settle
+    watcher.ingest(watcher.settled())
+    assert clips(db) == ["a.mp4"]
+    assert watcher.retry_at == {} and path in watcher.ingested
+
+
+def test_catch_up_queues_only_clips_missing_from_the_database(watcher, db):
+    write_proxy(record(watcher, "a.mp4"))
+    record(watcher, "b.mp4")
+    db.add_clip("2024-11", "a.mp4", "2024-11/proxies/a_proxy.mp4")
+
+    watcher.catch_up()
+    assert [path.name for path in watcher.pending] == ["b.mp4"]
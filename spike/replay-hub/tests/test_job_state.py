@@ -0,0 +1,83 @@
+"""Tests for the encode job manifest."""
+
+import os
+
+import pytest
+
+from encode import JobState
+
+SETTINGS = {"codec": "hevc_nvenc", "cq": 28}
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = tmp_path / "2024-11" / "clip.mp4"
+    path.parent.mkdir()
+    path.write_bytes(os.urandom(4096))
+    return path
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    path = tmp_path / "2024-11" / "proxies" / "clip_proxy.mp4"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"proxy")
+    return path
+
+
+def state_path(clip):
+    return clip.parent.parent / ".encode_state.json"
+
+
+def test_stage_done_after_mark_done_and_reload(clip, proxy):
+    state = JobState(state_path(clip))
+    assert state.is_new(clip)
+    assert not state.is_done(clip, "proxy", SETTINGS)
+
+    state.mark_done(clip, "proxy", SETTINGS, [proxy])
+    assert state.is_done(clip, "proxy", SETTINGS)
+
+    reloaded = JobState(state_path(clip))
+    assert not reloaded.is_new(clip)
+    assert reloaded.is_done(clip, "proxy", SETTINGS)
+    assert not reloaded.is_done(clip, "thumbnail", SETTINGS)
+
+
+def test_changed_settings_or_missing_output_is_not_done(clip, proxy):
+    state = JobState(state_path(clip))
+    state.mark_done(clip, "proxy", SETTINGS, [proxy])
+
+    assert not state.is_done(clip, "proxy", {**SETTINGS, "cq": 24})
+    proxy.unlink()
+    assert not state.is_done(clip, "proxy", SETTINGS)
+
+
+def test_touched_clip_with_same_content_stays_done(clip, proxy):
+    state = JobState(state_path(clip))
+    state.mark_done(clip, "proxy", SETTINGS, [proxy])
+
+    stat_result = clip.stat()
+    os.utime(clip, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+    assert JobState(state_path(clip)).is_done(clip, "proxy", SETTINGS)
+
+
+def test_re_recorded_clip_resets_its_stages(clip, proxy):
+    state = JobState(state_path(clip))
+    state.mark_done(clip, "proxy", SETTINGS, [proxy])
+
+    clip.write_bytes(os.urandom(4096))
+    stat_result = clip.stat()
+    os.utime(clip, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+    assert not JobState(state_path(clip)).is_done(clip, "proxy", SETTINGS)
+
+
+def test_unreadable_manifest_is_ignored(clip, capsys):
+    state_path(clip).write_text("{not json", encoding="utf-8")
+    state = JobState(state_path(clip))
+    assert state.jobs == {}
+    assert "Ignoring unreadable job state" in capsys.readouterr().err
+
+
+def test_records_without_stages_are_unknown(clip):
+    state_path(clip).write_text('{"2024-11/clip.mp4": {"size": 1}}', encoding="utf-8")
+    assert JobState(state_path(clip)).is_new(clip)
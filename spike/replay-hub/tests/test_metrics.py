@@ -0,0 +1,47 @@
+"""Tests for the route labels of the request metrics."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from app import metrics
+
+
+@pytest.fixture
+def routes_seen(tmp_path, monkeypatch):
+    (tmp_path / "app.js").write_text("console.log('hi')")
+
+    app = FastAPI()
+
+    @app.get("/clips/{month}/{filename:path}/thumbnail")
+    def thumbnail(month: str, filename: str):
+        return {"month": month, "filename": filename}
+
+    app.mount("/static", StaticFiles(directory=str(tmp_path)), name="static")
+    app.add_middleware(metrics.RequestMiddleware, record_metrics=False)
+
+    seen = []
+    monkeypatch.setattr(
+        metrics.request_log,
+        "log_request",
+        lambda summary, route, status, *args: seen.append((route, status)),
+    )
+    with TestClient(app) as client:
+        yield client, seen
+
+
+@pytest.mark.parametrize(
+    "path, route, status",
+    [
+        ("/clips/2024-10/a b.mp4/thumbnail", "/clips/{month}/{filename:path}/thumbnail", 200),
+        ("/clips/2024-11/nested/c.mp4/thumbnail", "/clips/{month}/{filename:path}/thumbnail", 200),
+        ("/static/app.js", "/static", 200),
+        ("/static/missing.js", "/static", 404),
+        ("/nowhere", "unmatched", 404),
+    ],
+)
+def test_requests_are_labelled_with_their_route_template(routes_seen, path, route, status):
+    client, seen = routes_seen
+    assert client.get(path).status_code == status
+    assert seen == [(route, status)]
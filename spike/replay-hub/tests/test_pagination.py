@@ -0,0 +1,63 @@
+"""Tests for clip page cursors and keyset pagination."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import MetadataDB
+from app.routes.clips import decode_cursor, encode_cursor, templates
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-11", "Counter-strike 2 2024.11.02 - 21.04.13.02.DVR.mp4")
+    assert decode_cursor(cursor) == ("2024-11", "Counter-strike 2 2024.11.02 - 21.04.13.02.DVR.mp4")
+
+
+def test_cursor_is_url_safe_for_any_filename():
+    cursor = encode_cursor("2024-11", "clutch ?&/+= ünïcode.mp4")
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+    assert decode_cursor(cursor) == ("2024-11", "clutch ?&/+= ünïcode.mp4")
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "", "W10=", "eyJhIjogMX0="])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_keyset_pages_cover_every_clip_once(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    for month in ("2024-10", "2024-11", "2024-12"):
+        for i in range(7):
+            db.add_clip(month, f"c{i}.mp4", f"{month}/proxies/c{i}_proxy.mp4", False)
+
+    seen = []
+    after = None
+    while True:
+        page = db.get_clips_page(after=after, limit=5)
+        if not page:
+            break
+        seen += [(row["month"], row["filename"]) for row in page]
+        after = seen[-1]
+    db.close()
+
+    assert len(seen) == 21
+    assert seen == sorted(set(seen), reverse=True)
+
+
+@pytest.mark.parametrize(
+    "has_filters, message",
+    [(False, "No clips found"), (True, "No clips match these filters")],
+)
+def test_empty_first_page_renders_the_empty_state(has_filters, message):
+    html = templates.get_template("partials/clip_page.html").render(
+        page_groups=[], month_counts={}, first_page=True, has_filters=has_filters, sprites=""
+    )
+    assert message in html
+
+
+def test_empty_later_page_renders_nothing():
+    html = templates.get_template("partials/clip_page.html").render(
+        page_groups=[], month_counts={}, first_page=False, has_filters=False, sprites=""
+    )
+    assert html.strip() == ""
@@ -0,0 +1,61 @@
+"""Tests for the PROMOTED_FIELDS setting and promoted field filters."""
+
+import pytest
+
+from app.database import MetadataDB, PromotedField, parse_promoted_fields
+
+
+def test_parse_promoted_fields():
+    assert parse_promoted_fields("kills:integer, weapon ,accuracy:REAL,") == [
+        PromotedField("kills", "integer"),
+        PromotedField("weapon", "text"),
+        PromotedField("accuracy", "real"),
+    ]
+
+
+def test_parse_promoted_fields_empty():
+    assert parse_promoted_fields("") == []
+    assert parse_promoted_fields(" , ") == []
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    [
+        ("kill-count", "Invalid promoted field name"),
+        ("1st", "Invalid promoted field name"),
+        ("weapon; DROP TABLE clips", "Invalid promoted field name"),
+        ("map", "reserved"),
+        ("Cursor", "reserved"),
+        ("kills:float", "Unknown type"),
+        ("kills,Kills:integer", "Duplicate"),
+    ],
+)
+def test_parse_promoted_fields_rejects(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_promoted_fields(spec)
+
+
+def test_promoted_field_coerce():
+    assert PromotedField("kills", "integer").coerce("4") == 4
+    assert PromotedField("accuracy", "real").coerce("0.5") == 0.5
+    assert PromotedField("weapon", "text").coerce(4) == "4"
+    with pytest.raises(ValueError):
+        PromotedField("kills", "integer").coerce("many")
+
+
+def test_filters_by_promoted_fields(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="kills:integer,weapon")
+    for i, (kills, weapon) in enumerate([(1, "AK-47"), (4, "AWP"), (5, "awp")]):
+        db.add_clip("2024-11", f"c{i}.mp4", f"2024-11/proxies/c{i}_proxy.mp4", False)
+        db.save_metadata(f"2024-11/c{i}.mp4", {"metadata": {"kills": str(kills), "weapon": weapon}})
+
+    def filenames(filters):
+        return sorted(row["filename"] for row in db.get_clips_page(filters=filters))
+
+    try:
+        # Numeric fields filter by minimum, text fields by case-insensitive equality
+        assert filenames({"kills": 4}) == ["c1.mp4", "c2.mp4"]
+        assert filenames({"weapon": "AWP"}) == ["c1.mp4", "c2.mp4"]
+        assert filenames({"kills": 5, "weapon": "awp"}) == ["c2.mp4"]
+    finally:
+        db.close()
@@ -0,0 +1,70 @@
+"""Tests for the database generation and the query cache keyed by it."""
+
+import pytest
+
+from app.cache import TTLCache
+from app.config import settings
+from app import database
+from app.database import MetadataDB
+from app.routes import clips
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    yield db
+    db.close()
+
+
+def test_writes_through_the_instance_bump_the_generation(db):
+    generations = [db.generation()]
+
+    db.add_clip("2024-11", "a.mp4", "2024-11/proxies/a_proxy.mp4")
+    generations.append(db.generation())
+    db.add_clips_bulk([("2024-11", "b.mp4", "2024-11/proxies/b_proxy.mp4", False)])
+    generations.append(db.generation())
+    db.save_metadata("2024-11/a.mp4", {"metadata": {"map": "Anubis"}})
+    generations.append(db.generation())
+    db.save_metadata_bulk([("2024-11/b.mp4", {"metadata": {"map": "Vertigo"}})])
+    generations.append(db.generation())
+    db.update_clip_thumbnail("2024-11/a.mp4", True)
+    generations.append(db.generation())
+    db.delete_metadata("2024-11/a.mp4")
+    generations.append(db.generation())
+
+    assert generations == sorted(set(generations))
+
+
+def test_writes_by_other_processes_bump_the_generation(db, tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    before = db.generation()
+
+    # The scripts write through their own connection; only the triggers see it
+    other = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    other.add_clip("2024-11", "a.mp4", "2024-11/proxies/a_proxy.mp4")
+    other.close()
+
+    # The counter is read again once the interval has passed
+    assert db.generation() == before
+    now[0] += settings.query_cache_generation_interval
+    assert db.generation() > before
+
+
+def test_cached_query_reloads_after_a_write(db, monkeypatch):
+    monkeypatch.setattr(clips, "metadata_db", db)
+    monkeypatch.setattr(clips, "query_cache", TTLCache(max_entries=10, ttl=3600))
+    monkeypatch.setattr(settings, "query_cache_enabled", True)
+    loads = []
+
+    def months():
+        loads.append(1)
+        return db.get_all_months()
+
+    assert clips.cached_query("months", (), months) == []
+    assert clips.cached_query("months", (), months) == []
+    assert len(loads) == 1
+
+    db.add_clip("2024-11", "a.mp4", "2024-11/proxies/a_proxy.mp4")
+    assert clips.cached_query("months", (), months) == ["2024-11"]
+    assert len(loads) == 2
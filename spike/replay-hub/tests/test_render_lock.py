@@ -0,0 +1,53 @@
+"""Tests for the per-path render lock of thumbnail derivatives."""
+
+import asyncio
+
+from app.routes import clips
+from app.routes.clips import render_lock
+
+
+def test_concurrent_renders_wait_and_release_the_lock():
+    events = []
+
+    async def render(name, entered=None, release=None):
+        async with render_lock("2024-10/a.mp4"):
+            events.append(f"{name} start")
+            if entered is not None:
+                entered.set()
+                await release.wait()
+            events.append(f"{name} end")
+
+    async def scenario():
+        entered, release = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(render("first", entered, release))
+        await entered.wait()
+        second = asyncio.create_task(render("second"))
+        await asyncio.sleep(0)
+
+        # Both requests hold a reference while the second waits for the first
+        assert clips._render_waiters == {"2024-10/a.mp4": 2}
+        assert events == ["first start"]
+
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+
+    assert events == ["first start", "first end", "second start", "second end"]
+    assert clips._render_locks == {}
+    assert clips._render_waiters == {}
+
+
+def test_lock_is_released_when_the_render_fails():
+    async def failing():
+        async with render_lock("2024-10/a.mp4"):
+            raise RuntimeError("ffmpeg failed")
+
+    async def scenario():
+        results = await asyncio.gather(failing(), failing(), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+
+    assert clips._render_locks == {}
+    assert clips._render_waiters == {}
@@ -0,0 +1,59 @@
+"""Tests for the sampled request summary log."""
+
+import logging
+
+import pytest
+
+from app import request_log
+from app.request_log import RequestSummary, log_request, parse_sample_rates
+
+ROUTE = "/clips/{month}/{filename:path}/thumbnail"
+
+
+@pytest.fixture
+def sampled_route(monkeypatch, caplog):
+    # Sample the thumbnail route at 50% and make every draw miss
+    monkeypatch.setattr(request_log, "_route_rates", {ROUTE: 0.5})
+    monkeypatch.setattr(request_log.random, "random", lambda: 0.9)
+    caplog.set_level(logging.INFO, logger="app.requests")
+    return caplog
+
+
+def log(status, duration=0.01):
+    summary = RequestSummary("GET", "/clips/2024-10/a.mp4/thumbnail", None)
+    log_request(summary, ROUTE, status, 1234, duration, 0.005)
+
+
+def test_sampled_success_is_dropped(sampled_route):
+    log(200)
+    assert sampled_route.records == []
+
+
+def test_server_error_is_always_logged(sampled_route):
+    log(500)
+    [record] = sampled_route.records
+    assert record.levelno == logging.WARNING
+    assert record.request["status"] == 500 and record.request["route"] == ROUTE
+
+
+def test_slow_request_is_always_logged(sampled_route):
+    log(200, duration=60)
+    [record] = sampled_route.records
+    assert record.levelno == logging.WARNING
+
+
+def test_unsampled_route_is_logged_at_info(sampled_route):
+    summary = RequestSummary("GET", "/", None)
+    log_request(summary, "/", 200, 10, 0.01, 0.005)
+    [record] = sampled_route.records
+    assert record.levelno == logging.INFO and record.request["route"] == "/"
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates(f" {ROUTE}=0.05, /hls=1 ,") == {ROUTE: 0.05, "/hls": 1.0}
+
+
+@pytest.mark.parametrize("spec", ["/thumbnail", "=0.5", "/thumbnail=often", "/thumbnail=2"])
+def test_parse_sample_rates_rejects_invalid_entries(spec):
+    with pytest.raises(ValueError):
+        parse_sample_rates(spec)
@@ -0,0 +1,74 @@
+"""Tests for full-text clip search and its index triggers."""
+
+import pytest
+
+from app.database import MetadataDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MetadataDB(str(tmp_path / "metadata.db"), promoted_fields="")
+    yield db
+    db.close()
+
+
+def add(db, filename, **metadata):
+    db.add_clip("2024-11", filename, f"2024-11/proxies/{filename}", False)
+    if metadata:
+        db.save_metadata(f"2024-11/{filename}", {"metadata": metadata})
+
+
+def found(db, query):
+    return [row["filename"] for row in db.search_clips(query)]
+
+
+def test_search_matches_prefixes_across_fields(db):
+    add(db, "ace.mp4", description="Clutch ace on B site", map="Mirage", weapon="AWP")
+    add(db, "plant.mp4", description="Ninja defuse", map="Inferno")
+
+    assert found(db, "clut") == ["ace.mp4"]
+    assert found(db, "inferno") == ["plant.mp4"]
+    assert found(db, "awp") == ["ace.mp4"]
+    assert found(db, "plant") == ["plant.mp4"]
+    # Every word must match
+    assert found(db, "ninja mirage") == []
+    assert found(db, "?!") == []
+
+
+def test_search_ranks_best_matches_first(db):
+    add(db, "a.mp4", description="smoke")
+    add(db, "b.mp4", description="smoke smoke smoke", map="smoke")
+    add(db, "c.mp4", description="flash")
+
+    assert found(db, "smoke") == ["b.mp4", "a.mp4"]
+
+
+def test_resaving_metadata_replaces_indexed_text(db):
+    add(db, "a.mp4", description="Deagle headshot", map="Nuke")
+    db.save_metadata("2024-11/a.mp4", {"metadata": {"description": "Knife kill", "map": "Nuke"}})
+
+    assert found(db, "deagle") == []
+    assert found(db, "knife") == ["a.mp4"]
+    results = db.search_metadata(query="knife")
+    assert [result["metadata"]["description"] for result in results] == ["Knife kill"]
+    assert db.search_metadata(query="deagle") == []
+
+
+def test_deleting_metadata_keeps_the_filename_searchable(db):
+    add(db, "retake.mp4", description="Late retake")
+    db.delete_metadata("2024-11/retake.mp4")
+
+    assert found(db, "late") == []
+    assert found(db, "retake") == ["retake.mp4"]
+
+
+def test_deleting_a_clip_removes_its_search_row(db):
+    add(db, "a.mp4", description="Eco round")
+    add(db, "b.mp4", description="Eco round")
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM clips WHERE clip_path = ?", ("2024-11/a.mp4",))
+        conn.commit()
+        rows = conn.execute("SELECT filename FROM clip_search").fetchall()
+
+    assert [row["filename"] for row in rows] == ["b.mp4"]
+    assert found(db, "eco") == ["b.mp4"]
@@ -0,0 +1,59 @@
+"""Tests for sprite sheet layouts and the sheets encode.py builds offline."""
+
+import re
+import subprocess
+
+import encode
+from app.file_client import DirEntry
+from app.sprites import SPRITE_COLUMNS, SPRITE_TILES_PER_SHEET, sprite_layout, sprite_sheet_path
+
+
+def test_sprite_layout_orders_tiles_newest_first():
+    entries = [
+        DirEntry("b_proxy.jpg", False, 10),
+        DirEntry("a_proxy.jpg", False, 10),
+        DirEntry("c_proxy.jpg", False, 10),
+        DirEntry("c_proxy.mp4", False, 10),
+        DirEntry("320", True),
+    ]
+    layout = sprite_layout("2024-11", entries)
+
+    assert [tile.filename for tile in layout.tiles] == ["c.mp4", "b.mp4", "a.mp4"]
+    assert layout.sheet_count == 1
+    # Any changed thumbnail changes the version
+    assert sprite_layout("2024-11", entries[:2]).version != layout.version
+
+
+def test_encode_builds_the_sheets_the_app_expects(tmp_path, monkeypatch):
+    """Sheets rendered offline must have the app's version, tile order and grid."""
+    thumbnails_dir = tmp_path / "2024-11" / "thumbnails"
+    thumbnails_dir.mkdir(parents=True)
+    count = SPRITE_TILES_PER_SHEET + SPRITE_COLUMNS + 3
+    for i in range(count):
+        # Each thumbnail's content is its name, so the rendered tiles can be told apart
+        (thumbnails_dir / f"clip{i:03d}_proxy.jpg").write_bytes(f"clip{i:03d}|".encode())
+
+    rendered = {}
+
+    def fake_ffmpeg(cmd, input, capture_output):
+        output = cmd[-1]
+        rendered[output] = (cmd[cmd.index("-vf") + 1], input.decode().rstrip("|").split("|"))
+        open(output, "wb").close()
+        return subprocess.CompletedProcess(cmd, 0)
+
+    monkeypatch.setattr(encode.subprocess, "run", fake_ffmpeg)
+    assert encode.generate_sprite_sheets(tmp_path / "2024-11") == 2
+
+    entries = [DirEntry(path.name, False, path.stat().st_size) for path in thumbnails_dir.iterdir()]
+    layout = sprite_layout("2024-11", entries)
+    assert layout.sheet_count == 2
+    for sheet in range(layout.sheet_count):
+        path = tmp_path / sprite_sheet_path("2024-11", layout.version, sheet)
+        assert path.exists()
+
+        vf, images = rendered[str(encode.get_partial_path(path))]
+        assert images == [tile.filename[: -len(".mp4")] for tile in layout.sheet_tiles(sheet)]
+        assert re.search(r"tile=(\d+)x(\d+)", vf).groups() == (
+            str(SPRITE_COLUMNS),
+            str(layout.sheet_rows(sheet)),
+        )
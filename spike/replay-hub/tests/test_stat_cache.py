@@ -0,0 +1,126 @@
+"""Tests for the TTL cache and the caching file client built on it."""
+
+import pytest
+
+from app import cache
+from app.cache import MISSING, TTLCache
+from app.config import settings
+from app.file_client import CachingFileClient, LocalFileClient
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingClient(LocalFileClient):
+    """Local client counting the stat calls that reach storage."""
+
+    def __init__(self, root_path):
+        super().__init__(root_path)
+        self.stats = 0
+
+    def stat(self, path):
+        self.stats += 1
+        return super().stat(path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def client(tmp_path):
+    return CountingClient(str(tmp_path))
+
+
+@pytest.fixture
+def caching(client):
+    return CachingFileClient(client, TTLCache(max_entries=100, ttl=60))
+
+
+def test_entries_expire_after_their_ttl(clock):
+    ttl_cache = TTLCache(max_entries=10, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", None, ttl=5)
+
+    clock.now += 5.5
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is MISSING
+    clock.now += 60
+    assert ttl_cache.get("a") is MISSING
+
+
+def test_evicts_least_recently_used_at_max_entries():
+    ttl_cache = TTLCache(max_entries=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is MISSING
+    assert ttl_cache.get("a") == 1 and ttl_cache.get("c") == 3
+    assert ttl_cache.stats()["evictions"] == 1
+
+
+def test_stat_cache_size_comes_from_settings():
+    assert cache.stat_cache.max_entries == settings.stat_cache_max_entries
+
+
+def test_missing_paths_are_cached_for_the_negative_ttl(clock, client, caching, tmp_path):
+    assert not caching.file_exists("2024-11/a.mp4")
+    (tmp_path / "2024-11").mkdir()
+    (tmp_path / "2024-11" / "a.mp4").write_bytes(b"x")
+
+    # Created behind the cache's back: still missing until the negative entry expires
+    assert not caching.file_exists("2024-11/a.mp4")
+    assert client.stats == 1
+    clock.now += settings.stat_cache_negative_ttl + 1
+    assert caching.file_exists("2024-11/a.mp4")
+    assert client.stats == 2
+
+
+def test_found_paths_are_served_from_the_cache(client, caching, tmp_path):
+    (tmp_path / "a.mp4").write_bytes(b"abc")
+    assert caching.get_file_size("a.mp4") == 3
+    assert caching.file_exists("a.mp4")
+    assert caching.stat("a.mp4").etag
+    assert client.stats == 1
+
+
+def test_write_file_invalidates_cached_stat(client, caching):
+    caching.ensure_directory("2024-11")
+    assert caching.stat("2024-11/a.jpg") is None
+    caching.write_file("2024-11/a.jpg", b"12345")
+
+    assert caching.get_file_size("2024-11/a.jpg") == 5
+    caching.write_file("2024-11/a.jpg", b"1")
+    assert caching.get_file_size("2024-11/a.jpg") == 1
+    assert client.stats == 3
+
+
+def test_ensure_directory_invalidates_cached_existence(caching):
+    assert caching.stat("2024-12") is None
+    caching.ensure_directory("2024-12")
+    file_stat = caching.stat("2024-12")
+    assert file_stat is not None and file_stat.is_dir
+
+
+def test_scandir_primes_the_cache(client, caching, tmp_path):
+    (tmp_path / "2024-11" / "thumbnails").mkdir(parents=True)
+    (tmp_path / "2024-11" / "a.mp4").write_bytes(b"abcd")
+
+    names = sorted(entry.name for entry in caching.scandir("2024-11/"))
+    assert names == ["a.mp4", "thumbnails"]
+    assert caching.get_file_size("2024-11/a.mp4") == 4
+    assert caching.stat("2024-11/thumbnails").is_dir
+    assert not caching.file_exists("2024-11/thumbnails")
+    assert client.stats == 0
@@ -0,0 +1,239 @@
+"""Tests for MP4 layout parsing, range window sizing and the read-ahead buffer."""
+
+import asyncio
+import struct
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.config import settings
+from app.streaming import (
+    DEFAULT_WINDOW_BYTES,
+    MediaLayout,
+    ReadAheadBuffer,
+    parse_box_header,
+    parse_mvhd_duration,
+    probe_layout,
+    window_end,
+)
+
+MB = 1024 * 1024
+
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    """Build an ISO BMFF box with a 32-bit size."""
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def mvhd(timescale: int, duration: int, version: int = 0) -> bytes:
+    """Build a movie header box."""
+    if version == 1:
+        fields = struct.pack(">BxxxQQIQ", 1, 0, 0, timescale, duration)
+    else:
+        fields = struct.pack(">BxxxIIII", 0, 0, 0, timescale, duration)
+    return box(b"mvhd", fields + bytes(80))
+
+
+class MemoryClient:
+    """Async file client serving ranges of in-memory files."""
+
+    def __init__(self, files):
+        self.files = files
+        self.reads = 0
+
+    @asynccontextmanager
+    async def open_range(self, path, start, end, chunk_size=256 * 1024):
+        self.reads += 1
+        data = self.files[path][start : end + 1]
+
+        async def chunks():
+            for offset in range(0, len(data), chunk_size):
+                yield data[offset : offset + chunk_size]
+
+        yield chunks()
+
+
+@pytest.fixture
+def window_settings(monkeypatch):
+    """Windows of 8 s, clamped to 1-16 MB."""
+    monkeypatch.setattr(settings, "stream_window_seconds", 8.0)
+    monkeypatch.setattr(settings, "stream_window_min_bytes", 1 * MB)
+    monkeypatch.setattr(settings, "stream_window_max_bytes", 16 * MB)
+
+
+def test_parse_box_header_32_bit_size():
+    assert parse_box_header(struct.pack(">I4s", 1234, b"moov")) == (1234, "moov", 8)
+
+
+def test_parse_box_header_64_bit_size():
+    data = struct.pack(">I4sQ", 1, b"mdat", 5 * 2**32)
+    assert parse_box_header(data) == (5 * 2**32, "mdat", 16)
+
+
+def test_parse_box_header_size_zero_runs_to_end_of_file():
+    assert parse_box_header(struct.pack(">I4s", 0, b"mdat")) == (0, "mdat", 8)
+
+
+def test_parse_box_header_short_data():
+    assert parse_box_header(b"\x00\x00\x00") is None
+    # A 64-bit size without its 8 size bytes
+    assert parse_box_header(struct.pack(">I4s", 1, b"mdat")) is None
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_parse_mvhd_duration(version):
+    assert parse_mvhd_duration(mvhd(1000, 42_500, version)) == 42.5
+
+
+def test_parse_mvhd_duration_rejects_other_boxes_and_zero_timescale():
+    assert parse_mvhd_duration(box(b"trak", bytes(100))) is None
+    assert parse_mvhd_duration(mvhd(0, 1000)) is None
+    assert parse_mvhd_duration(mvhd(1000, 0)) is None
+    assert parse_mvhd_duration(mvhd(1000, 1000)[:20]) is None
+
+
+def test_probe_layout_moov_first():
+    moov = box(b"moov", mvhd(1000, 10_000))
+    data = box(b"ftyp", b"isom") + moov + box(b"mdat", bytes(5000))
+    layout = asyncio.run(probe_layout(MemoryClient({"a.mp4": data}), "a.mp4", len(data)))
+
+    assert layout.moov_start == 12
+    assert layout.moov_end == 12 + len(moov)
+    assert layout.moov_first
+    assert layout.bytes_per_second == len(data) / 10
+
+
+def test_probe_layout_moov_last_after_64_bit_mdat():
+    mdat = struct.pack(">I4sQ", 1, b"mdat", 16 + 4000) + bytes(4000)
+    moov = box(b"moov", mvhd(90_000, 180_000))
+    data = box(b"ftyp", b"isom") + mdat + moov
+    layout = asyncio.run(probe_layout(MemoryClient({"a.mp4": data}), "a.mp4", len(data)))
+
+    assert layout.moov_start == len(data) - len(moov)
+    assert layout.moov_end == len(data)
+    assert not layout.moov_first
+    assert layout.bytes_per_second == len(data) / 2
+
+
+def test_probe_layout_without_moov():
+    data = box(b"ftyp", b"isom") + struct.pack(">I4s", 0, b"mdat") + bytes(100)
+    layout = asyncio.run(probe_layout(MemoryClient({"a.mp4": data}), "a.mp4", len(data)))
+    assert layout == MediaLayout()
+
+
+def test_probe_layout_of_garbage():
+    data = bytes(64)
+    layout = asyncio.run(probe_layout(MemoryClient({"a.bin": data}), "a.bin", len(data)))
+    assert layout == MediaLayout()
+
+
+def test_window_end_moov_first_initial_request(window_settings):
+    layout = MediaLayout(moov_start=32, moov_end=40_000, moov_first=True, bytes_per_second=MB / 4)
+    # Headers plus 8 s at 256 KB/s
+    assert window_end(layout, 0, 100 * MB) == 40_000 + 2 * MB - 1
+
+
+def test_window_end_moov_last_initial_request(window_settings):
+    layout = MediaLayout(
+        moov_start=99 * MB, moov_end=100 * MB, moov_first=False, bytes_per_second=MB
+    )
+    assert window_end(layout, 0, 100 * MB) == 1 * MB - 1
+
+
+def test_window_end_inside_moov_covers_whole_moov(window_settings):
+    layout = MediaLayout(
+        moov_start=90 * MB, moov_end=100 * MB, moov_first=False, bytes_per_second=MB / 8
+    )
+    # The 1 MB window would end inside the moov; the response runs to its end
+    assert window_end(layout, 90 * MB + 10, 100 * MB) == 100 * MB - 1
+
+
+def test_window_end_scales_with_bitrate_and_clamps(window_settings):
+    assert window_end(MediaLayout(bytes_per_second=MB), 5000, 100 * MB) == 5000 + 8 * MB - 1
+    assert window_end(MediaLayout(bytes_per_second=10 * MB), 0, 500 * MB) == 16 * MB - 1
+    assert window_end(MediaLayout(bytes_per_second=1000), 0, 500 * MB) == 1 * MB - 1
+
+
+def test_window_end_unknown_bitrate(window_settings):
+    assert window_end(MediaLayout(), 100, 500 * MB) == 100 + DEFAULT_WINDOW_BYTES - 1
+
+
+def test_window_end_stops_at_end_of_file(window_settings):
+    assert window_end(MediaLayout(bytes_per_second=MB), 99 * MB, 100 * MB) == 100 * MB - 1
+    assert window_end(MediaLayout(), 0, 10) == 9
+
+
+def test_read_ahead_take_returns_prefetched_window():
+    async def scenario():
+        buffer = ReadAheadBuffer(max_bytes=100)
+
+        async def load():
+            return b"x" * 10
+
+        buffer.prefetch("a", 10, load)
+        assert buffer.stats()["bytes"] == 10
+        assert await buffer.take("a") == b"x" * 10
+        assert await buffer.take("a") is None
+        return buffer.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_read_ahead_evicts_oldest_windows_to_stay_within_budget():
+    async def scenario():
+        buffer = ReadAheadBuffer(max_bytes=25)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+            return b""
+
+        async def load():
+            return b"y" * 10
+
+        buffer.prefetch("a", 10, slow)
+        await started.wait()
+        first = next(iter(buffer._windows.values()))[0]
+        buffer.prefetch("b", 10, load)
+        buffer.prefetch("c", 10, load)  # Over budget: "a" goes, and its read is cancelled
+        await asyncio.sleep(0)
+
+        assert first.cancelled()
+        assert await buffer.take("a") is None
+        assert await buffer.take("c") == b"y" * 10
+        return buffer.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 1 and stats["bytes"] == 10
+
+
+def test_read_ahead_skips_windows_larger_than_the_budget():
+    async def scenario():
+        buffer = ReadAheadBuffer(max_bytes=5)
+
+        async def load():
+            return b"z" * 10
+
+        buffer.prefetch("a", 10, load)
+        return buffer.stats()
+
+    assert asyncio.run(scenario())["entries"] == 0
+
+
+def test_read_ahead_failed_read_is_a_miss():
+    async def scenario():
+        buffer = ReadAheadBuffer(max_bytes=100)
+
+        async def load():
+            raise OSError("gone")
+
+        buffer.prefetch("a", 10, load)
+        return await buffer.take("a"), buffer.stats()
+
+    data, stats = asyncio.run(scenario())
+    assert data is None
+    assert stats["misses"] == 1 and stats["hits"] == 0
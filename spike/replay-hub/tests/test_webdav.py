@@ -0,0 +1,131 @@
+"""Tests for WebDAV URL building, PROPFIND parsing and directory listings."""
+
+import pytest
+
+from app.config import settings
+from app.file_client import WebDAVFileClient
+from app.webdav import PropfindEntry, build_url, parse_propfind, webdav_path
+
+BASE_URL = "https://dav.example.com/remote.php/dav/files/replay-hub/"
+PREFIX = "/remote.php/dav/files/replay-hub/replays/2024-11"
+
+MULTISTATUS = f"""<?xml version="1.0"?>
+<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">
+  <d:response>
+    <d:href>{PREFIX}/</d:href>
+    <d:propstat>
+      <d:prop>
+        <d:resourcetype><d:collection/></d:resourcetype>
+        <d:getetag>"dir-etag"</d:getetag>
+        <d:getlastmodified>Tue, 14 Nov 2023 22:13:20 GMT</d:getlastmodified>
+      </d:prop>
+      <d:status>HTTP/1.1 200 OK</d:status>
+    </d:propstat>
+  </d:response>
+  <d:response>
+    <d:href>{PREFIX}/Clutch%20%C3%A0%20B%20%2350.mp4</d:href>
+    <d:propstat>
+      <d:prop>
+        <d:resourcetype/>
+        <d:getcontentlength>1048576</d:getcontentlength>
+        <d:getetag>"abc123"</d:getetag>
+        <d:getlastmodified>Tue, 14 Nov 2023 22:13:20 GMT</d:getlastmodified>
+      </d:prop>
+      <d:status>HTTP/1.1 200 OK</d:status>
+    </d:propstat>
+    <d:propstat>
+      <d:prop><oc:checksums/></d:prop>
+      <d:status>HTTP/1.1 404 Not Found</d:status>
+    </d:propstat>
+  </d:response>
+  <d:response>
+    <d:href>https://dav.example.com{PREFIX}/thumbnails/</d:href>
+    <d:propstat>
+      <d:prop>
+        <d:resourcetype><d:collection/></d:resourcetype>
+        <d:getlastmodified>not a date</d:getlastmodified>
+      </d:prop>
+      <d:status>HTTP/1.1 200 OK</d:status>
+    </d:propstat>
+  </d:response>
+  <d:response>
+    <d:href>{PREFIX}/gone.mp4</d:href>
+    <d:propstat>
+      <d:prop/>
+      <d:status>HTTP/1.1 403 Forbidden</d:status>
+    </d:propstat>
+  </d:response>
+</d:multistatus>
+""".encode()
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+@pytest.fixture
+def webdav_client(monkeypatch):
+    monkeypatch.setattr(settings, "webdav_url", BASE_URL)
+    monkeypatch.setattr(settings, "webdav_root_path", "replays/")
+    return WebDAVFileClient()
+
+
+def test_build_url_encodes_each_path_component():
+    assert build_url(BASE_URL, "replays/2024-11/a b#1?.mp4") == (
+        "https://dav.example.com/remote.php/dav/files/replay-hub/replays/2024-11/a%20b%231%3F.mp4"
+    )
+
+
+def test_parse_propfind():
+    entries = parse_propfind(MULTISTATUS)
+
+    assert entries == [
+        PropfindEntry(f"{PREFIX}/", True, 0, 1700000000.0, '"dir-etag"'),
+        PropfindEntry(f"{PREFIX}/Clutch à B #50.mp4", False, 1048576, 1700000000.0, '"abc123"'),
+        # Absolute hrefs are reduced to their path; bad dates and missing
+        # lengths or ETags don't drop the entry
+        PropfindEntry(f"{PREFIX}/thumbnails/", True, 0, None, None),
+    ]
+
+
+def test_scandir_skips_the_directory_itself(webdav_client, monkeypatch):
+    requests = []
+
+    def fake_request(method, url, **kwargs):
+        requests.append((method, url, kwargs["headers"]["Depth"]))
+        return FakeResponse(207, MULTISTATUS)
+
+    monkeypatch.setattr(webdav_client.session, "request", fake_request)
+    entries = webdav_client.scandir("2024-11")
+
+    assert requests == [("PROPFIND", f"{BASE_URL}replays/2024-11/", "1")]
+    assert [(entry.name, entry.is_dir, entry.size, entry.etag) for entry in entries] == [
+        ("Clutch à B #50.mp4", False, 1048576, '"abc123"'),
+        ("thumbnails", True, 0, None),
+    ]
+
+
+def test_scandir_of_a_missing_directory(webdav_client, monkeypatch):
+    monkeypatch.setattr(webdav_client.session, "request", lambda *args, **kwargs: FakeResponse(404))
+    with pytest.raises(FileNotFoundError):
+        webdav_client.scandir("2099-01")
+
+
+@pytest.mark.parametrize(
+    "root, path, expected",
+    [
+        ("replays/", "2024-11/a.mp4", "replays/2024-11/a.mp4"),
+        ("/replays", "/2024-11", "/replays/2024-11"),
+        ("replays/", "", "replays"),
+        ("", "2024-11", "2024-11"),
+        ("/", "", "/"),
+    ],
+)
+def test_webdav_path(root, path, expected):
+    assert webdav_path(root, path) == expected